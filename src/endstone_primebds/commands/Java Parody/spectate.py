@@ -84,7 +84,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             sender.send_message(f"No players available to spectate.")
         return True
     else:
-        targets = get_matching_actors(sender, args[0], sender)
+        targets = get_matching_actors(self, args[0], sender)
         if not targets:
             sender.send_message("Unable to find target player")
             return False
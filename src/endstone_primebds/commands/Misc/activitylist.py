@@ -35,35 +35,16 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             if len(args) >= 2 and args[1].isdigit():
                 page = int(args[1])
 
-    playtimes = self.sldb.get_all_playtimes()
-    if not playtimes:
+    per_page = 10
+    total_entries = self.sldb.count_playtimes()
+    if not total_entries:
         sender.send_message("No player playtime data found")
         return True
 
-    if filter_type == "highest":
-        sorted_playtimes = sorted(playtimes, key=lambda x: x['total_playtime'], reverse=True)
-    elif filter_type == "lowest":
-        sorted_playtimes = sorted(playtimes, key=lambda x: x['total_playtime'])
-    else: 
-        sorted_playtimes = []
-        for player in playtimes:
-            sessions = self.sldb.get_user_sessions(player['xuid'])
-            if sessions:
-                recent_session = max(sessions, key=lambda s: s['end_time'] or s['start_time'])
-                sorted_playtimes.append({
-                    'name': player['name'],
-                    'xuid': player['xuid'],
-                    'recent_session_start': recent_session['start_time'],
-                    'total_playtime': player['total_playtime']
-                })
-        sorted_playtimes = sorted(sorted_playtimes, key=lambda x: x['recent_session_start'], reverse=True)
-
-    per_page = 10
-    total_pages = ceil(len(sorted_playtimes) / per_page)
+    total_pages = ceil(total_entries / per_page)
     page = max(1, min(page, total_pages))
     start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    page_entries = sorted_playtimes[start_idx:end_idx]
+    page_entries = self.sldb.get_playtime_page(filter_type, per_page, start_idx)
 
     sender.send_message(f"§bActivity List ({filter_type.capitalize()}) - Page {page}/{total_pages}\n")
     for i, entry in enumerate(page_entries, start=start_idx + 1):
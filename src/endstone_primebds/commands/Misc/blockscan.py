@@ -26,8 +26,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         self.blockscan_intervals = {}
 
     if player_name in self.blockscan_intervals:
-        self.server.scheduler.cancel_task(self.blockscan_intervals[player_name])
-        del self.blockscan_intervals[player_name]
+        self.blockscan_intervals.pop(player_name).cancel()
         sender.send_message("§cBlock scanning disabled")
         return True
 
@@ -46,10 +45,8 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     def scan_interval(player_name: str):
         player = self.server.get_player(player_name)
         if not player:
-            if player_name in self.blockscan_intervals:
-                self.server.scheduler.cancel_task(self.blockscan_intervals[player_name])
-                del self.blockscan_intervals[player_name]
-            return
+            self.blockscan_intervals.pop(player_name, None)
+            return True
 
         dim = player.dimension
         loc = player.location
@@ -104,23 +101,18 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         else:
             player.send_tip("§cNo block in sight")
 
-    task = self.server.scheduler.run_task(
-        self,
+    self.blockscan_intervals[player_name] = self.tick_scheduler.schedule(
         lambda: scan_interval(player_name),
-        delay=0,
-        period=4
+        period=4,
+        name="blockscan",
+        stagger=True
     )
-
-    if task:
-        self.blockscan_intervals[player_name] = task.task_id
-        sender.send_message("§aBlock scanning enabled")
-    else:
-        sender.send_message("§cFailed to start block scanning task")
+    sender.send_message("§aBlock scanning enabled")
 
     return True
 
 def clear_all_blockscan_intervals(self: "PrimeBDS"):
     """Clear all active intervals."""
-    for player_name, task_id in self.blockscan_intervals.items():
-        self.server.scheduler.cancel_task(task_id) 
-    self.blockscan_intervals.clear()
\ No newline at end of file
+    for job in getattr(self, "blockscan_intervals", {}).values():
+        job.cancel()
+    self.blockscan_intervals = {}
\ No newline at end of file
@@ -30,15 +30,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         total_playtime_minutes %= 60
         total_playtime_seconds %= 60
 
-        leaderboard = self.sldb.get_all_playtimes()
-        #print(leaderboard)
-        leaderboard = sorted(leaderboard, key=lambda x: x['total_playtime'], reverse=True)
-
-        player_rank = ""
-        for index, entry in enumerate(leaderboard):
-            if entry['name'] == player_name:
-                player_rank = index + 1
-                break
+        player_rank = self.sldb.get_playtime_rank(player.xuid) or ""
 
         if player_rank:
             rank_suffix = get_rank_suffix(player_rank)
@@ -51,13 +43,12 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         
     elif len(args) == 1 and args[0].lower() == 'true':
         
-        leaderboard = self.sldb.get_all_playtimes()
-        leaderboard = sorted(leaderboard, key=lambda x: x['total_playtime'], reverse=True)
+        leaderboard = self.sldb.get_playtime_page("highest", 10, 0)
 
         sender.send_message(f"§rTop 10 Playtimes on the Server:")
 
         # Show the top 10 players' playtimes
-        for index, entry in enumerate(leaderboard[:10]):
+        for index, entry in enumerate(leaderboard):
             player_name = entry['name']
             total_playtime_seconds = entry['total_playtime']
             total_playtime_minutes = total_playtime_seconds // 60
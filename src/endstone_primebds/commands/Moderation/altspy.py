@@ -1,6 +1,7 @@
 from endstone import Player
 from endstone.command import CommandSender
 from endstone_primebds.utils.command_util import create_command
+from endstone_primebds.utils.logging_util import refresh_spy_subscriptions
 
 from typing import TYPE_CHECKING
 
@@ -34,5 +35,5 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         self.db.update_user_data(sender.name, "enabled_as", new_status)
         sender.send_message(f"§6Alt Spy has been {f'§aEnabled' if new_status == 1 else f'§cDisabled'}")
 
-    
+    refresh_spy_subscriptions(self, sender)
     return True
@@ -8,7 +8,7 @@ from endstone_primebds.utils.command_util import create_command
 from endstone_primebds.utils.logging_util import log
 from endstone_primebds.utils.mod_util import format_time_remaining, ban_message, safe_duration
 from datetime import timedelta, datetime
-from endstone_primebds.utils.address_util import is_valid_ip
+from endstone_primebds.utils.address_util import is_valid_ip, is_valid_cidr, in_network
 
 from typing import TYPE_CHECKING
 
@@ -40,7 +40,8 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     if len(args) > 1 and args[1].lower() == "ip":
         ip = args[0]
 
-        if not is_valid_ip(ip):
+        is_cidr = is_valid_cidr(ip)
+        if not (is_cidr or is_valid_ip(ip)):
             sender.send_message(f"§6Not a valid IP address")
             return False
 
@@ -54,7 +55,9 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
 
         full_ip = ip
         for player in self.server.online_players:
-            if player.address.hostname == ip:
+            if is_cidr and in_network(player.address.hostname, ip):
+                player.kick(message)
+            elif player.address.hostname == ip:
                 full_ip = str(player.address)
                 player.kick(message)
 
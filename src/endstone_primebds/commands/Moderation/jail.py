@@ -7,7 +7,6 @@ from endstone_primebds.utils.command_util import create_command
 from endstone import GameMode
 from endstone.inventory import ItemStack
 
-from endstone_primebds.handlers.intervals import start_jail_check_if_needed
 from endstone_primebds.utils.logging_util import log
 from endstone_primebds.utils.mod_util import format_time_remaining, safe_duration
 from datetime import timedelta, datetime
@@ -176,6 +175,4 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     log(self,
             f"§6Player §e{player_name} §6was jailed by §e{sender.name} for §e\"{reason}\" until §e{formatted_expiration}",
             "mod")
-    
-    start_jail_check_if_needed(self)
     return True
@@ -5,7 +5,7 @@ except ImportError:
     BlockCommandSender = None 
 from endstone_primebds.utils.command_util import create_command
 from endstone_primebds.utils.logging_util import log
-from endstone_primebds.utils.address_util import is_valid_ip
+from endstone_primebds.utils.address_util import is_valid_ip, is_valid_cidr
 
 from typing import TYPE_CHECKING
 
@@ -43,7 +43,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             return False
 
         ip = args[0]
-        if not is_valid_ip(ip):
+        if not (is_valid_cidr(ip) or is_valid_ip(ip)):
             sender.send_message(f"§6Not a valid IP address")
             return False
 
@@ -5,7 +5,6 @@ try:
 except ImportError:
     BlockCommandSender = None 
 from endstone_primebds.utils.command_util import create_command
-from endstone_primebds.handlers.intervals import stop_jail_check_if_not_needed
 from endstone.level import Location
 from endstone import GameMode
 
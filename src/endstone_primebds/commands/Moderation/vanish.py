@@ -32,14 +32,13 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         sender.send_message("§cVanish is disabled due to missing protocol library")
         return False
 
-    user = self.db.get_online_user(sender.xuid)
+    user = self.db.get_online_state(sender.xuid)
     if user is None:
         sender.send_message("§6User not found in database")
         return False
 
     new_vanish_status = 0 if user.is_vanish else 1
     self.db.update_user_data(sender.name, "is_vanish", new_vanish_status)
-    user.is_vanish = new_vanish_status
     self.vanish_state[sender.unique_id] = bool(new_vanish_status)
 
     sender.send_message(f"§6Vanish {'§aEnabled' if new_vanish_status else '§cDisabled'}")
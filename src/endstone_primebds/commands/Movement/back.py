@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
+    from endstone_primebds.utils.intervals_util import ScheduledJob
 
 command, permission = create_command(
     "back",
@@ -16,7 +17,7 @@ command, permission = create_command(
 
 back_cooldowns: dict[str, float] = {}
 back_delays: dict[str, bool] = {}
-back_tasks: dict[str, int] = {}
+back_tasks: dict[str, "ScheduledJob"] = {}
 
 def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     if not isinstance(sender, Player):
@@ -56,9 +57,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             if sender.location.distance(start_pos) > 0.25:
                 sender.send_message("§cTeleport cancelled because you moved!")
                 back_delays[sender.id] = False
-                task_id = back_tasks.pop(sender.id, None)
-                if task_id:
-                    self.server.scheduler.cancel_task(task_id)
+                back_tasks.pop(sender.id, None)
                 return True
 
             remaining = max(0, delay - (time() - start_time))
@@ -69,15 +68,12 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
                 sender.send_message("§aYou have been warped to your last location!")
                 back_cooldowns[sender.id] = time()
                 back_delays[sender.id] = False
-                task_id = back_tasks.pop(sender.id, None)
-                if task_id:
-                    self.server.scheduler.cancel_task(task_id)
+                back_tasks.pop(sender.id, None)
                 return True
 
             return False
 
-        task = self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
-        back_tasks[sender.id] = task.task_id
+        back_tasks[sender.id] = self.tick_scheduler.schedule(repeated_check, period=20, name="back_delay", stagger=True)
 
     else:
         sender.teleport(pos)
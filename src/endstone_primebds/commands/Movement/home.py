@@ -89,7 +89,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
                     except ValueError:
                         continue
 
-        homes = self.serverdb.get_all_homes(self.server, username=sender.name, xuid=sender.xuid)
+        homes = self.serverdb.get_home_names(username=sender.name, xuid=sender.xuid)
         if len(homes) >= max_homes:
             sender.send_message(f"§cYou can only have {max_homes} homes")
             return True
@@ -102,12 +102,12 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         return True
 
     if sub == "list":
-        homes = self.serverdb.get_all_homes(self.server, username=sender.name, xuid=sender.xuid)
+        homes = self.serverdb.get_home_names(username=sender.name, xuid=sender.xuid)
         if not homes:
             sender.send_message("§cYou have no homes set")
             return True
 
-        msg_lines = [f"§7- §b{name}" for name in homes.keys()]
+        msg_lines = [f"§7- §b{name}" for name in homes]
         sender.send_message("§aYour homes:\n" + "\n".join(msg_lines))
         return True
 
@@ -141,7 +141,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
                 sender.send_popup(f"§aWarping to §e{name} §ain {remaining:.1f}s")
                 return False
 
-            self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
+            self.tick_scheduler.schedule(repeated_check, period=20, name="home_delay", stagger=True)
         else:
             sender.teleport(home["pos"])
             sender.send_message(f"§aWarped to §e{name}")
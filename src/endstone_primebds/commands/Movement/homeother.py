@@ -111,7 +111,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
                 sender.send_popup(f"§aWarping to §e{target_username}'s {name} §7in {remaining:.1f}s")
                 return False
 
-            self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
+            self.tick_scheduler.schedule(repeated_check, period=20, name="homeother_delay", stagger=True)
         else:
             sender.teleport(home["pos"])
             sender.send_message(f"§aWarped to §e{target_username}'s {name}")
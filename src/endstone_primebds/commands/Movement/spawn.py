@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
+    from endstone_primebds.utils.intervals_util import ScheduledJob
 
 command, permission = create_command(
     "spawn",
@@ -16,7 +17,7 @@ command, permission = create_command(
 
 spawn_cooldowns: dict[str, float] = {}
 spawn_delays: dict[str, bool] = {}
-spawn_tasks: dict[str, int] = {}
+spawn_tasks: dict[str, "ScheduledJob"] = {}
 
 def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     if not isinstance(sender, Player):
@@ -57,9 +58,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             if sender.location.distance(start_pos) > 0.25:
                 sender.send_message("§cTeleport cancelled because you moved!")
                 spawn_delays[sender.id] = False
-                task_id = spawn_tasks.pop(sender.id, None)
-                if task_id:
-                    self.server.scheduler.cancel_task(task_id)
+                spawn_tasks.pop(sender.id, None)
                 return True
             
             remaining = max(0, delay - (time() - start_time))
@@ -70,14 +69,11 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
                 sender.send_message("§aYou have been warped to spawn!")
                 spawn_cooldowns[sender.id] = time()
                 spawn_delays[sender.id] = False
-                task_id = spawn_tasks.pop(sender.id, None)
-                if task_id:
-                    self.server.scheduler.cancel_task(task_id)
+                spawn_tasks.pop(sender.id, None)
                 return True
             return False
 
-        task = self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
-        spawn_tasks[sender.id] = task.task_id
+        spawn_tasks[sender.id] = self.tick_scheduler.schedule(repeated_check, period=20, name="spawn_delay", stagger=True)
 
     else:
         sender.teleport(pos)
@@ -145,7 +145,7 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             sender.send_popup(f"§aWarping to §e{warp_name} §ain {remaining:.1f}s")
             return False
 
-        self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
+        self.tick_scheduler.schedule(repeated_check, period=20, name="warp_delay", stagger=True)
     else:
         sender.teleport(warp["pos"])
         sender.send_message(f"§aWarped to §e{warp_name}")
@@ -282,7 +282,7 @@ def proceed_with_warp(self: "PrimeBDS", player: Player, warp_data: dict, warp_na
             player.send_popup(f"§7Warping to §e{warp_name} §7in {remaining:.1f}s")
             return False
 
-        self.server.scheduler.run_task(self, repeated_check, delay=0, period=20)
+        self.tick_scheduler.schedule(repeated_check, period=20, name="warp_delay", stagger=True)
     else:
         player.teleport(warp_data["pos"])
         player.send_message(f"§aWarped to §e{warp_name}")
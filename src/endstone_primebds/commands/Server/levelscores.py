@@ -8,6 +8,7 @@ from endstone.command import CommandSender
 from endstone.scoreboard import Criteria
 
 from endstone_primebds.utils.command_util import create_command
+from endstone_primebds.utils.scoreboard_restore_util import get_scoreboard_directory
 
 
 if TYPE_CHECKING:
@@ -27,12 +28,19 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
 
     action = args[0]
 
+    # Fold journaled restores into the profile files before touching them
+    self.scoreboard_restores.compact()
+
     if action == "save" and len(args) > 1:
         name = args[1]
-        return save_scoreboard(self, player, name)
+        result = save_scoreboard(self, player, name)
+        self.scoreboard_restores.load()
+        return result
     elif action == "load" and len(args) > 1:
         name = args[1]
-        return load_scoreboard(self, player, name)
+        result = load_scoreboard(self, player, name)
+        self.scoreboard_restores.load()
+        return result
     elif action == "list":
         profiles = list_scoreboard_profiles()
         player.send_message(
@@ -40,7 +48,9 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
         return True
     elif action == "delete" and len(args) > 1:
         name = args[1]
-        return delete_scoreboard(self, player, name)
+        result = delete_scoreboard(self, player, name)
+        self.scoreboard_restores.load()
+        return result
 
     player.send_message(f"Invalid action. Use 'save', 'load', or 'list'.")
     return False
@@ -190,15 +200,3 @@ def delete_scoreboard(self: "PrimeBDS", player, name: str) -> bool:
 def list_scoreboard_profiles() -> List[str]:
     directory = get_scoreboard_directory()
     return [f[:-5] for f in os.listdir(directory) if f.endswith('.json')]
-
-def get_scoreboard_directory() -> str:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    while not (
-        os.path.exists(os.path.join(current_dir, 'plugins')) and
-        os.path.exists(os.path.join(current_dir, 'worlds'))
-    ):
-        current_dir = os.path.dirname(current_dir)
-
-    scoreboard_data_folder = os.path.join(current_dir, 'plugins', 'primebds_data', 'scoreboard_data')
-    os.makedirs(scoreboard_data_folder, exist_ok=True)
-    return scoreboard_data_folder
@@ -1,16 +1,8 @@
-import time
 from endstone import Player, ColorFormat
 from endstone.command import CommandSender
 from endstone_primebds.utils.command_util import create_command
 from typing import TYPE_CHECKING
 
-try:
-    from bedrock_protocol.packets import MinecraftPacketIds
-    PACKET_SUPPORT = True
-except Exception as e:
-    print(e)
-    PACKET_SUPPORT = False
-
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
@@ -18,7 +10,8 @@ if TYPE_CHECKING:
 command, permission = create_command(
     "monitor",
     "Monitor server performance in real time!",
-    ["/monitor (server|packets|disable)[debug: debug]"],
+    ["/monitor (server|packets|database|handlers|scheduler|disable)[debug: debug]",
+     "/monitor (dump)<dump: monitor_dump> (json|csv)[format: dump_format]"],
     ["primebds.command.monitor"]
 )
 
@@ -31,41 +24,46 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
     mode = args[0].lower() if args else "server"
     interval = 1.0
 
+    if mode == "dump":
+        fmt = args[1].lower() if len(args) > 1 else "json"
+        try:
+            path = self.packet_profiler.dump(fmt)
+            handler_path = self.handler_profiler.dump() if self.handler_profiler.stats else None
+        except OSError as e:
+            sender.send_error_message(f"Failed to write profile: {e}")
+            return False
+        sender.send_message(f"§aPacket profile saved to §e{path}")
+        if handler_path:
+            sender.send_message(f"§aHandler profile saved to §e{handler_path}")
+        return True
+
+    if mode == "packets" and not self.packet_profiler.enabled:
+        sender.send_error_message("The packet profiler is disabled in config (modules.profiler.packet_profiler)")
+        return False
+
+    if mode == "handlers" and not self.handler_profiler.enabled:
+        self.handler_profiler.enabled = True
+        if self.handler_dump_task is None:
+            self.start_handler_profile_dumps()
+        sender.send_message("§eHandler profiling was disabled, it is now enabled until the next restart")
+
     if not hasattr(self, "monitor_intervals"):
         self.monitor_intervals = {}
 
     if player_name in self.monitor_intervals:
-        self.server.scheduler.cancel_task(self.monitor_intervals[player_name])
-        del self.monitor_intervals[player_name]
+        self.monitor_intervals.pop(player_name).cancel()
 
         if not args or args[0].lower() == "disable":
-            if len(self.monitor_intervals) == 0:
-                self.packets_sent_count.clear()
-                self.packet_last_sample = {
-                    "time": time.time(),
-                    "counts": {}
-                }
             sender.send_message("§cMonitoring turned off")
             return True
 
         sender.send_message("§ePrevious monitoring canceled, applying new settings...")
 
-    if mode == "packets" and not PACKET_SUPPORT:
-        return False
-    else:
-       PACKET_ID_TO_NAME = {
-            v: k
-            for k, v in MinecraftPacketIds.__dict__.items()
-            if not k.startswith("__") and isinstance(v, int)
-        }
-
     def monitor_interval(player_name, mode=mode):
         player = self.server.get_player(player_name)
         if not player:
-            if player_name in self.monitor_intervals:
-                self.server.scheduler.cancel_task(self.monitor_intervals[player_name])
-                del self.monitor_intervals[player_name]
-            return
+            self.monitor_intervals.pop(player_name, None)
+            return True
 
         if mode == "server":
             overworld = self.server.level.get_dimension("Overworld")
@@ -113,55 +111,108 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
             )
 
         elif mode == "packets":
-            now = time.time()
-            elapsed = now - self.packet_last_sample["time"]
-            if elapsed <= 0:
-                elapsed = 1
+            profiler = self.packet_profiler
+            rows = profiler.window_rows("send") + profiler.window_rows("receive")
+            rows.sort(key=lambda row: row["packets_per_second"], reverse=True)
 
             lines = []
-            for pid, count in self.packets_sent_count.items():
-                prev = self.packet_last_sample["counts"].get(pid, 0)
-                diff = count - prev
-                pps = diff / elapsed
+            for row in rows[:10]:
+                arrow = "§a↑" if row["direction"] == "send" else "§b↓"
+                cancel_str = f" §c{row['cancel_rate'] * 100:.0f}%§7 cx" if row["cancelled"] else ""
+                lines.append(
+                    f"{arrow} §r{row['name']} §7({row['id']}): §a{row['packets_per_second']:.1f} §7P/S "
+                    f"§e{row['bytes_per_second'] / 1024:.1f} §7KB/s §d{row['avg_handler_us']:.1f}§7µs{cancel_str}"
+                )
+
+            # Always show 10 lines (fill with blanks if fewer)
+            while len(lines) < 10:
+                lines.append(" ")
 
-                if pps > 0: 
-                    name = PACKET_ID_TO_NAME.get(pid, "Unknown")
-                    lines.append(f"§r{name} §7({pid}): §a{pps:.1f} §7P/S")
+            handler_ms = sum(row["handler_ms_per_second"] for row in rows)
+            saved_kb = sum(row["saved_bytes_per_second"] for row in rows) / 1024
 
-            # Sort by P/S and limit to 10
-            lines.sort(key=lambda l: float(l.split("§a")[1].split()[0]), reverse=True)
-            lines = lines[:10]
+            player.send_tip(
+                f"§bPacket Monitor §7({profiler.window_seconds}s window)§r\n"
+                f"§r-------------------\n"
+                f"{chr(10).join(lines)}\n"
+                f"§r-------------------\n"
+                f"§rFilters: §d{handler_ms:.2f}§7ms/s §r| Saved: §a{saved_kb:.1f}§7KB/s"
+            )
+
+        elif mode == "handlers":
+            rows = self.handler_profiler.rows()
+
+            lines = []
+            for row in rows[:10]:
+                error_str = f" §c{row['errors']}§7 err" if row["errors"] else ""
+                lines.append(
+                    f"§r{row['event']}: §a{row['count']} §7calls §d{row['total_ms']:.1f}§7ms "
+                    f"§7p50 §e{row['p50_us']:.0f} §7p95 §e{row['p95_us']:.0f} §7p99 §6{row['p99_us']:.0f} "
+                    f"§7max §c{row['max_us']:.0f}§7µs{error_str}"
+                )
 
-            # Always show 10 lines (fill with blanks if fewer)
             while len(lines) < 10:
                 lines.append(" ")
 
+            errors = sum(row["errors"] for row in rows)
             player.send_tip(
-                f"§bPacket Monitor§r\n"
+                f"§bHandler Monitor§r\n"
                 f"§r-------------------\n"
                 f"{chr(10).join(lines)}\n"
-                f"§r-------------------"
+                f"§r-------------------\n"
+                f"§rEvents: §a{len(rows)} §r| Errors: §c{errors}"
+            )
+
+        elif mode == "scheduler":
+            scheduler = self.tick_scheduler
+            rows = scheduler.rows()
+
+            lines = []
+            for row in rows[:10]:
+                error_str = f" §c{row['errors']}§7 err" if row["errors"] else ""
+                deferred_str = f" §6{row['deferred']}§7 deferred" if row["deferred"] else ""
+                lines.append(
+                    f"§r{row['job']}: §a{row['runs']} §7runs §d{row['total_ms']:.1f}§7ms "
+                    f"§7avg §e{row['avg_us']:.0f} §7max §c{row['max_us']:.0f}§7µs{deferred_str}{error_str}"
+                )
+
+            while len(lines) < 10:
+                lines.append(" ")
+
+            player.send_tip(
+                f"§bScheduler Monitor§r\n"
+                f"§r-------------------\n"
+                f"{chr(10).join(lines)}\n"
+                f"§r-------------------\n"
+                f"§rTick: §a{scheduler.tick} §r| Pending: §e{scheduler.pending_count()} §r| Cap: §e{scheduler.max_jobs_per_tick}§7/tick"
             )
 
-            # Reset counters
-            self.packet_last_sample = {
-                "time": time.time(),
-                "counts": {}
-            }
-            self.packets_sent_count.clear()
+        elif mode == "database":
+            lines = []
+            for label, db in (("users", self.db), ("sessions", self.sldb), ("server", self.serverdb)):
+                stats = db.get_pool_stats()
+                rate_color = ColorFormat.GREEN if stats["hit_rate"] >= 0.9 else ColorFormat.YELLOW if stats["hit_rate"] >= 0.5 else ColorFormat.RED
+                lines.append(
+                    f"§r{label}: {rate_color}{stats['hit_rate'] * 100:.1f}% §7hit "
+                    f"§7({stats['hits']}/{stats['hits'] + stats['misses']})\n"
+                    f"§7  conns: §a{stats['open']}§7/{stats['max']} §7| overflow: §e{stats['overflows']} "
+                    f"§7| queued: §e{stats['queued_writes']}"
+                )
 
-    task = self.server.scheduler.run_task(
-        self,
+            player.send_tip(
+                f"§bDatabase Monitor§r\n"
+                f"§r-------------------\n"
+                f"{chr(10).join(lines)}\n"
+                f"§r-------------------"
+            )
+
+    self.monitor_intervals[player_name] = self.tick_scheduler.schedule(
         lambda: monitor_interval(player_name, mode),
-        delay=0,
-        period=int(interval * 20)
+        period=int(interval * 20),
+        name="monitor",
+        stagger=True
     )
-
-    if task:
-        self.monitor_intervals[player_name] = task.task_id
-        sender.send_message(f"§aMonitoring turned on with {interval:.1f}s interval ({mode} mode)")
-    else:
-        sender.send_error_message("Failed to start monitoring task.")
+    sender.send_message(f"§aMonitoring turned on with {interval:.1f}s interval ({mode} mode)")
 
     return True
 
@@ -170,6 +221,6 @@ def get_ping_color(ping: int) -> str:
 
 def clear_all_monitor_intervals(self: "PrimeBDS"):
     """Clear all active intervals."""
-    for player_name, task_id in self.monitor_intervals.items():
-        self.server.scheduler.cancel_task(task_id) 
-    self.monitor_intervals.clear()
+    for job in getattr(self, "monitor_intervals", {}).values():
+        job.cancel()
+    self.monitor_intervals = {}
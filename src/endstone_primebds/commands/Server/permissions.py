@@ -4,6 +4,7 @@ try:
 except ImportError:
     BlockCommandSender = None 
 from endstone_primebds.utils.command_util import create_command
+import endstone_primebds.utils.internal_permissions_util as perms_util
 
 from typing import TYPE_CHECKING
 
@@ -64,4 +65,5 @@ def handler(self: "PrimeBDS", sender: CommandSender, args: list[str]) -> bool:
 
         sender.send_message(f"§e{permission} §bpermission for §e{target} §bwas set to §7neutral")
 
+    perms_util.invalidate_perm_cache(user.xuid)
     return True
\ No newline at end of file
@@ -336,7 +336,7 @@ def open_module_editor(player: Player, module_name: str, settings: dict, config:
 
                 if updated:
                     player.send_message(f"§aUpdated values for {format_label(module_name)}")
-                    if module_name == "permissions_manager" or module_name == "afk":
+                    if module_name == "permissions_manager":
                         player.send_message(f"§cThis module requires a §e/reload §cto apply changes")
 
                 if subkeys:
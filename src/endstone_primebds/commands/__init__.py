@@ -67,7 +67,9 @@ def preload_settings():
             "connection_logs": OrderedDict({
                 "enabled": False,
                 "webhook": ""
-            })
+            }),
+            "queue_size": 500,
+            "overflow_policy": "summarize"
         }),
         "spectator_check": OrderedDict({
             "check_gamemode": True,
@@ -143,6 +145,26 @@ def preload_settings():
                 })
             })
         }),
+        "database": OrderedDict({
+            "write_flush_interval": 0.5,
+            "write_max_batch": 256,
+            "read_pool_size": 8,
+            "read_mmap_size": 67108864,
+            "read_cache_size_kb": 8192,
+            "inventory_autosave_seconds": 300,
+            "inventory_autosave_batch": 4
+        }),
+        "scheduler": OrderedDict({
+            "max_jobs_per_tick": 64,
+            "tick_budget_ms": 5.0
+        }),
+        "profiler": OrderedDict({
+            "packet_profiler": True,
+            "window_seconds": 10,
+            "byte_sample_rate": 16,
+            "handler_profiler": False,
+            "dump_interval_seconds": 300
+        }),
         "multiworld": OrderedDict({
             "worlds": OrderedDict({
                 "example": OrderedDict({
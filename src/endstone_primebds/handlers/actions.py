@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 
 from endstone.event import PlayerGameModeChangeEvent, PlayerInteractActorEvent, PlayerTeleportEvent, PlayerDeathEvent
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.config_util import get_config_snapshot
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
@@ -10,21 +10,19 @@ def handle_gamemode_event(self: "PrimeBDS", ev: PlayerGameModeChangeEvent):
     self.db.update_user_data(ev.player.name, "gamemode", ev.new_game_mode.value)
 
 def handle_teleport_event(self: "PrimeBDS", ev: PlayerTeleportEvent):
-    config = load_config()
-    teleports = config["modules"]["back"]["save_unnatural_teleports"]
-    if teleports:
+    if get_config_snapshot().modules.back.save_unnatural_teleports:
         self.serverdb.set_last_warp(ev.from_location, ev.player.xuid, ev.player.name)
     return
 
 def handle_death_event(self: "PrimeBDS", ev: PlayerDeathEvent):
-    config = load_config()
-    deaths = config["modules"]["back"]["save_death_locations"]
-    if deaths:
+    if get_config_snapshot().modules.back.save_death_locations:
         self.serverdb.set_last_warp(ev.player.location, ev.player.xuid, ev.player.name)
     return
 
 def handle_interact_event(self: "PrimeBDS", ev: PlayerInteractActorEvent):
-    if self.db.get_mod_log(ev.player.xuid).is_jailed:
+    self.afk_tracker.touch(ev.player.xuid)
+    state = self.db.get_online_state(ev.player.xuid)
+    if state is not None and state.is_jailed:
         ev.is_cancelled = True
     elif not self.gamerules.get("can_interact", 1):
         ev.is_cancelled = True
@@ -3,7 +3,7 @@ from time import time
 
 from endstone.event import PlayerChatEvent
 import endstone_primebds.utils.internal_permissions_util as perms_util
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.config_util import get_config_snapshot
 from endstone_primebds.utils.mod_util import format_time_remaining
 from endstone_primebds.utils.logging_util import discordRelay
 
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
 def handle_chat_event(self: "PrimeBDS", ev: PlayerChatEvent):
+    self.afk_tracker.touch(ev.player.xuid)
     user_muted = self.db.check_and_update_mute(ev.player.xuid, ev.player.name)
     ip_muted, ip_mute_time, ip_mute_reason = self.db.check_ip_mute(str(ev.player.address))
     if self.globalmute == 1 and not ev.player.has_permission("primebds.globalmute.exempt"):
@@ -24,10 +25,10 @@ def handle_chat_event(self: "PrimeBDS", ev: PlayerChatEvent):
 
     if user_muted or ip_muted:
         if user_muted:
-            user_mod = self.db.get_mod_log(ev.player.xuid)
+            user_mute = self.db.punishments.get_mute(ev.player.xuid)
             ev.player.send_message(f"""§6You are currently muted.
-§6Expires: §e{format_time_remaining(user_mod.mute_time)}
-§6Reason: §e{user_mod.mute_reason}""")
+§6Expires: §e{format_time_remaining(user_mute.expires)}
+§6Reason: §e{user_mute.reason}""")
         else:
             ev.player.send_message(f"""§6You are currently muted.
 §6Expires: §e{format_time_remaining(ip_mute_time)}
@@ -35,18 +36,18 @@ def handle_chat_event(self: "PrimeBDS", ev: PlayerChatEvent):
         ev.is_cancelled = True
         return False
     
-    config = load_config()
-    user = self.db.get_online_user(ev.player.xuid)
+    server_messages = get_config_snapshot().modules.server_messages
+    user = self.db.get_online_state(ev.player.xuid)
 
     if user.enabled_sc:
         safe_message = ev.message.replace("{", "{{").replace("}", "}}")
-        message = f"{config['modules']['server_messages']['staff_chat_prefix']}§e{ev.player.name}§7: §6{safe_message}"
+        message = f"{server_messages.staff_chat_prefix}§e{ev.player.name}§7: §6{safe_message}"
         self.server.broadcast(message, "primebds.command.staffchat")
         ev.is_cancelled = True
         return False
     
-    enhanced_chat = config["modules"]["server_messages"]["enhanced_chat"]
-    chat_cooldown = config["modules"]["server_messages"]["chat_cooldown"]
+    enhanced_chat = server_messages.enhanced_chat
+    chat_cooldown = server_messages.chat_cooldown
 
     current_time = time()
     last_chat_time = self.chat_cooldown.get(ev.player.id, 0)
@@ -67,7 +68,7 @@ def handle_chat_event(self: "PrimeBDS", ev: PlayerChatEvent):
         suffix = escape_braces(perms_util.get_suffix(user.internal_rank, perms_util.PERMISSIONS))
         name_tag = escape_braces(ev.player.name_tag)
         safe_msg = escape_braces(ev.message)
-        chat_prefix = escape_braces(config['modules']['server_messages']['chat_prefix'])
+        chat_prefix = escape_braces(server_messages.chat_prefix)
         ev.format = f"{prefix}{name_tag}{suffix}{chat_prefix}§r{safe_msg}"
 
     discordRelay(f"**{ev.player.name}**: {ev.message}", "chat")
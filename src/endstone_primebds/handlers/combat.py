@@ -3,19 +3,16 @@ from time import time
 
 from endstone import Player
 from endstone._internal.endstone_python import Vector
-from endstone.event import ActorDamageEvent, ActorKnockbackEvent
+from endstone.event import ActorDamageEvent, ActorKnockbackEvent, ActorRemoveEvent
 
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.combat_util import get_combat_profile
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
 def handle_damage_event(self: "PrimeBDS", ev: ActorDamageEvent):
-    config = load_config()
     entity = ev.actor
-    entity_key = f"{entity.type}:{entity.id}"
     current_time = time()
-    last_hit_time = self.entity_damage_cooldowns.get(entity_key, 0)
 
     damage_source = getattr(ev, "damage_source", None)
     damage_type = getattr(damage_source, "type", None) if damage_source else None
@@ -29,64 +26,61 @@ def handle_damage_event(self: "PrimeBDS", ev: ActorDamageEvent):
             ev.is_cancelled = True
             return
 
-    modifier = get_custom_tag(config, source_actor_tags, "base_damage")
-    kb_cooldown = get_custom_tag(config, source_actor_tags, "hit_cooldown_in_seconds")
-    fall_damage_height = get_custom_tag(config, source_actor_tags, "fall_damage_height")
-    disable_fire_dmg = get_custom_tag(config, source_actor_tags, "disable_fire_damage")
-    disable_explosion_dmg = get_custom_tag(config, source_actor_tags, "disable_explosion_damage")
+    profile = get_combat_profile(source_actor_tags)
 
     if damage_type:
-        if disable_fire_dmg and damage_type in ("fire_tick", "fire", "lava"):
+        if profile.disable_fire_damage and damage_type in ("fire_tick", "fire", "lava"):
             ev.is_cancelled = True
             return
-        if disable_explosion_dmg and damage_type == "entity_explosive":
+        if profile.disable_explosion_damage and damage_type == "entity_explosive":
             ev.is_cancelled = True
             return
 
+    fall_damage_height = profile.fall_damage_height
     if damage_type == "fall" and fall_damage_height != 3.5 and ev.damage * 2 < fall_damage_height:
         ev.is_cancelled = True
         return
 
+    modifier = profile.base_damage
     if modifier != 1:
         ev.damage += modifier
 
-    self.entity_last_hit[entity_key] = damage_type
-    if current_time - last_hit_time < kb_cooldown and damage_type == "entity_attack":
+    hit_state = self.hit_states.get(entity.id)
+    hit_state.last_hit_type = damage_type
+    if current_time - hit_state.cooldown_hit < profile.hit_cooldown and damage_type == "entity_attack":
         ev.is_cancelled = True
 
 def handle_kb_event(self: "PrimeBDS", ev: ActorKnockbackEvent):
 
-    config = load_config()
     source = ev.source
     source_player = self.server.get_player(source.name) if hasattr(source, "name") and source.name else None
-    entity_key = f"{ev.actor.type}:{ev.actor.id}"
-    last_hit_type = self.entity_last_hit.get(entity_key)
-    tags = getattr(source_player, "scoreboard_tags", [])
+    hit_state = self.hit_states.get(ev.actor.id)
+    last_hit_type = hit_state.last_hit_type
+    profile = get_combat_profile(getattr(source_player, "scoreboard_tags", []))
 
     source_actor_tags = getattr(getattr(source, "actor", None), "scoreboard_tags", []) or []
-    kb_cooldown = get_custom_tag(config, source_actor_tags, "hit_cooldown_in_seconds")
+    kb_cooldown = get_combat_profile(source_actor_tags).hit_cooldown
     current_time = time()
-    last_hit_time = self.entity_damage_cooldowns.get(entity_key, 0)
-    last_enchant_hit_time = self.entity_enchant_hit.get(entity_key, 0)
+    last_hit_time = hit_state.cooldown_hit
 
     if current_time - last_hit_time >= kb_cooldown and last_hit_type == "entity_attack":
-        self.entity_damage_cooldowns[entity_key] = current_time
+        hit_state.cooldown_hit = current_time
     elif current_time - last_hit_time < kb_cooldown and last_hit_type == "entity_attack":
         held_item = source_player.inventory.item_in_main_hand
         if held_item:
             kb_lvl = held_item.item_meta.get_enchant_level("knockback") 
-            if kb_lvl > 0 and current_time - last_enchant_hit_time >= kb_cooldown:
-                self.entity_enchant_hit[entity_key] = last_hit_time
-                self.entity_last_hit[entity_key] = None
+            if kb_lvl > 0 and current_time - hit_state.enchant_hit >= kb_cooldown:
+                hit_state.enchant_hit = last_hit_time
+                hit_state.last_hit_type = None
                 return
             else:
-                self.entity_last_hit[entity_key] = None
+                hit_state.last_hit_type = None
         ev.is_cancelled = True
         return
     
     if last_hit_type == "projectile":
-        horizontal_proj_kb = get_custom_tag(config, tags, "projectiles.horizontal_knockback_modifier")
-        vertical_proj_kb = get_custom_tag(config, tags, "projectiles.vertical_knockback_modifier")
+        horizontal_proj_kb = profile.projectile_kb_h
+        vertical_proj_kb = profile.projectile_kb_v
 
         if all(
             modifier in (0, None)
@@ -112,11 +106,11 @@ def handle_kb_event(self: "PrimeBDS", ev: ActorKnockbackEvent):
         ev.knockback = Vector(newx, abs(newy), newz)
         return
 
-    kb_h_modifier = get_custom_tag(config, tags, "horizontal_knockback_modifier")
-    kb_v_modifier = get_custom_tag(config, tags, "vertical_knockback_modifier")
-    kb_sprint_h_modifier = get_custom_tag(config, tags, "horizontal_sprint_knockback_modifier")
-    kb_sprint_v_modifier = get_custom_tag(config, tags, "vertical_sprint_knockback_modifier")
-    disable_sprint_hits = get_custom_tag(config, tags, "disable_sprint_hits")
+    kb_h_modifier = profile.kb_h
+    kb_v_modifier = profile.kb_v
+    kb_sprint_h_modifier = profile.kb_sprint_h
+    kb_sprint_v_modifier = profile.kb_sprint_v
+    disable_sprint_hits = profile.disable_sprint_hits
 
     # If all modifiers are 0, skip
     if all(
@@ -157,31 +151,5 @@ def handle_kb_event(self: "PrimeBDS", ev: ActorKnockbackEvent):
 
     ev.knockback = Vector(newx, abs(newy), newz)
 
-def get_custom_tag(config, tags, key):
-    """
-    Returns the custom KB modifiers, prioritizing tag-specific modifiers.
-    Supports dot-separated nested keys (e.g. 'projectiles.horizontal_knockback_modifier').
-    Falls back to global value if no tag match is found.
-    """
-    def deep_get(d, key_path):
-        for k in key_path:
-            if isinstance(d, dict) and k in d:
-                d = d[k]
-            else:
-                return None
-        return d
-
-    key_path = key.split(".")
-
-    # Global/default value
-    default = deep_get(config["modules"]["combat"], key_path)
-
-    tag_mods = config["modules"]["combat"].get("tag_overrides", {})
-    for tag in tags:
-        tag_override = tag_mods.get(tag, {})
-        value = deep_get(tag_override, key_path)
-        if value is not None:
-            return value
-
-    return default
-
+def handle_actor_remove_event(self: "PrimeBDS", ev: ActorRemoveEvent):
+    self.hit_states.discard(ev.actor.id)
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.config_util import get_config_snapshot
 
 from endstone.event import (
     PlayerEmoteEvent,
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
 def handle_emote_event(self: "PrimeBDS", ev: PlayerEmoteEvent):
+    self.afk_tracker.touch(ev.player.xuid)
     if not self.gamerules.get("can_emote", 1):
         ev.is_cancelled = True
     return
@@ -22,8 +23,7 @@ def handle_leaves_decay_event(self: "PrimeBDS", ev: LeavesDecayEvent):
     return
 
 def handle_skin_change_event(self: "PrimeBDS", ev: PlayerSkinChangeEvent):
-    config = load_config()
-    if not config["modules"]["server_messages"]["skin_change_messages"]:
+    if not get_config_snapshot().modules.server_messages.skin_change_messages:
         ev.skin_change_message = ""
     if not self.gamerules.get("can_change_skin", 1):
         ev.is_cancelled = True
@@ -1,225 +1,184 @@
+import time
+
 from endstone import GameMode
 from endstone.level import Location
-from endstone_primebds.utils.config_util import load_config
-
-from endstone_primebds.utils.intervals_util import IntervalManager
+from endstone_primebds.utils.config_util import get_config_snapshot
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
-import threading
-
-def init_intervals(self: "PrimeBDS"):
-    """Actual interval setup, safe to run in its own thread."""
-    setup_intervals(self)
-    start_jail_check_if_needed(self)
-    start_afk_check_if_needed(self)
-
-def setup_intervals(self: "PrimeBDS"):
-    """Prepare system, but don't start it until needed."""
-    self.interval_manager = IntervalManager(self, tick_interval=20)
-    self.interval_manager.add_check(check_jailed)
-    self.interval_manager.add_check(check_afk)
+# Seconds before a failed unjail/unmute/unban is attempted again
+EXPIRY_RETRY_SECONDS = 5
 
 def init_afk_intervals(self: "PrimeBDS"):
-    """Initialize AFK interval system in a separate thread."""
-    def worker():
-        setup_afk_intervals(self)
-        start_afk_check_if_needed(self)
-    t = threading.Thread(target=worker, name="AfkIntervalInit")
-    t.start()
-
-def setup_afk_intervals(self: "PrimeBDS"):
-    """Prepare AFK check system but don't start it until needed."""
-    self.afk_interval_manager = IntervalManager(self, tick_interval=20)
-    self.afk_interval_manager.add_check(check_afk)
+    """Track every online player and start the AFK deadline job."""
+    threshold = get_config_snapshot().modules.afk.idle_threshold
+    for player in self.server.online_players:
+        location = player.location
+        self.afk_tracker.track(player.xuid, player.name, (location.x, location.y, location.z), threshold)
+    self.afk_job = self.tick_scheduler.schedule(lambda: check_afk(self), period=1, name="afk_check")
 
 def check_afk(self: "PrimeBDS"):
-    """Check and handle player AFK states and auto-detection."""
-    config = load_config()
-    auto_detect = config["modules"]["afk"]["constantly_check_afk_status"]
-    idle_threshold = config["modules"]["afk"]["idle_threshold"]
-    broadcast = config["modules"]["afk"]["broadcast_afk_status"]
-
+    """Applies due AFK transitions: players that came back and (if enabled) players whose idle deadline passed."""
+    tracker = self.afk_tracker
+    afk = get_config_snapshot().modules.afk
+
+    # Without movement packets nothing signals an AFK player moving, so sample them once a second
+    if tracker.afk and self.tick_scheduler.tick % 20 == 0:
+        for xuid in tracker.afk - tracker.returning:
+            player = self.server.get_player(tracker.names[xuid])
+            if player:
+                location = player.location
+                tracker.moved(xuid, location.x, location.y, location.z)
+
+    for xuid in tracker.pop_returning():
+        player = self.server.get_player(tracker.names.get(xuid, ""))
+        if not player:
+            continue
+        set_player_afk(self, player, False)
+        msg = f"§e{player.name} is no longer AFK"
+        if afk.broadcast_afk_status:
+            self.server.broadcast_message(msg)
+        else:
+            player.send_message(msg)
+
+    if not afk.constantly_check_afk_status:
+        return
+
+    for xuid in tracker.pop_due(afk.idle_threshold):
+        player = self.server.get_player(tracker.names.get(xuid, ""))
+        if not player:
+            continue
+
+        # Confirm against the live position, which also covers servers without packet support
+        location = player.location
+        tracker.moved(xuid, location.x, location.y, location.z)
+        if tracker.last_active[xuid] + afk.idle_threshold > time.monotonic():
+            tracker.rearm(xuid, afk.idle_threshold)
+            continue
+
+        set_player_afk(self, player, True)
+        msg = f"§e{player.name} is now AFK"
+        if afk.broadcast_afk_status:
+            self.server.broadcast_message(msg)
+        else:
+            player.send_message(msg)
+
+def set_player_afk(self: "PrimeBDS", player, afk: bool):
+    """Stores the AFK flag and updates the tracker, without any messages."""
+    self.db.update_user_data(player.name, "is_afk", int(afk))
+    self.afk_tracker.set_afk(player.xuid, afk, get_config_snapshot().modules.afk.idle_threshold)
+
+def init_punishment_expiry(self: "PrimeBDS"):
+    """Protect or free jailed players already online (e.g. after a reload), then start the expiry job."""
     for player in self.server.online_players:
+        is_jailed, is_expired = self.db.check_jailed(player.xuid)
+        if not is_jailed:
+            continue
+        if not is_expired:
+            self.isgod.add(player.id)
+            continue
         try:
-            row = self.db.execute("SELECT is_afk FROM users WHERE xuid = ?", (player.xuid,)).fetchone()
-            is_afk = bool(row[0]) if row else False
-
-            if player.xuid not in self.afk_cache:
-                self.afk_cache[player.xuid] = {"pos": player.location, "idle_time": 0}
-
-            last_loc = self.afk_cache[player.xuid]["pos"]
-            current_loc = player.location
-
-            dist = current_loc.distance(last_loc)
-
-            if dist >= 0.5:
-                self.afk_cache[player.xuid]["idle_time"] = 0
-
-                if is_afk:
-                    self.db.update_user_data(player.name, "is_afk", 0)
-                    msg = f"§e{player.name} is no longer AFK"
-
-                    if broadcast:
-                        for p in self.server.online_players:
-                            p.send_message(msg)
-                    else:
-                        player.send_message(msg)
-
-                self.afk_cache[player.xuid]["pos"] = current_loc
-                continue
-
-            if auto_detect:
-                self.afk_cache[player.xuid]["idle_time"] += 1
-                idle_time = self.afk_cache[player.xuid]["idle_time"]
-
-                if idle_time >= idle_threshold and not is_afk:
-                    self.db.update_user_data(player.name, "is_afk", 1)
-                    msg = f"§e{player.name} is now AFK"
-
-                    if broadcast:
-                        self.server.broadcast_message(msg)
-                    else:
-                        player.send_message(msg)
-            else:
-                stop_afk_check_if_not_needed(self)
-
-            self.afk_cache[player.xuid]["pos"] = current_loc
-
+            release_from_jail(self, player)
         except Exception as e:
-            print(f"[PrimeBDS] Error in AFK check for {getattr(player, 'name', 'Unknown')}: {e}")
-
-def start_afk_check_if_needed(self: "PrimeBDS"):
-    """Start AFK interval if needed (AFK players or config says to constantly check)."""
-    def main_thread_check():
-        config = load_config()
-        auto_detect = config["modules"]["afk"]["constantly_check_afk_status"]
-
-        row = self.db.execute("SELECT 1 FROM users WHERE is_afk = 1 LIMIT 1").fetchone()
-        any_afk = row is not None
-
-        if any_afk or auto_detect:
-            if not getattr(self.afk_interval_manager, "_task_id", None):
-                self.afk_interval_manager.start()
-
-    self.server.scheduler.run_task(self, main_thread_check, 0)
-
-def stop_afk_check_if_not_needed(self: "PrimeBDS"):
-    """Stop AFK interval if no one is AFK and config doesn't require constant checking."""
-    config = load_config()
-    auto_detect = config["modules"]["afk"]["constantly_check_afk_status"]
-
-    row = self.db.execute("SELECT 1 FROM users WHERE is_afk = 1 LIMIT 1").fetchone()
-    any_afk = row is not None
-
-    if not any_afk and not auto_detect:
-        if getattr(self.afk_interval_manager, "_task_id", None):
-            self.afk_interval_manager.stop()
-
-def init_jail_intervals(self: "PrimeBDS"):
-    """Initialize the jail interval system in a separate thread."""
-    def worker():
-        init_intervals(self)
-
-    t = threading.Thread(target=worker, name="JailIntervalInit")
-    t.start()
-
-def refresh_jail_cache(self: "PrimeBDS", player):
-    """Update jail cache from DB only when needed."""
-    is_jailed, is_expired = self.db.check_jailed(player.xuid)
-    if is_jailed:
-        mod_user = self.db.get_mod_log(player.xuid)
-        self.jail_cache[player.xuid] = {
-            "is_jailed": True,
-            "is_expired": is_expired,
-            "data": mod_user,
-        }
-    else:
-        self.jail_cache[player.xuid] = {"is_jailed": False, "is_expired": False, "data": None}
-
-def start_jail_check_if_needed(self: "PrimeBDS"):
-    """Run this on the main tick scheduler to avoid threading issues."""
-    def main_thread_check():
-        if any(self.db.check_jailed(p.xuid)[0] for p in self.server.online_players):
-            if not getattr(self.interval_manager, "_task_id", None):
-                self.interval_manager.start()
-    self.server.scheduler.run_task(self, main_thread_check, 0)
-
-def stop_jail_check_if_not_needed(self: "PrimeBDS"):
-    """Stop interval if no online player is jailed."""
-    if not any(self.db.check_jailed(p.xuid)[0] for p in self.server.online_players):
-        if getattr(self.interval_manager, "_task_id", None):
-            self.interval_manager.stop()
-
-def check_jailed(self: "PrimeBDS"):
-    """Handle players whose jail time has expired."""
+            print(f"[PrimeBDS] Error releasing {player.name} from jail: {e}")
+
+    self.expiry_job = self.tick_scheduler.schedule(
+        lambda: check_punishment_expiry(self), period=20, name="punishment_expiry"
+    )
+
+def check_punishment_expiry(self: "PrimeBDS"):
+    """Pops every punishment whose expiry passed; an idle heap costs one comparison per run."""
+    now = time.time()
+    for db in (self.db, self.serverdb):
+        for entry in db.punishments.pop_expired(now):
+            # An earlier expiry in this batch (e.g. a mute and its IP mute) may have cleared it
+            if not entry.active:
+                continue
+            try:
+                expire_punishment(self, entry)
+            except Exception as e:
+                print(f"[PrimeBDS] Error expiring {entry.kind} for {entry.name or entry.host or entry.xuid}: {e}")
+                db.punishments.defer(entry, now + EXPIRY_RETRY_SECONDS)
+
+def expire_punishment(self: "PrimeBDS", entry):
+    """Persists the unjail/unmute/unban for an expired index entry."""
+    if entry.kind == "jail":
+        player = get_online_player_by_xuid(self, entry.xuid)
+        if player:
+            release_from_jail(self, player)
+        # Offline players keep their expired entry and are released on join
+    elif entry.kind in ("mute", "ip_mute"):
+        if entry.name:
+            self.db.remove_mute(entry.name)
+        else:
+            self.db.punishments.remove_mute(entry.xuid)
+    elif entry.kind == "ban":
+        if entry.name:
+            self.db.remove_ban(entry.name)
+    elif entry.kind == "ip_ban":
+        self.db.remove_ip_ban(entry.host)
+    elif entry.kind == "name_ban":
+        self.serverdb.remove_name(entry.name)
+
+def get_online_player_by_xuid(self: "PrimeBDS", xuid: str):
+    """The online player with this xuid; the name stored with a punishment may be outdated."""
     for player in self.server.online_players:
-        try:
-            cached = self.jail_cache.get(player.xuid)
-
-            if not cached or (cached["is_jailed"] and cached["is_expired"]):
-                refresh_jail_cache(player)
-                cached = self.jail_cache[player.xuid]
-
-            if cached["is_jailed"] and player.id is not self.isgod:
-                self.isgod.add(player.id)
-
-            if cached["is_jailed"] and cached["is_expired"]:
-                mod_user = cached["data"]
-
-                x, y, z = map(float, mod_user.return_jail_pos.split(","))
-                loc = Location(
-                    self.server.level.get_dimension(mod_user.return_jail_dim),
-                    x, y, z,
-                    player.location.pitch,
-                    player.location.yaw,
-                )
-                player.teleport(loc)
-                player.game_mode = GameMode(int(mod_user.jail_gamemode))
-                self.db.remove_jail(player.name)
-                self.server.dispatch_command(
-                    self.server.command_sender,
-                    f'effect "{player.name}" clear saturation'
-                )
-                player.send_message("§6You were freed from jail, time expired!")
-
-                self.db.load_inventory(player)
-                self.jail_cache[player.xuid] = {"is_jailed": False, "is_expired": False, "data": None}
-
-        except Exception as e:
-            print(f"[PrimeBDS] Error handling player {getattr(player, 'name', 'Unknown')}: {e}")
+        if player.xuid == xuid:
+            return player
+    return None
 
-        stop_jail_check_if_not_needed(self)
+def check_jail_on_join(self: "PrimeBDS", player):
+    """Keeps a joining jailed player protected, or frees them if their jail ran out while offline."""
+    is_jailed, is_expired = self.db.check_jailed(player.xuid)
+    if not is_jailed:
+        return
+    if not is_expired:
+        self.isgod.add(player.id)
+        return
+
+    def release():
+        online = self.server.get_player(player.name)
+        if online and self.db.check_jailed(online.xuid) == (True, True):
+            release_from_jail(self, online)
+    self.tick_scheduler.schedule(release, delay=20, name="jail_release")
+
+def release_from_jail(self: "PrimeBDS", player):
+    """Returns a player to where they were jailed and restores their gamemode and inventory."""
+    mod_user = self.db.get_mod_log(player.xuid)
+
+    if mod_user.return_jail_pos:
+        x, y, z = map(float, mod_user.return_jail_pos.split(","))
+        loc = Location(
+            self.server.level.get_dimension(mod_user.return_jail_dim),
+            x, y, z,
+            player.location.pitch,
+            player.location.yaw,
+        )
+        player.teleport(loc)
+    player.game_mode = GameMode(int(mod_user.jail_gamemode))
+    self.db.remove_jail(player.name)
+    self.server.dispatch_command(
+        self.server.command_sender,
+        f'effect "{player.name}" clear saturation'
+    )
+    player.send_message("§6You were freed from jail, time expired!")
+
+    self.db.load_inventory(player)
 
 def stop_intervals(self: "PrimeBDS"):
     """Stop all periodic checks safely (on shutdown)."""
-    if hasattr(self, "interval_manager"):
-        self.interval_manager.stop()
+    if getattr(self, "expiry_job", None):
+        self.expiry_job.cancel()
+        self.expiry_job = None
+    if getattr(self, "afk_job", None):
+        self.afk_job.cancel()
+        self.afk_job = None
 
 def recheck_all_intervals(self: "PrimeBDS"):
     """
-    Re-evaluate whether AFK and Jail intervals should be running.
+    Re-arm AFK deadlines.
     Call this after config reloads or any mid-game setting changes.
     """
-    config = load_config()
-
-    any_jailed = any(self.db.check_jailed(p.xuid)[0] for p in self.server.online_players)
-
-    if any_jailed:
-        if not getattr(self.interval_manager, "_task_id", None):
-            self.interval_manager.start()
-    else:
-        if getattr(self.interval_manager, "_task_id", None):
-            self.interval_manager.stop()
-
-    auto_detect = config["modules"]["afk"]["constantly_check_afk_status"]
-    any_afk = self.db.execute("SELECT 1 FROM users WHERE is_afk = 1 LIMIT 1").fetchone() is not None
-
-    if any_afk or auto_detect:
-        if not getattr(self.afk_interval_manager, "_task_id", None):
-            self.afk_interval_manager.start()
-    else:
-        if getattr(self.afk_interval_manager, "_task_id", None):
-            self.afk_interval_manager.stop()
+    self.afk_tracker.rearm_all(get_config_snapshot().modules.afk.idle_threshold)
@@ -5,21 +5,23 @@ if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
 def handle_item_pickup_event(self: "PrimeBDS", ev: PlayerPickupItemEvent):
-    user = self.db.get_online_user(ev.player.xuid)
-    if user is not None and (getattr(user, "is_vanish", None) or getattr(user, "is_jailed", None)):
+    state = self.db.get_online_state(ev.player.xuid)
+    if state is not None and (state.is_vanish or state.is_jailed):
         ev.is_cancelled = True
     elif not self.gamerules.get("can_pickup_items", 1):
         ev.is_cancelled = True
     return
 
 def handle_item_use(self: "PrimeBDS", ev: PlayerItemConsumeEvent):
-    user = self.db.get_online_user(ev.player.xuid)
-    if user is not None and (getattr(user, "is_jailed", None)):
+    self.afk_tracker.touch(ev.player.xuid)
+    state = self.db.get_online_state(ev.player.xuid)
+    if state is not None and state.is_jailed:
         ev.is_cancelled = True
     return
 
 def handle_item_drop_event(self: "PrimeBDS", ev: PlayerDropItemEvent):
-    user = self.db.get_online_user(ev.player.xuid)
-    if user is not None and (getattr(user, "is_jailed", None)):
+    self.afk_tracker.touch(ev.player.xuid)
+    state = self.db.get_online_state(ev.player.xuid)
+    if state is not None and state.is_jailed:
         ev.is_cancelled = True
     return
\ No newline at end of file
@@ -1,5 +1,5 @@
 try:
-    from bedrock_protocol.packets import minecraft_packets, MinecraftPacketIds
+    from bedrock_protocol.packets import MinecraftPacketIds
     from endstone_primebds.utils.packet_utils.add_player import (
         cache_add_player_packet,
         extract_player_name_from_addplayer,
@@ -9,124 +9,125 @@ except Exception as e:
     print(e)
     PACKET_SUPPORT = False
 
-from collections import defaultdict
-from ctypes import c_int32
-from binarystream import BinaryStream
+from collections import OrderedDict
+from time import perf_counter_ns
 from endstone.event import PacketSendEvent, PacketReceiveEvent
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.config_util import get_config_snapshot, subscribe_config
+from endstone_primebds.utils.packet_utils.pipeline import PacketFilterPipeline
+from endstone_primebds.utils.packet_utils.reader import (
+    INT64, VEC3, read_varint, read_varuint, skip_varint, skip_string, string_equals, to_int32
+)
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
-config = load_config()
-modules = config.get("modules", {})
-optimizer = modules.get("server_optimizer", {})
-
 SKIN_MAX_SIZE = 2000 * 1024
-mute_sounds = optimizer.get("mute_laggy_sounds", False)
-mute_block_updates = optimizer.get("mute_laggy_block_events", False)
-mute_movement_updates = optimizer.get("mute_laggy_movement_updates", False)
-
-def handle_packetsend_event(self: "PrimeBDS", ev: PacketSendEvent):
-    if not PACKET_SUPPORT:
-        return
-
-    pid = ev.packet_id
-
-    if pid == MinecraftPacketIds.SubclientLogin:
-        handle_subclient_login(self, ev)
-
-    elif pid == MinecraftPacketIds.TileEvent and mute_block_updates:
-        mute_redundant_block_events(self, ev)
 
-    elif pid == MinecraftPacketIds.MovePlayer and mute_movement_updates:
-        mute_redundant_move_events(self, ev)
+# Client movement packets carry the eye position, player.location is at the feet
+PLAYER_EYE_HEIGHT = 1.62
 
-    elif pid == MinecraftPacketIds.AddPlayer:
-        handle_add_player_cache(self, ev)
+send_filters = PacketFilterPipeline()
+receive_filters = PacketFilterPipeline()
 
-    elif pid == MinecraftPacketIds.LevelSoundEvent and mute_sounds:
-        handle_laggy_sounds(self, ev)
+def handle_packetsend_event(self: "PrimeBDS", ev: PacketSendEvent):
+    profiler = self.packet_profiler
+    if not profiler.enabled:
+        send_filters.dispatch(self, ev)
+        return
 
-    if self.monitor_intervals:
-        self.packets_sent_count[pid] = self.packets_sent_count.get(pid, 0) + 1
+    start = perf_counter_ns()
+    payload = send_filters.dispatch(self, ev)
+    end = perf_counter_ns()
+    size = len(payload) if payload is not None else profiler.sampled_size(profiler.sent, ev.packet_id, ev)
+    profiler.record(profiler.sent, ev.packet_id, size, ev.is_cancelled, end - start, end)
 
 def handle_packetreceive_event(self: "PrimeBDS", ev: PacketReceiveEvent):
-    pid = ev.packet_id
-
-    if pid == MinecraftPacketIds.SubclientLogin:
-        handle_subclient_login(self, ev)
+    profiler = self.packet_profiler
+    if not profiler.enabled:
+        receive_filters.dispatch(self, ev)
         return
 
-    elif pid == MinecraftPacketIds.LevelSoundEvent and mute_sounds:
-        handle_laggy_sounds(self, ev)
+    start = perf_counter_ns()
+    payload = receive_filters.dispatch(self, ev)
+    end = perf_counter_ns()
+    size = len(payload) if payload is not None else profiler.sampled_size(profiler.received, ev.packet_id, ev)
+    profiler.record(profiler.received, ev.packet_id, size, ev.is_cancelled, end - start, end)
 
-    if self.monitor_intervals:
-        self.packets_sent_count[pid] = self.packets_sent_count.get(pid, 0) + 1
+def mute_redundant_move_events(self: "PrimeBDS", ev, payload: bytes):
+    # runtime_id (varint64), position + pitch/yaw/head_yaw (6 x f32), mode (u8)
+    offset = skip_varint(payload, 0) + 24
+    if payload[offset] == 2:
+        ev.is_cancelled = True
 
-def mute_redundant_move_events(self: "PrimeBDS", ev):
-    stream = BinaryStream(ev.payload)
+def track_auth_input(self: "PrimeBDS", ev, payload: bytes):
+    # pitch, yaw (2 x f32), position (3 x f32)
+    x, y, z = VEC3.unpack_from(payload, 8)
+    self.afk_tracker.moved(ev.player.xuid, x, y - PLAYER_EYE_HEIGHT, z)
 
-    runtime_id = stream.get_varint()
-    x = stream.get_float()
-    y = stream.get_float()
-    z = stream.get_float()
+def track_move_player(self: "PrimeBDS", ev, payload: bytes):
+    # runtime_id (varint64), position (3 x f32)
+    x, y, z = VEC3.unpack_from(payload, skip_varint(payload, 0))
+    self.afk_tracker.moved(ev.player.xuid, x, y - PLAYER_EYE_HEIGHT, z)
 
-    pitch = stream.get_float()
-    yaw = stream.get_float()
-    head_yaw = stream.get_float()
+# Containers each player has been sent an open event for, oldest first
+MAX_OPEN_CONTAINERS = 32
+open_containers: dict[object, OrderedDict] = {}
 
-    mode = stream.get_unsigned_varint64()
-    if mode == 2:
-        ev.is_cancelled = True
+def pack_block_pos(x: int, y: int, z: int) -> int:
+    return ((x & 0x3FFFFFF) << 38) | ((z & 0x3FFFFFF) << 12) | (y & 0xFFF)
 
-received_open = defaultdict(set)
-def make_key(x: int, y: int, z: int) -> str:
-    return f"{x},{y},{z}"
+def forget_player_packets(player):
+    """Drops per-player packet filter state, called when the player leaves."""
+    open_containers.pop(player.unique_id, None)
 
-def mute_redundant_block_events(self: "PrimeBDS", ev):
-    stream = BinaryStream(ev.payload)
-    x = stream.get_varint()
-    y = c_int32(stream.get_unsigned_varint()).value
-    z = stream.get_varint()
-    type = stream.get_varint()
-    data = stream.get_varint()
+def mute_redundant_block_events(self: "PrimeBDS", ev, payload: bytes):
+    # BlockPos (varint x, varuint y, varint z), event type (varint), event data (varint)
+    x, offset = read_varint(payload, 0)
+    y, offset = read_varuint(payload, offset)
+    z, offset = read_varint(payload, offset)
+    event_type, _ = read_varint(payload, offset)
 
-    if type not in (0, 1):
+    if event_type not in (0, 1):
         return
 
-    uuid = str(ev.player.unique_id)
-    key = make_key(x, y, z)
+    y = to_int32(y)
+    player = ev.player
+    key = pack_block_pos(x, y, z)
 
-    if type == 1:
-        dx = ev.player.location.x - x
-        dy = ev.player.location.y - y
-        dz = ev.player.location.z - z
-        dist = (dx*dx + dy*dy + dz*dz) ** 0.5
+    if event_type == 1:
+        location = player.location
+        dx = location.x - x
+        dy = location.y - y
+        dz = location.z - z
 
-        if dist > 50.0:
+        if dx*dx + dy*dy + dz*dz > 2500.0:
             ev.is_cancelled = True
             return
 
-        received_open[key].add(uuid)
+        opened = open_containers.get(player.unique_id)
+        if opened is None:
+            opened = open_containers[player.unique_id] = OrderedDict()
+        opened[key] = None
+        opened.move_to_end(key)
+        if len(opened) > MAX_OPEN_CONTAINERS:
+            opened.popitem(last=False)
         return
 
-    elif type == 0:
-        if key not in received_open or uuid not in received_open[key]:
-            ev.is_cancelled = True
-            return
-
-        received_open.pop(key, None)
+    opened = open_containers.get(player.unique_id)
+    if opened is None or key not in opened:
+        ev.is_cancelled = True
         return
-    
-def handle_subclient_login(self: "PrimeBDS", ev: PacketSendEvent):
+
+    del opened[key]
+
+def handle_subclient_login(self: "PrimeBDS", ev, payload: bytes = None):
     if not self.gamerules.get("subclient"):
-        if ev.sub_client_id is not 0:
+        if ev.sub_client_id != 0:
             ev.is_cancelled = True
 
-def handle_add_player_cache(self: "PrimeBDS", ev):
-    player_name = extract_player_name_from_addplayer(ev.payload)
+def handle_add_player_cache(self: "PrimeBDS", ev, payload: bytes):
+    player_name = extract_player_name_from_addplayer(payload)
     target_player = self.server.get_player(player_name)
     if not target_player:
         return
@@ -135,23 +136,59 @@ def handle_add_player_cache(self: "PrimeBDS", ev):
     if xuid in self.cached_players:
         return
 
-    cache_add_player_packet(self, target_player, ev.payload)
+    cache_add_player_packet(self, target_player, payload)
     self.cached_players.add(xuid)
 
     if self.vanish_state.get(target_player.unique_id, False):
         ev.is_cancelled = True
     return
 
-def handle_laggy_sounds(self: "PrimeBDS", ev):
-    packet = minecraft_packets.LevelSoundEventPacket()
-    packet.deserialize(ev.payload)
-    sound = packet.sound_type
+PLAYER_ENTITY_TYPE = b"minecraft:player"
+
+def handle_laggy_sounds(self: "PrimeBDS", ev, payload: bytes):
+    # sound type (varuint), position (3 x f32), extra data (varint), entity type (string),
+    # is_baby_mob (bool), is_global_sound (bool), actor_unique_id (i64)
+    sound, offset = read_varuint(payload, 0)
 
     if (sound in (42, 259, 290, 291, 292) or sound >= 566 or sound <= 0):
         ev.is_cancelled = True
         return
 
-    if packet.entity_type == "minecraft:player":
-        if self.vanish_state.get(packet.actor_unique_id, False):
-            ev.is_cancelled = True
-            return
\ No newline at end of file
+    offset = skip_varint(payload, offset + 12)
+    if not string_equals(payload, offset, PLAYER_ENTITY_TYPE):
+        return
+
+    offset = skip_string(payload, offset) + 2
+    actor_unique_id = INT64.unpack_from(payload, offset)[0]
+    if self.vanish_state.get(actor_unique_id, False):
+        ev.is_cancelled = True
+
+def configure_packet_filters(snapshot):
+    """(Re)registers the optimizer filters from the server_optimizer config section."""
+    optimizer = getattr(snapshot.modules, "server_optimizer", None)
+    toggles = (
+        (getattr(optimizer, "mute_laggy_block_events", False),
+         ((send_filters, MinecraftPacketIds.TileEvent, mute_redundant_block_events),)),
+        (getattr(optimizer, "mute_laggy_movement_updates", False),
+         ((send_filters, MinecraftPacketIds.MovePlayer, mute_redundant_move_events),)),
+        (getattr(optimizer, "mute_laggy_sounds", False),
+         ((send_filters, MinecraftPacketIds.LevelSoundEvent, handle_laggy_sounds),
+          (receive_filters, MinecraftPacketIds.LevelSoundEvent, handle_laggy_sounds))),
+    )
+
+    for enabled, filters in toggles:
+        for pipeline, packet_id, func in filters:
+            if enabled:
+                pipeline.register(packet_id, func)
+            else:
+                pipeline.unregister(packet_id, func)
+
+if PACKET_SUPPORT:
+    send_filters.register(MinecraftPacketIds.SubclientLogin, handle_subclient_login)
+    send_filters.register(MinecraftPacketIds.AddPlayer, handle_add_player_cache)
+    receive_filters.register(MinecraftPacketIds.SubclientLogin, handle_subclient_login)
+    receive_filters.register(MinecraftPacketIds.PlayerAuthInput, track_auth_input)
+    receive_filters.register(MinecraftPacketIds.MovePlayer, track_move_player)
+
+    configure_packet_filters(get_config_snapshot())
+    subscribe_config(configure_packet_filters)
@@ -30,6 +30,7 @@ PARSE_COMMANDS = (
 def handle_command_preprocess(self: "PrimeBDS", event: PlayerCommandEvent):
     command = event.command
     player = event.player
+    self.afk_tracker.touch(player.xuid)
 
     try:
         args = shlex.split(command)
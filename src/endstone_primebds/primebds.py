@@ -1,8 +1,9 @@
-from collections import defaultdict
 import os
 import threading
 import time
 import traceback
+from collections import deque
+from typing import Mapping
 from endstone import Player
 from endstone.plugin import Plugin
 from endstone.command import Command, CommandSender
@@ -15,8 +16,16 @@ from endstone_primebds.commands import (
 
 from endstone_primebds.commands.Server.monitor import clear_all_monitor_intervals
 from endstone_primebds.commands.Misc.blockscan import clear_all_blockscan_intervals
-from endstone_primebds.utils.config_util import load_config
+from endstone_primebds.utils.config_util import load_config, check_config_files, subscribe_config, unsubscribe_config, get_config_snapshot, CONFIG_WATCH_INTERVAL_TICKS
 from endstone_primebds.utils.economy_utils import get_eco_link
+from endstone_primebds.utils.webhook_util import dispatcher as webhook_dispatcher
+from endstone_primebds.utils.logging_util import SpySubscribers, refresh_spy_subscriptions
+from endstone_primebds.utils.combat_util import HitStateTable
+from endstone_primebds.utils.packet_utils.profiler import PacketProfiler
+from endstone_primebds.utils.handler_profiler_util import HandlerProfiler, profiled
+from endstone_primebds.utils.scoreboard_restore_util import ScoreboardRestoreIndex
+from endstone_primebds.utils.intervals_util import TickScheduler
+from endstone_primebds.utils.afk_util import AfkTracker
 from endstone_primebds.utils.db_util import UserDB, sessionDB, ServerDB, User, ModLog, ServerData
 import endstone_primebds.utils.internal_permissions_util as perms_util
 
@@ -40,13 +49,13 @@ from endstone.event import (EventPriority, event_handler, PlayerLoginEvent, Play
                             ServerCommandEvent, PlayerCommandEvent, PlayerChatEvent, ActorDamageEvent, ActorKnockbackEvent, PacketSendEvent, PlayerPickupItemEvent, 
                             PlayerGameModeChangeEvent, PlayerInteractActorEvent, PlayerDropItemEvent, PlayerItemConsumeEvent, PacketReceiveEvent,
                             ServerLoadEvent, PlayerKickEvent, PlayerBedEnterEvent, PlayerEmoteEvent, 
-                            LeavesDecayEvent, PlayerSkinChangeEvent, PlayerTeleportEvent, PlayerDeathEvent)
+                            LeavesDecayEvent, PlayerSkinChangeEvent, PlayerTeleportEvent, PlayerDeathEvent, ActorRemoveEvent)
 from endstone_primebds.handlers.chat import handle_chat_event
 from endstone_primebds.handlers.preprocesses import handle_command_preprocess, handle_server_command_preprocess
 from endstone_primebds.handlers.connections import handle_login_event, handle_join_event, handle_leave_event, handle_kick_event
-from endstone_primebds.handlers.combat import handle_kb_event, handle_damage_event
+from endstone_primebds.handlers.combat import handle_kb_event, handle_damage_event, handle_actor_remove_event
 from endstone_primebds.handlers.multiworld import start_additional_servers, stop_additional_servers, is_nested_multiworld_instance
-from endstone_primebds.handlers.intervals import stop_intervals, init_jail_intervals, init_afk_intervals
+from endstone_primebds.handlers.intervals import stop_intervals, init_punishment_expiry, init_afk_intervals, recheck_all_intervals
 from endstone_primebds.handlers.packets import handle_packetsend_event, handle_packetreceive_event
 from endstone_primebds.handlers.actions import handle_gamemode_event, handle_interact_event, handle_teleport_event, handle_death_event
 from endstone_primebds.handlers.items import handle_item_pickup_event, handle_item_use, handle_item_drop_event
@@ -68,16 +77,10 @@ class PrimeBDS(Plugin):
         # Command Controls
         self.monitor_intervals = {}
         self.blockscan_intervals = {}
-        self.packets_sent_count = defaultdict(int)
         self.gamerules = {}
         self.cached_players = set()
         self.vanish_state = {}
-        self.jail_cache = {}
-        self.afk_cache = {}
-        self.packet_last_sample = {
-            "time": time.time(),
-            "counts": {}
-        }
+        self.afk_tracker = AfkTracker()
         self.globalmute = 0
         self.chat_cooldown = {}
         self.silentmutes = set()
@@ -89,10 +92,46 @@ class PrimeBDS(Plugin):
         self.multiworld_ports = {}
         self.multiworld_lock = threading.Lock()
 
+        # Spy Subscribers
+        self.spy_subscribers = SpySubscribers()
+
+        # Permission Attachments
+        self.applied_permissions = {}
+        self.pending_permission_refresh = {}
+        self.permission_refresh_task = None
+
         # Combat Handler
-        self.entity_damage_cooldowns = {}
-        self.entity_last_hit = {}
-        self.entity_enchant_hit = {}
+        self.hit_states = HitStateTable()
+
+        # Tick Scheduler
+        scheduler_config = load_config().get("modules", {}).get("scheduler", {})
+        self.tick_scheduler = TickScheduler(
+            self,
+            max_jobs_per_tick=scheduler_config.get("max_jobs_per_tick", 64),
+            budget_ms=scheduler_config.get("tick_budget_ms", 5.0)
+        )
+
+        # Profiling
+        profiler_config = load_config().get("modules", {}).get("profiler", {})
+        self.packet_profiler = PacketProfiler(
+            enabled=profiler_config.get("packet_profiler", True),
+            window_seconds=profiler_config.get("window_seconds", 10),
+            byte_sample_rate=profiler_config.get("byte_sample_rate", 16)
+        )
+        self.handler_profiler = HandlerProfiler(enabled=profiler_config.get("handler_profiler", False))
+        self.handler_dump_interval = int(profiler_config.get("dump_interval_seconds", 300))
+        self.handler_dump_task = None
+
+        # Config Watcher
+        self.config_watch_task = None
+
+        # Scoreboard Profiles
+        self.scoreboard_restores = ScoreboardRestoreIndex()
+
+        # Inventory Autosave
+        self.inventory_autosave_task = None
+        self.inventory_autosave_queue = deque()
+        self.inventory_autosave_next_round = 0.0
 
         # DB
         self.db = UserDB("users.db")
@@ -101,94 +140,122 @@ class PrimeBDS(Plugin):
 
     # EVENT HANDLER
     @event_handler
+    @profiled
     def on_player_death(self, ev: PlayerDeathEvent):
         handle_death_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_teleport(self, ev: PlayerTeleportEvent):
         handle_teleport_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_bed_enter(self, ev: PlayerBedEnterEvent):
         handle_bed_enter_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_emote(self, ev: PlayerEmoteEvent):
         handle_emote_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_skin_change(self, ev: PlayerSkinChangeEvent):
         handle_skin_change_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_leaf_decay(self, ev: LeavesDecayEvent):
         handle_leaves_decay_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_gamemode(self, ev: PlayerGameModeChangeEvent):
         handle_gamemode_event(self, ev)
 
     @event_handler
+    @profiled
     def on_player_interact(self, ev: PlayerInteractActorEvent):
         handle_interact_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_packet_send(self, ev: PacketSendEvent):
         handle_packetsend_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_packet_receive(self, ev: PacketReceiveEvent):
         handle_packetreceive_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_item_use(self, ev: PlayerItemConsumeEvent):
         handle_item_use(self, ev)
 
     @event_handler()
+    @profiled
     def on_item_pickup(self, ev: PlayerPickupItemEvent):
         handle_item_pickup_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_item_drop(self, ev: PlayerDropItemEvent):
         handle_item_drop_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_entity_hurt(self, ev: ActorDamageEvent):
         handle_damage_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_entity_kb(self, ev: ActorKnockbackEvent):
         handle_kb_event(self, ev)
 
     @event_handler()
+    @profiled
+    def on_actor_remove(self, ev: ActorRemoveEvent):
+        handle_actor_remove_event(self, ev)
+
+    @event_handler()
+    @profiled
     def on_player_login(self, ev: PlayerLoginEvent):
         handle_login_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_player_join(self, ev: PlayerJoinEvent):
         handle_join_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_player_quit(self, ev: PlayerQuitEvent):
         handle_leave_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_player_kick(self, ev: PlayerKickEvent):
         handle_kick_event(self, ev)
 
     @event_handler(priority=EventPriority.HIGHEST)
+    @profiled
     def on_player_command_preprocess(self, ev: PlayerCommandEvent) -> None:
         handle_command_preprocess(self, ev)
 
     @event_handler(priority=EventPriority.HIGHEST)
+    @profiled
     def on_player_server_command_preprocess(self, ev: ServerCommandEvent) -> None:
         handle_server_command_preprocess(self, ev)
 
     @event_handler(priority=EventPriority.HIGHEST)
+    @profiled
     def on_player_chat(self, ev: PlayerChatEvent):
         handle_chat_event(self, ev)
 
     @event_handler()
+    @profiled
     def on_server_load(self, ev: ServerLoadEvent):
 
         eco = get_eco_link(self)
@@ -212,8 +279,10 @@ class PrimeBDS(Plugin):
         self.serverdb.migrate_table("server_info", ServerData)
 
         load_config()
+        self.scoreboard_restores.load()
+        self.tick_scheduler.start()
 
-        init_jail_intervals(self)
+        init_punishment_expiry(self)
         init_afk_intervals(self)
         last_shutdown_time = self.serverdb.get_server_info().last_shutdown_time
         self.last_shutdown_time = last_shutdown_time 
@@ -224,21 +293,96 @@ class PrimeBDS(Plugin):
         self.gamerules = self.serverdb.get_gamerules()
         self.server.scheduler.run_task(self, start_additional_servers(self), 1)
         self.check_for_inactive_sessions()
+        self.start_handler_profile_dumps()
+
+        subscribe_config(self.on_config_change)
+        self.config_watch_task = self.tick_scheduler.schedule(
+            check_config_files, delay=CONFIG_WATCH_INTERVAL_TICKS, period=CONFIG_WATCH_INTERVAL_TICKS, name="config_watch"
+        )
+        self.start_inventory_autosave()
 
     def on_disable(self):
         stop_intervals(self)
         clear_all_blockscan_intervals(self)
         clear_all_monitor_intervals(self)
+        self.stop_handler_profile_dumps()
+        self.stop_inventory_autosave()
+        unsubscribe_config(self.on_config_change)
+        if self.config_watch_task is not None:
+            self.config_watch_task.cancel()
+            self.config_watch_task = None
+        self.tick_scheduler.stop()
         self.db.close_connection()
         self.sldb.close_connection()
 
         self.serverdb.update_server_info("last_shutdown_time", int(time.time()))
         self.serverdb.close_connection()
+        webhook_dispatcher.close(2.0)
 
         if not is_nested_multiworld_instance():
             stop_additional_servers(self)
             return
 
+    def on_config_change(self, snapshot):
+        recheck_all_intervals(self)
+
+    def start_handler_profile_dumps(self):
+        if not self.handler_profiler.enabled or self.handler_dump_interval <= 0:
+            return
+        period = self.handler_dump_interval * 20
+        self.handler_dump_task = self.tick_scheduler.schedule(
+            self.dump_handler_profile, delay=period, period=period, name="handler_profile_dump"
+        )
+
+    def stop_handler_profile_dumps(self):
+        if self.handler_dump_task is not None:
+            self.handler_dump_task.cancel()
+            self.handler_dump_task = None
+        self.dump_handler_profile()
+
+    def dump_handler_profile(self):
+        if not self.handler_profiler.stats:
+            return
+        try:
+            self.handler_profiler.dump()
+        except OSError as e:
+            print(f"[PrimeBDS] Failed to write handler profile: {e}")
+
+    def start_inventory_autosave(self):
+        database = get_config_snapshot().modules.database
+        if int(getattr(database, "inventory_autosave_seconds", 300)) <= 0:
+            return
+        self.inventory_autosave_next_round = time.monotonic() + int(getattr(database, "inventory_autosave_seconds", 300))
+        self.inventory_autosave_task = self.tick_scheduler.schedule(
+            self.autosave_inventories, delay=20, period=20, name="inventory_autosave"
+        )
+
+    def stop_inventory_autosave(self):
+        if self.inventory_autosave_task is not None:
+            self.inventory_autosave_task.cancel()
+            self.inventory_autosave_task = None
+        self.inventory_autosave_queue.clear()
+
+    def autosave_inventories(self):
+        """
+        Persists changed inventories of online players, a few players per second so one
+        pass over the server is spread across the autosave interval instead of one tick.
+        """
+        database = get_config_snapshot().modules.database
+        if not self.inventory_autosave_queue:
+            now = time.monotonic()
+            if now < self.inventory_autosave_next_round:
+                return
+            self.inventory_autosave_next_round = now + int(getattr(database, "inventory_autosave_seconds", 300))
+            self.inventory_autosave_queue.extend(player.name for player in self.server.online_players)
+
+        for _ in range(min(int(getattr(database, "inventory_autosave_batch", 4)), len(self.inventory_autosave_queue))):
+            player = self.server.get_player(self.inventory_autosave_queue.popleft())
+            if not player or self.db.check_jailed(player.xuid)[0]:
+                continue
+            self.db.save_inventory(player, only_if_changed=True)
+            self.db.save_enderchest(player, only_if_changed=True)
+
     def check_for_inactive_sessions(self):
         current_time = int(time.time())
         RELOAD_THRESHOLD = 60  # seconds
@@ -276,111 +420,10 @@ class PrimeBDS(Plugin):
         self.vanish_state[player.unique_id] = bool(user.is_vanish) if user else False
 
         internal_rank = perms_util.check_rank_exists(self, player, user.internal_rank)
-        permissions = perms_util.get_rank_permissions(internal_rank)
         user_permissions = self.db.get_permissions(player.xuid)
-        managed_perms = perms_util.MANAGED_PERMISSIONS_LIST[:]
-
-        linked_groups = [
-            [
-                "primebds.command.permban",
-                "endstone.command.ban",
-            ],
-            [
-                "primebds.command.ipban",
-                "endstone.command.banip"
-            ],
-            [
-                "primebds.command.removeban",
-                "endstone.command.unban",
-                "endstone.command.unbanip",
-            ],
-            [
-                "primebds.command.filterlist",
-                "endstone.command.banlist"
-            ]
-        ]
-
-        final_permissions = {rperm.lower(): False for rperm in managed_perms}
-        for perm, allowed in permissions.items():
-            final_permissions[perm.lower()] = allowed
-        for perm, allowed in user_permissions.items():
-            final_permissions[perm.lower()] = allowed
-
-        linked_permissions = {}
-        for group in linked_groups:
-            seen_true = False
-            seen_false = False
-
-            # Check all permissions in the group for any that already exist
-            for perm in group:
-                if perm in final_permissions:
-                    if final_permissions[perm]:
-                        seen_true = True
-                    else:
-                        seen_false = True
-
-            # Determine what to assign
-            if seen_true:
-                group_value = True
-            elif seen_false:
-                group_value = False
-            else:
-                continue  # none of the group's perms exist yet, skip
-
-            # Apply the decided value to all permissions in the group
-            for perm in group:
-                final_permissions[perm] = group_value
-
-        for base_perm, linked_list in linked_permissions.items():
-            if base_perm in final_permissions:
-                base_value = final_permissions[base_perm]
-                for linked_perm in linked_list:
-                    final_permissions[linked_perm] = base_value
+        permissions, overrides = perms_util.get_permission_attachment(internal_rank, user_permissions)
 
-        to_remove = [
-            attinfo.attachment for attinfo in player.effective_permissions
-            if attinfo.permission == "primebdsoverride"
-        ]
-        for attachment in to_remove:
-            attachment.remove()
-
-        perms_to_apply = list(final_permissions.items())
-        attachment = player.add_attachment(self, "primebdsoverride", True)
-
-        plugin_stars = {}
-        internal = {"minecraft", "minecraft.command", "endstone", "endstone.command"}
-
-        try:
-            for plugin in self.server.plugin_manager.plugins:
-                if plugin.is_enabled:
-                    for perm, value in perms_to_apply:
-                        if perm in internal:
-                            continue
-                        prefix = perm.split(".")[0]
-                        cmd = f"{prefix}.command"
-                        if prefix == perm or cmd == perm:
-                            plugin_stars[prefix] = value
-        except Exception:
-            server_registered = {
-                str(p.name).lower() for p in self.server.plugin_manager.permissions
-            }
-            for perm in server_registered:
-                if perm in internal:
-                    continue
-                prefix = perm.split(".")[0]
-                cmd = f"{prefix}.command"
-                if prefix == perm or cmd == perm:
-                    plugin_stars[prefix] = value
-
-        for perm, value in perms_to_apply:
-            if perm in internal:
-                continue
-
-            prefix = perm.split(".")[0]
-            if prefix in plugin_stars:
-                attachment.set_permission(perm, plugin_stars[prefix])
-            else:
-                attachment.set_permission(perm, value)
+        needs_refresh = self.apply_permission_attachment(player, permissions, overrides)
 
         if (
             user.internal_rank.lower() == "operator"
@@ -388,18 +431,87 @@ class PrimeBDS(Plugin):
             and player.is_valid
         ):
             self.server.dispatch_command(self.server.command_sender, f'op "{user.name}"')
+            needs_refresh = True
         elif (
             user.internal_rank.lower() != "operator"
             and player.is_op
             and player.is_valid
         ):
             self.server.dispatch_command(self.server.command_sender, f'deop "{user.name}"')
+            needs_refresh = True
 
-        player.update_commands()
-        player.recalculate_permissions()
+        if needs_refresh:
+            self.queue_permission_refresh(player)
+        refresh_spy_subscriptions(self, player)
         perms_util.clear_prefix_suffix_cache()
         perms_util.invalidate_perm_cache(player.xuid)
 
+    def apply_permission_attachment(self, player: Player, permissions: Mapping[str, bool],
+                                    overrides: Mapping[str, bool] = None) -> bool:
+        """
+        Pushes only the entries that differ from the last vector applied to the player's
+        override attachment. The rank vector is shared, so only the overrides are kept per
+        player; with the same rank vector as last time only the overrides are compared.
+        Returns True if anything changed.
+        """
+        overrides = overrides or {}
+        applied = self.applied_permissions.get(player.unique_id)
+        if applied is None:
+            to_remove = [
+                attinfo.attachment for attinfo in player.effective_permissions
+                if attinfo.permission == "primebdsoverride"
+            ]
+            for attachment in to_remove:
+                attachment.remove()
+
+            attachment = player.add_attachment(self, "primebdsoverride", True)
+            previous, previous_overrides = {}, {}
+        else:
+            attachment, previous, previous_overrides = applied
+
+        if previous is permissions:
+            perms = previous_overrides.keys() | overrides.keys()
+        else:
+            perms = previous.keys() | permissions.keys() | previous_overrides.keys() | overrides.keys()
+
+        changed = False
+        for perm in perms:
+            old = previous_overrides.get(perm, previous.get(perm))
+            new = overrides.get(perm, permissions.get(perm))
+            if new is None:
+                attachment.unset_permission(perm)
+                changed = True
+            elif old != new:
+                attachment.set_permission(perm, new)
+                changed = True
+
+        self.applied_permissions[player.unique_id] = (attachment, permissions, overrides)
+        return changed or applied is None
+
+    def queue_permission_refresh(self, player: Player):
+        """Batches update_commands/recalculate_permissions to once per player on the next tick."""
+        self.pending_permission_refresh[player.unique_id] = player
+        if self.permission_refresh_task is not None:
+            return
+
+        task = self.server.scheduler.run_task(self, self.flush_permission_refresh, delay=1)
+        if task:
+            self.permission_refresh_task = task.task_id
+        else:
+            self.flush_permission_refresh()
+
+    def flush_permission_refresh(self):
+        self.permission_refresh_task = None
+        pending, self.pending_permission_refresh = self.pending_permission_refresh, {}
+        for player in pending.values():
+            if player.is_valid:
+                player.update_commands()
+                player.recalculate_permissions()
+
+    def forget_permission_state(self, player: Player):
+        self.applied_permissions.pop(player.unique_id, None)
+        self.pending_permission_refresh.pop(player.unique_id, None)
+
     def on_command(self, sender: CommandSender, command: Command, args: list[str]) -> bool:
         """Handle incoming commands dynamically"""
         try:
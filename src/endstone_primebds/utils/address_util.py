@@ -18,6 +18,21 @@ def is_valid_ip(ip: str) -> bool:
     )
     return bool(hostname_regex.match(ip))
 
+def is_valid_cidr(cidr: str) -> bool:
+    if "/" not in cidr:
+        return False
+    try:
+        ipaddress.ip_network(cidr, strict=False)
+        return True
+    except ValueError:
+        return False
+
+def in_network(ip: str, cidr: str) -> bool:
+    try:
+        return ipaddress.ip_address(strip_port(ip)) in ipaddress.ip_network(cidr, strict=False)
+    except ValueError:
+        return False
+
 def is_valid_port(port_str: str) -> bool:
     if not port_str.isdigit():
         return False
@@ -27,6 +42,23 @@ def is_valid_port(port_str: str) -> bool:
 def strip_port(ip_with_port: str) -> str:
             return ip_with_port.split(":")[0] if ip_with_port else ""
 
+def subnet_key(ip: str, subnet_mask: int = 24) -> int | None:
+    """
+    Integer key of an IPv4 address's network (e.g. the /24 of 1.2.3.4 -> 0x010203).
+    Two addresses share a key exactly when same_subnet() matches them.
+    """
+    parts = strip_port(ip).strip().split(".")
+    if len(parts) != 4 or not all(part.isdigit() for part in parts):
+        return None
+
+    value = 0
+    for part in parts:
+        octet = int(part)
+        if octet > 255:
+            return None
+        value = (value << 8) | octet
+    return value >> (32 - subnet_mask)
+
 def same_subnet(ip1: str, ip2: str, subnet_mask: int = 24) -> bool:
     try:
         ip1_clean = strip_port(ip1)
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+from time import monotonic
+from typing import Optional
+
+# Squared distance a player has to move away from their last anchor to count as active
+MOVE_THRESHOLD_SQ = 0.25
+
+class AfkTracker:
+    """
+    In-memory AFK state driven by activity signals.
+
+    Movement packets, chat, commands and interactions call touch()/moved(), which only
+    update a last-active timestamp. Idle deadlines live in a heap holding one live
+    entry per player; an entry that comes due is either re-armed from the newer
+    last-active time or reported as an AFK transition, so polling costs
+    O(transitions) instead of O(players).
+    """
+
+    def __init__(self):
+        self.last_active: dict[str, float] = {}
+        self.names: dict[str, str] = {}
+        self.anchors: dict[str, tuple[float, float, float]] = {}
+        self.afk: set[str] = set()
+        self.returning: set[str] = set()
+        self._heap: list[tuple[float, int, str]] = []
+        self._tokens: dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.last_active)
+
+    def track(self, xuid: str, name: str, position: Optional[tuple[float, float, float]] = None, threshold: float = 300):
+        """Starts tracking a joining player as active."""
+        now = monotonic()
+        self.last_active[xuid] = now
+        self.names[xuid] = name
+        if position is not None:
+            self.anchors[xuid] = position
+        self.afk.discard(xuid)
+        self.returning.discard(xuid)
+        self._arm(xuid, now + threshold)
+
+    def forget(self, xuid: str):
+        self.last_active.pop(xuid, None)
+        self.names.pop(xuid, None)
+        self.anchors.pop(xuid, None)
+        self._tokens.pop(xuid, None)
+        self.afk.discard(xuid)
+        self.returning.discard(xuid)
+        if len(self._heap) > 2 * len(self._tokens) + 64:
+            self._heap = [entry for entry in self._heap if self._tokens.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def touch(self, xuid: str):
+        """Records activity; an AFK player is queued to be marked as returned."""
+        if xuid not in self.last_active:
+            return
+        self.last_active[xuid] = monotonic()
+        if xuid in self.afk:
+            self.returning.add(xuid)
+
+    def moved(self, xuid: str, x: float, y: float, z: float):
+        """Records a position, counting it as activity once it leaves the anchor radius."""
+        anchor = self.anchors.get(xuid)
+        if anchor is not None:
+            dx, dy, dz = x - anchor[0], y - anchor[1], z - anchor[2]
+            if dx * dx + dy * dy + dz * dz < MOVE_THRESHOLD_SQ:
+                return
+        self.anchors[xuid] = (x, y, z)
+        if anchor is not None:
+            self.touch(xuid)
+
+    def set_afk(self, xuid: str, afk: bool, threshold: float = 300):
+        if xuid not in self.last_active:
+            return
+        self.returning.discard(xuid)
+        if afk:
+            self.afk.add(xuid)
+            self._tokens[xuid] = -1
+        else:
+            self.afk.discard(xuid)
+            now = monotonic()
+            self.last_active[xuid] = now
+            self._arm(xuid, now + threshold)
+
+    def pop_due(self, threshold: float, now: float = None) -> list[str]:
+        """Pops players whose idle deadline passed without newer activity."""
+        if now is None:
+            now = monotonic()
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, token, xuid = heapq.heappop(heap)
+            if self._tokens.get(xuid) != token:
+                continue
+            deadline = self.last_active[xuid] + threshold
+            if deadline > now:
+                self._arm(xuid, deadline)
+            else:
+                del self._tokens[xuid]
+                due.append(xuid)
+        return due
+
+    def rearm(self, xuid: str, threshold: float):
+        """Re-arms a player that pop_due reported but who turned out to be active."""
+        if xuid in self.last_active and xuid not in self.afk:
+            self._arm(xuid, self.last_active[xuid] + threshold)
+
+    def rearm_all(self, threshold: float):
+        """Recomputes every deadline, used when the idle threshold changes."""
+        self._heap = []
+        for xuid, last_active in self.last_active.items():
+            if xuid not in self.afk:
+                self._arm(xuid, last_active + threshold)
+
+    def pop_returning(self) -> list[str]:
+        returning = list(self.returning)
+        self.returning.clear()
+        return returning
+
+    def _arm(self, xuid: str, deadline: float):
+        token = next(self._seq)
+        self._tokens[xuid] = token
+        heapq.heappush(self._heap, (deadline, token, xuid))
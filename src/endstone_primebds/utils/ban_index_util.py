@@ -0,0 +1,267 @@
+import heapq
+import ipaddress
+import itertools
+from typing import Optional
+
+def get_host(ip_address: str) -> str:
+    return (ip_address or "").split(':')[0].strip()
+
+def parse_network(host: str):
+    """Returns the network for a CIDR host string (e.g. 10.0.0.0/24), None for plain hosts."""
+    if "/" not in host:
+        return None
+    try:
+        return ipaddress.ip_network(host, strict=False)
+    except ValueError:
+        return None
+
+class Punishment:
+    """A single indexed ban, mute or jail. `active` is cleared when it is replaced or removed."""
+    __slots__ = ("kind", "xuid", "name", "host", "expires", "reason", "active")
+
+    def __init__(self, kind: str, xuid: Optional[str], name: Optional[str], host: Optional[str],
+                 expires: int, reason: str):
+        self.kind = kind
+        self.xuid = xuid
+        self.name = name
+        self.host = host
+        self.expires = expires or 0
+        self.reason = reason
+        self.active = True
+
+class PunishmentIndex:
+    """
+    In-memory index of bans, mutes and jails so login and chat checks never touch SQLite.
+
+    - xuid bans/mutes/jails and name bans are plain dict lookups
+    - IP bans/mutes are keyed by host, one entry per mod_logs row ("row key" = xuid, or
+      the stored ip_address for xuid-less IP bans)
+    - CIDR bans are bucketed by prefix length, so a lookup costs one dict probe per
+      distinct prefix length in use
+    - expiries are kept in a min-heap with lazy deletion, drained by the expiry job
+
+    Lookups return entries even once they have expired so callers can run their usual
+    expiry handling (unban/unmute + punishment log) before the entry is removed.
+    """
+
+    def __init__(self):
+        self.bans: dict[str, Punishment] = {}
+        self.mutes: dict[str, Punishment] = {}
+        self.names: dict[str, Punishment] = {}
+        self.jails: dict[str, Punishment] = {}
+        self.ip_bans: dict[str, dict[str, Punishment]] = {}
+        self.ip_mutes: dict[str, dict[str, Punishment]] = {}
+        self.networks: dict[tuple[int, int], dict] = {}
+        self._row_hosts: dict[str, str] = {}
+        self._heap: list = []
+        self._seq = itertools.count()
+
+    def clear(self):
+        self.__init__()
+
+    def __len__(self) -> int:
+        return (len(self.bans) + len(self.mutes) + len(self.names) + len(self.jails)
+                + sum(len(rows) for rows in self.ip_bans.values())
+                + sum(len(rows) for rows in self.ip_mutes.values()))
+
+    # Internal helpers
+    def _push(self, entry: Punishment):
+        if entry.expires:
+            heapq.heappush(self._heap, (entry.expires, next(self._seq), entry))
+
+    @staticmethod
+    def _retire(entry: Optional[Punishment]):
+        if entry is not None:
+            entry.active = False
+
+    def _set(self, table: dict, key: str, entry: Punishment) -> Punishment:
+        self._retire(table.get(key))
+        table[key] = entry
+        self._push(entry)
+        return entry
+
+    def _add_host_entry(self, table: dict, host: str, row_key: str, entry: Punishment, push: bool = True):
+        rows = table.setdefault(host, {})
+        self._retire(rows.get(row_key))
+        rows[row_key] = entry
+        self._row_hosts[row_key] = host
+        if table is self.ip_bans:
+            network = parse_network(host)
+            if network is not None:
+                self.networks.setdefault((network.version, network.prefixlen), {})[network] = host
+        if push:
+            self._push(entry)
+
+    def _remove_host_entry(self, table: dict, host: str, row_key: str) -> Optional[Punishment]:
+        rows = table.get(host)
+        if not rows:
+            return None
+        entry = rows.pop(row_key, None)
+        self._retire(entry)
+        if not rows:
+            del table[host]
+            if table is self.ip_bans:
+                self._drop_network(host)
+        return entry
+
+    def _drop_network(self, host: str):
+        network = parse_network(host)
+        if network is None:
+            return
+        bucket_key = (network.version, network.prefixlen)
+        bucket = self.networks.get(bucket_key)
+        if bucket is not None:
+            bucket.pop(network, None)
+            if not bucket:
+                del self.networks[bucket_key]
+
+    @staticmethod
+    def _latest(rows: Optional[dict]) -> Optional[Punishment]:
+        if not rows:
+            return None
+        return max(rows.values(), key=lambda entry: entry.expires)
+
+    # Bans
+    def add_ban(self, xuid: str, name: Optional[str], expires: int, reason: str) -> Punishment:
+        return self._set(self.bans, xuid, Punishment("ban", xuid, name, None, expires, reason))
+
+    def remove_ban(self, xuid: Optional[str]) -> Optional[Punishment]:
+        entry = self.bans.pop(xuid, None) if xuid else None
+        self._retire(entry)
+        return entry
+
+    def get_ban(self, xuid: str) -> Optional[Punishment]:
+        return self.bans.get(xuid)
+
+    def add_ip_ban(self, ip: str, row_key: str, xuid: Optional[str], name: Optional[str],
+                   expires: int, reason: str) -> Punishment:
+        host = get_host(ip)
+        entry = Punishment("ip_ban", xuid, name, host, expires, reason)
+        self._add_host_entry(self.ip_bans, host, row_key, entry)
+        return entry
+
+    def remove_ip_ban_row(self, row_key: Optional[str]) -> Optional[Punishment]:
+        host = self._row_hosts.get(row_key) if row_key else None
+        return self._remove_host_entry(self.ip_bans, host, row_key) if host else None
+
+    def remove_ip_bans(self, ip: str) -> list[Punishment]:
+        """Drops every IP ban row on a host (or CIDR) and the xuid bans of those rows."""
+        host = get_host(ip)
+        rows = self.ip_bans.pop(host, None) or {}
+        self._drop_network(host)
+        for entry in rows.values():
+            self._retire(entry)
+            if entry.xuid:
+                self.remove_ban(entry.xuid)
+        return list(rows.values())
+
+    def get_ip_ban(self, ip: str) -> Optional[Punishment]:
+        host = get_host(ip)
+        entry = self._latest(self.ip_bans.get(host))
+        if entry is not None or not self.networks:
+            return entry
+
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return None
+
+        for (version, prefixlen), bucket in self.networks.items():
+            if version != address.version:
+                continue
+            network = ipaddress.ip_network((address, prefixlen), strict=False)
+            network_host = bucket.get(network)
+            if network_host is not None:
+                return self._latest(self.ip_bans.get(network_host))
+        return None
+
+    # Mutes
+    def add_mute(self, xuid: str, name: Optional[str], expires: int, reason: str) -> Punishment:
+        return self._set(self.mutes, xuid, Punishment("mute", xuid, name, None, expires, reason))
+
+    def remove_mute(self, xuid: Optional[str]) -> Optional[Punishment]:
+        entry = self.mutes.pop(xuid, None) if xuid else None
+        self._retire(entry)
+        self.remove_ip_mute_row(xuid)
+        return entry
+
+    def get_mute(self, xuid: str) -> Optional[Punishment]:
+        return self.mutes.get(xuid)
+
+    def add_ip_mute(self, ip: str, row_key: str, xuid: Optional[str], name: Optional[str],
+                    expires: int, reason: str) -> Punishment:
+        host = get_host(ip)
+        entry = Punishment("ip_mute", xuid, name, host, expires, reason)
+        self._add_host_entry(self.ip_mutes, host, row_key, entry)
+        return entry
+
+    def remove_ip_mute_row(self, row_key: Optional[str]) -> Optional[Punishment]:
+        host = self._row_hosts.get(row_key) if row_key else None
+        return self._remove_host_entry(self.ip_mutes, host, row_key) if host else None
+
+    def get_ip_mute(self, ip: str) -> Optional[Punishment]:
+        return self._latest(self.ip_mutes.get(get_host(ip)))
+
+    # Name bans
+    def add_name_ban(self, name: str, expires: int, reason: str) -> Punishment:
+        return self._set(self.names, name, Punishment("name_ban", None, name, None, expires, reason))
+
+    def remove_name_ban(self, name: str) -> Optional[Punishment]:
+        entry = self.names.pop(name, None)
+        self._retire(entry)
+        return entry
+
+    def get_name_ban(self, name: str) -> Optional[Punishment]:
+        return self.names.get(name)
+
+    # Jails
+    def add_jail(self, xuid: str, name: Optional[str], expires: int, reason: str) -> Punishment:
+        return self._set(self.jails, xuid, Punishment("jail", xuid, name, None, expires, reason))
+
+    def remove_jail(self, xuid: Optional[str]) -> Optional[Punishment]:
+        entry = self.jails.pop(xuid, None) if xuid else None
+        self._retire(entry)
+        return entry
+
+    def get_jail(self, xuid: str) -> Optional[Punishment]:
+        return self.jails.get(xuid)
+
+    # Rows
+    def rehost(self, row_key: str, ip: str):
+        """Moves a row's IP ban/mute entries when its stored address changes."""
+        host = get_host(ip)
+        old_host = self._row_hosts.get(row_key)
+        if old_host is None or old_host == host:
+            return
+
+        for table in (self.ip_bans, self.ip_mutes):
+            entry = self._remove_host_entry(table, old_host, row_key)
+            if entry is not None:
+                entry.active = True
+                entry.host = host
+                self._add_host_entry(table, host, row_key, entry, push=False)
+        self._row_hosts[row_key] = host
+
+    # Expiry
+    def next_expiry(self) -> Optional[int]:
+        """Returns the earliest expiry among live entries, or None."""
+        while self._heap and not self._heap[0][2].active:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def defer(self, entry: Punishment, until: float):
+        """Re-queues a popped entry whose expiry handling failed, to be retried at `until`."""
+        if entry.active:
+            heapq.heappush(self._heap, (until, next(self._seq), entry))
+
+    def pop_expired(self, now: float) -> list[Punishment]:
+        """
+        Pops every live entry whose expiry has passed, in expiry order.
+        The entries stay indexed; callers persist the unban/unmute/unjail, which removes them.
+        """
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.active:
+                expired.append(entry)
+        return expired
@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from endstone_primebds.utils.config_util import load_config, subscribe_config
+
+PROFILE_FIELDS = {
+    "hit_cooldown": ("hit_cooldown_in_seconds",),
+    "base_damage": ("base_damage",),
+    "fall_damage_height": ("fall_damage_height",),
+    "disable_fire_damage": ("disable_fire_damage",),
+    "disable_explosion_damage": ("disable_explosion_damage",),
+    "disable_sprint_hits": ("disable_sprint_hits",),
+    "kb_h": ("horizontal_knockback_modifier",),
+    "kb_v": ("vertical_knockback_modifier",),
+    "kb_sprint_h": ("horizontal_sprint_knockback_modifier",),
+    "kb_sprint_v": ("vertical_sprint_knockback_modifier",),
+    "projectile_kb_h": ("projectiles", "horizontal_knockback_modifier"),
+    "projectile_kb_v": ("projectiles", "vertical_knockback_modifier"),
+}
+
+MAX_CACHED_PROFILES = 4096
+
+def deep_get(d, key_path):
+    for k in key_path:
+        if isinstance(d, dict) and k in d:
+            d = d[k]
+        else:
+            return None
+    return d
+
+class CombatProfile:
+    """Combat settings resolved for one set of scoreboard tags."""
+    __slots__ = tuple(PROFILE_FIELDS)
+
+    def __init__(self, combat_config: dict, tags: frozenset):
+        tag_mods = combat_config.get("tag_overrides", {}) or {}
+        overrides = [override for tag, override in tag_mods.items() if tag in tags]
+
+        for field, key_path in PROFILE_FIELDS.items():
+            value = None
+            for override in overrides:
+                value = deep_get(override, key_path)
+                if value is not None:
+                    break
+            if value is None:
+                value = deep_get(combat_config, key_path)
+            setattr(self, field, value)
+
+_profiles: dict[frozenset, CombatProfile] = {}
+
+def clear_combat_profiles(snapshot=None):
+    _profiles.clear()
+
+subscribe_config(clear_combat_profiles)
+
+def get_combat_profile(tags: Optional[Iterable[str]]) -> CombatProfile:
+    """
+    Returns the cached combat profile for a set of scoreboard tags.
+    Tag overrides apply in the order they are declared in config, falling back
+    to the global combat values. The cache is dropped when the config changes.
+    """
+    if len(_profiles) >= MAX_CACHED_PROFILES:
+        _profiles.clear()
+
+    key = frozenset(tags) if tags else frozenset()
+    profile = _profiles.get(key)
+    if profile is None:
+        profile = CombatProfile(load_config()["modules"]["combat"], key)
+        _profiles[key] = profile
+    return profile
+
+class HitState:
+    __slots__ = ("cooldown_hit", "last_hit_type", "enchant_hit")
+
+    def __init__(self):
+        self.cooldown_hit = 0.0
+        self.last_hit_type = None
+        self.enchant_hit = 0.0
+
+class HitStateTable:
+    """Per-actor combat hit state, bounded LRU keyed by runtime id."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._states: OrderedDict[int, HitState] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, actor_id: int) -> HitState:
+        state = self._states.get(actor_id)
+        if state is None:
+            state = HitState()
+            self._states[actor_id] = state
+            if len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(actor_id)
+        return state
+
+    def peek(self, actor_id: int) -> Optional[HitState]:
+        return self._states.get(actor_id)
+
+    def discard(self, actor_id: int):
+        self._states.pop(actor_id, None)
+
+    def clear(self):
+        self._states.clear()
@@ -1,6 +1,10 @@
 import json
+import keyword
 import os
 import copy
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Callable
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 while not (os.path.exists(os.path.join(current_dir, 'plugins')) and os.path.exists(os.path.join(current_dir, 'worlds'))):
@@ -11,6 +15,7 @@ CONFIG_PATH = os.path.join(CONFIG_FOLDER, 'config.json')
 CMD_CONFIG_PATH = os.path.join(CONFIG_FOLDER, 'commands.json')
 PERMISSIONS_PATH = os.path.join(CONFIG_FOLDER, 'permissions.json')
 RULES_PATH = os.path.join(CONFIG_FOLDER, 'rules.txt')
+WATCHED_FILES = (CONFIG_PATH, PERMISSIONS_PATH, CMD_CONFIG_PATH)
 
 os.makedirs(CONFIG_FOLDER, exist_ok=True)
 
@@ -45,6 +50,24 @@ cache = None
 cmd_cache = None
 permissions_cache = None
 rules_cache = None
+config_generation = 0
+permissions_generation = 0
+
+# Sections whose keys are user-defined names, kept as read-only mappings in snapshots
+FREE_FORM_SECTIONS = {
+    ("combat", "tag_overrides"),
+    ("multiworld", "worlds"),
+}
+
+CONFIG_WATCH_INTERVAL_TICKS = 40
+
+def get_config_generation() -> int:
+    """Counter bumped whenever config.json is reloaded or saved, for caches derived from it."""
+    return config_generation
+
+def get_permissions_generation() -> int:
+    """Counter bumped whenever permissions.json is reloaded or saved, for caches derived from it."""
+    return permissions_generation
 
 def load_cmd_config():
     """Load or create a configuration file in primebds_info/commands.json, cached in memory."""
@@ -81,6 +104,9 @@ def save_cmd_config(config: dict, update_cache: bool = False) -> None:
 
     text = json.dumps(config, indent=4)
     open_text_file(CMD_CONFIG_PATH, "w", text=text)
+    _record_mtime(CMD_CONFIG_PATH)
+    if update_cache:
+        publish_config_snapshot()
 
 def load_config():
     """Load config.json safely, return defaults if missing, but don't overwrite immediately."""
@@ -117,40 +143,52 @@ def load_config():
 
 def reload_config():
     """Reload all configuration caches."""
-    global cache, cmd_cache, permissions_cache, rules_cache
+    global cache, cmd_cache, permissions_cache, rules_cache, config_generation
     cache = None
     cmd_cache = None
     permissions_cache = None
     rules_cache = None
 
     load_config()
+    config_generation += 1
     load_cmd_config()
     load_rules()
     load_permissions()
+    for path in WATCHED_FILES:
+        _record_mtime(path)
+    publish_config_snapshot()
 
 def save_config(config: dict, update_cache: bool = False) -> None:
-    global cache
+    global cache, config_generation
     if update_cache:
         cache = config
+    config_generation += 1
 
     text = json.dumps(config, indent=4)
     open_text_file(CONFIG_PATH, "w", text=text)
+    _record_mtime(CONFIG_PATH)
+    publish_config_snapshot()
 
 def save_permissions(permissions: dict, update_cache: bool = True) -> None:
-    global permissions_cache
+    global permissions_cache, permissions_generation
 
     os.makedirs(CONFIG_FOLDER, exist_ok=True)
     content = json.dumps(permissions, indent=4)
     open_text_file(PERMISSIONS_PATH, mode="w", text=content)
+    _record_mtime(PERMISSIONS_PATH)
 
     if update_cache:
         permissions_cache = copy.deepcopy(permissions)
+        permissions_generation += 1
+        publish_config_snapshot()
 
 def load_permissions(default_permissions=None, cache=True):
-    global permissions_cache
+    global permissions_cache, permissions_generation
     if permissions_cache is not None and cache:
         return permissions_cache
 
+    permissions_generation += 1
+
     if not os.path.exists(PERMISSIONS_PATH):
         if default_permissions is None:
             default_permissions = PERMISSIONS_DEFAULT
@@ -176,13 +214,128 @@ def load_permissions(default_permissions=None, cache=True):
     return permissions_cache
 
 def reset_permissions(default_permissions=None):
-    global permissions_cache
+    global permissions_cache, permissions_generation
 
     if default_permissions is None:
         default_permissions = PERMISSIONS_DEFAULT
 
     open_text_file(PERMISSIONS_PATH, "w", text=json.dumps(default_permissions, indent=4))
     permissions_cache = copy.deepcopy(default_permissions)
+    permissions_generation += 1
+
+# Config snapshots
+_section_types: dict[tuple, type] = {}
+_snapshot = None
+_subscribers: list[Callable[["ConfigSnapshot"], None]] = []
+_file_mtimes: dict[str, int] = {}
+
+def _is_field_name(key) -> bool:
+    return isinstance(key, str) and key.isidentifier() and not keyword.iskeyword(key) and not key.startswith("_")
+
+def _freeze_mapping(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze_mapping(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze_mapping(v) for v in value)
+    return value
+
+def _freeze_section(value, path: tuple):
+    if isinstance(value, dict):
+        if path[1:] in FREE_FORM_SECTIONS or not all(_is_field_name(k) for k in value):
+            return _freeze_mapping(value)
+
+        fields = tuple(value)
+        section_type = _section_types.get((path, fields))
+        if section_type is None:
+            section_type = namedtuple(f"{path[-1].title().replace('_', '')}Config", fields)
+            _section_types[(path, fields)] = section_type
+        return section_type(*(_freeze_section(value[k], path + (k,)) for k in fields))
+    if isinstance(value, list):
+        return tuple(_freeze_mapping(v) for v in value)
+    return value
+
+class ConfigSnapshot:
+    """
+    Immutable view of config.json and commands.json. Modules are namedtuples
+    (snapshot.modules.server_messages.chat_cooldown); user-keyed sections and
+    commands are read-only mappings. A new snapshot is published on every change.
+    """
+    __slots__ = ("modules", "commands", "generation", "permissions_generation")
+
+    def __init__(self, config: dict, commands: dict):
+        self.modules = _freeze_section(config.get("modules", {}), ("modules",))
+        self.commands = _freeze_mapping(commands or {})
+        self.generation = config_generation
+        self.permissions_generation = permissions_generation
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """Returns the current config snapshot, building it on first use."""
+    if _snapshot is None:
+        publish_config_snapshot(notify=False)
+    return _snapshot
+
+def publish_config_snapshot(notify: bool = True) -> ConfigSnapshot:
+    """Rebuilds the snapshot from the in-memory caches and notifies subscribers."""
+    global _snapshot
+    snapshot = ConfigSnapshot(load_config(), load_cmd_config())
+    _snapshot = snapshot
+    if notify:
+        for callback in list(_subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"[PrimeBDS] Config subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+    return snapshot
+
+def subscribe_config(callback: Callable[[ConfigSnapshot], None]):
+    """Calls callback(snapshot) whenever config.json, commands.json or permissions.json change."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+def unsubscribe_config(callback: Callable[[ConfigSnapshot], None]):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+def _get_mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def _record_mtime(path: str):
+    _file_mtimes[path] = _get_mtime(path)
+
+def check_config_files() -> bool:
+    """
+    Polls the modification times of the watched files and reloads the ones edited
+    outside the plugin, then publishes a new snapshot. Returns True if anything changed.
+    """
+    global cache, cmd_cache, permissions_cache, config_generation
+    changed = []
+    for path in WATCHED_FILES:
+        mtime = _get_mtime(path)
+        if path not in _file_mtimes:
+            _file_mtimes[path] = mtime
+        elif _file_mtimes[path] != mtime:
+            _file_mtimes[path] = mtime
+            changed.append(path)
+
+    if not changed:
+        return False
+
+    if CONFIG_PATH in changed:
+        cache = None
+        load_config()
+        config_generation += 1
+    if CMD_CONFIG_PATH in changed:
+        cmd_cache = None
+        load_cmd_config()
+    if PERMISSIONS_PATH in changed:
+        permissions_cache = None
+        load_permissions()
+
+    publish_config_snapshot()
+    return True
 
 def save_rules(rules):
     os.makedirs(CONFIG_FOLDER, exist_ok=True)
@@ -2,16 +2,24 @@ import json
 import os
 import re
 import sqlite3
+import struct
 import threading
+from collections import deque
 from dataclasses import dataclass, fields
+from functools import lru_cache
 import time
-from typing import List, Tuple, Any, Dict, Optional
+from typing import List, Tuple, Any, Dict, Optional, Callable
 from endstone import Player
 from endstone.inventory import ItemStack
 from endstone.level import Location
 from endstone.util import Vector
-from endstone_primebds.utils.address_util import same_subnet
+from endstone_primebds.utils.address_util import subnet_key
+from endstone_primebds.utils.ban_index_util import PunishmentIndex, get_host
+from endstone_primebds.utils.warp_index_util import WarpIndex, WarpEntry
+from endstone_primebds.utils.home_index_util import HomeEntry, PlayerHomes
+from endstone_primebds.utils.inventory_codec_util import encode_inventory, decode_inventory, item_to_entry, parse_legacy_field
 from endstone_primebds.utils.mod_util import format_time_remaining
+from endstone_primebds.utils.player_state_util import OnlinePlayerState
 from endstone_primebds.utils.time_util import TimezoneUtils
 from endstone_primebds.utils.config_util import find_server_properties, find_and_load_config, parse_properties_file, find_folder
 from datetime import datetime
@@ -186,6 +194,221 @@ class Inventory:
     unbreakable: bool
     data: int
 
+_WRITE_TABLE_PATTERN = re.compile(r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+(\w+)", re.IGNORECASE)
+_READ_TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE|table_info\()\s*(\w+)", re.IGNORECASE)
+
+@lru_cache(maxsize=512)
+def _write_table(query: str) -> str:
+    """Returns the table a write statement targets, or '*' if it can't be determined."""
+    match = _WRITE_TABLE_PATTERN.match(query)
+    return match.group(1).lower() if match else "*"
+
+@lru_cache(maxsize=512)
+def _query_tables(query: str) -> frozenset:
+    """Returns every table a statement reads from."""
+    return frozenset(t.lower() for t in _READ_TABLE_PATTERN.findall(query))
+
+class WriteBehindQueue:
+    """
+    Collects deferred writes and commits them from a background writer thread,
+    grouping everything queued within one flush window into a single transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock, flush_interval: float = 0.5,
+                 max_batch: int = 256, name: str = "db"):
+        self.conn = conn
+        self.lock = lock
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.max_batch = max(1, int(max_batch))
+        self._pending = deque()
+        self._pending_tables: dict[str, int] = {}
+        self._queue_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"PrimeBDSWriter-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, statements: list[tuple[str, Any, bool]], on_dropped: Callable[[], None] = None):
+        """
+        Queue a group of (query, params, many) statements.
+        A group is always committed in the same transaction. params may also be a
+        zero-argument callable, resolved on the writer thread; returning None skips the statement.
+        on_dropped is called on the writer thread if the group still fails when retried on its own.
+        """
+        tables = tuple({_write_table(query) for query, _, _ in statements})
+        with self._queue_lock:
+            self._pending.append((statements, tables, on_dropped))
+            for table in tables:
+                self._pending_tables[table] = self._pending_tables.get(table, 0) + 1
+            full = len(self._pending) >= self.max_batch
+
+        if full:
+            self._wake.set()
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def has_pending(self, query: str = None) -> bool:
+        """True if queued (or in-flight) writes could affect the given statement."""
+        if not self._pending_tables:
+            return False
+        if query is None or "*" in self._pending_tables:
+            return True
+        tables = _query_tables(query)
+        return not tables or any(t in self._pending_tables for t in tables)
+
+    def flush(self):
+        """Synchronously commit everything queued so far."""
+        with self._flush_lock:
+            while True:
+                with self._queue_lock:
+                    if not self._pending:
+                        return
+                    count = min(len(self._pending), self.max_batch)
+                    batch = [self._pending.popleft() for _ in range(count)]
+
+                self._commit(batch)
+
+                with self._queue_lock:
+                    for _, tables, _ in batch:
+                        for table in tables:
+                            remaining = self._pending_tables.get(table, 0) - 1
+                            if remaining > 0:
+                                self._pending_tables[table] = remaining
+                            else:
+                                self._pending_tables.pop(table, None)
+
+    def _commit(self, batch):
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                for statements, _, _ in batch:
+                    self._apply(cursor, statements)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"[PrimeBDS] Batched write failed ({e}), retrying {len(batch)} groups individually")
+                for statements, _, on_dropped in batch:
+                    try:
+                        self._apply(cursor, statements)
+                        self.conn.commit()
+                    except sqlite3.Error as e:
+                        self.conn.rollback()
+                        print(f"[PrimeBDS] Dropped queued write '{statements[0][0].strip()[:60]}': {e}")
+                        if on_dropped is not None:
+                            on_dropped()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _apply(cursor: sqlite3.Cursor, statements):
+        for query, params, many in statements:
+            if callable(params):
+                params = params()
+                if params is None:
+                    continue
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[PrimeBDS] Writer thread error: {e}")
+
+    def close(self):
+        """Stop the writer thread and commit anything still queued."""
+        self._running = False
+        self._wake.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+class ReadConnectionPool:
+    """
+    Bounded pool of read-only connections, one per thread, reused across queries.
+    Connections belonging to finished threads are pruned before the pool grows.
+    """
+
+    def __init__(self, db_path: str, max_connections: int = 8, mmap_size: int = 67108864, cache_size_kb: int = 8192):
+        self.db_path = db_path
+        self.max_connections = max(1, int(max_connections))
+        self.mmap_size = int(mmap_size)
+        self.cache_size_kb = int(cache_size_kb)
+        self._local = threading.local()
+        self._connections: dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.overflows = 0
+        self.pruned = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size};")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb};")
+        conn.execute("PRAGMA query_only=ON;")
+        return conn
+
+    def _prune(self):
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+            self.pruned += 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Returns this thread's warm connection, opening one if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self.hits += 1
+            return conn
+
+        with self._lock:
+            self.misses += 1
+            if len(self._connections) >= self.max_connections:
+                self._prune()
+
+            if len(self._connections) >= self.max_connections:
+                # Pool is full: hand out an unpooled connection, closed with its last cursor
+                self.overflows += 1
+                return self._open()
+
+            conn = self._open()
+            self._connections[threading.get_ident()] = conn
+            self._local.conn = conn
+            return conn
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "open": len(self._connections),
+            "max": self.max_connections,
+            "hits": self.hits,
+            "misses": self.misses,
+            "overflows": self.overflows,
+            "pruned": self.pruned,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
 # DB
 class DatabaseManager:
     _lock = threading.Lock()
@@ -219,13 +442,43 @@ class DatabaseManager:
         self.conn.execute("PRAGMA journal_mode=WAL;")  # Enable WAL for concurrency
         self.cursor = self.conn.cursor()
 
+        db_config = (config or {}).get("modules", {}).get("database", {})
+        self.writer = WriteBehindQueue(
+            self.conn, self._lock,
+            db_config.get("write_flush_interval", 0.5),
+            db_config.get("write_max_batch", 256),
+            os.path.splitext(db_name)[0]
+        )
+        self.read_pool = ReadConnectionPool(
+            self.db_path,
+            db_config.get("read_pool_size", 8),
+            db_config.get("read_mmap_size", 67108864),
+            db_config.get("read_cache_size_kb", 8192)
+        )
+
+    def queue_write(self, query: str, params: Tuple = (), on_dropped: Callable[[], None] = None):
+        """Defer a write to the background writer, committed with the next batch."""
+        self.writer.put([(query, params, False)], on_dropped)
+
+    def queue_writes(self, statements: list[tuple[str, Any, bool]]):
+        """Defer several (query, params, many) writes that must commit together."""
+        if statements:
+            self.writer.put(statements)
+
+    def flush_writes(self, query: str = None):
+        """Commit queued writes now, or only when they touch the tables read by query."""
+        if self.writer.has_pending(query):
+            self.writer.flush()
+
     def execute(self, query: str, params: Tuple = (), readonly=False) -> sqlite3.Cursor:
         if readonly:
-            read_conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            cursor = read_conn.cursor()
+            self.flush_writes(query)
+            cursor = self.read_pool.acquire().cursor()
             cursor.execute(query, params)
             return cursor
         else:
+            is_read = query.lstrip()[:6].upper() in ("SELECT", "PRAGMA")
+            self.flush_writes(query if is_read else None)
             with self._lock:
                 self.cursor.execute(query, params)
                 if not query.strip().upper().startswith("SELECT"):
@@ -235,6 +488,7 @@ class DatabaseManager:
     def create_table(self, table_name: str, columns: Dict[str, str], unique: list = None):
         column_definitions = ', '.join([f"{col} {dtype}" for col, dtype in columns.items()])
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({column_definitions})"
+        self.flush_writes()
         with self._lock:
             self.cursor.execute(query)
             self.conn.commit()
@@ -247,11 +501,19 @@ class DatabaseManager:
             )
             self.conn.commit()
 
+    def create_index(self, table_name: str, columns: list):
+        index_name = f"idx_{table_name}_{'_'.join(columns)}"
+        with self._lock:
+            self.cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+            )
+            self.conn.commit()
 
     def insert(self, table_name: str, data: Dict[str, Any]):
         if not data:
             raise ValueError("Insert data cannot be empty")
 
+        self.flush_writes()
         with self._lock:
             self.cursor.execute(f"PRAGMA table_info({table_name})")
             existing_columns = {row[1] for row in self.cursor.fetchall()}
@@ -270,6 +532,7 @@ class DatabaseManager:
             self.conn.commit()
 
     def insert_session(self, xuid: str, name: str, start_time: int):
+        self.flush_writes()
         with self._lock:
             self.cursor.execute(
                 "INSERT INTO sessions_log (xuid, name, start_time, end_time) VALUES (?, ?, ?, NULL)",
@@ -278,6 +541,7 @@ class DatabaseManager:
             self.conn.commit()
 
     def ensure_user_table_columns(self):
+        self.flush_writes()
         with self._lock:
             self.cursor.execute("PRAGMA table_info(users)")
             existing_columns = [col[1] for col in self.cursor.fetchall()]
@@ -294,12 +558,14 @@ class DatabaseManager:
         return mapping.get(py_type, "TEXT")
 
     def fetch_all(self, table_name: str) -> List[Dict[str, Any]]:
+        self.flush_writes(f"SELECT * FROM {table_name}")
         with self._lock:
             self.cursor.execute(f"SELECT * FROM {table_name}")
             columns = [desc[0] for desc in self.cursor.description]
             return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
 
     def fetch_by_condition(self, table_name: str, condition: str, params: Tuple) -> List[Dict[str, Any]]:
+        self.flush_writes(f"SELECT * FROM {table_name}")
         with self._lock:
             query = f"SELECT * FROM {table_name} WHERE {condition}"
             self.cursor.execute(query, params)
@@ -312,27 +578,75 @@ class DatabaseManager:
             return [row[1] for row in self.cursor.fetchall()]
 
     def update(self, table_name: str, updates: Dict[str, Any], condition: str, params: Tuple):
-        with self._lock:
-            update_clause = ', '.join([f"{col} = ?" for col in updates.keys()])
-            query = f"UPDATE {table_name} SET {update_clause} WHERE {condition}"
-            all_params = tuple(updates.values()) + (params if isinstance(params, tuple) else (params,))
-            self.cursor.execute(query, all_params)
-            self.conn.commit()
+        """Queued through the write-behind writer; reads of the table flush it first."""
+        update_clause = ', '.join([f"{col} = ?" for col in updates.keys()])
+        query = f"UPDATE {table_name} SET {update_clause} WHERE {condition}"
+        all_params = tuple(updates.values()) + (params if isinstance(params, tuple) else (params,))
+        self.queue_write(query, all_params)
 
     def delete(self, table_name: str, condition: str, params: Tuple):
+        self.flush_writes()
         with self._lock:
             query = f"DELETE FROM {table_name} WHERE {condition}"
             self.cursor.execute(query, params)
             self.conn.commit()
 
+    def get_pool_stats(self) -> dict:
+        """Read pool usage plus the number of writes still queued."""
+        stats = self.read_pool.stats()
+        stats["queued_writes"] = self.writer.pending_count()
+        return stats
+
     def close_connection(self):
+        self.writer.close()
+        self.read_pool.close()
         self.conn.close()
 
 class ServerDB(DatabaseManager):
     def __init__(self, db_name: str):
         super().__init__(db_name)
         self.db_name = db_name
+        self.punishments = PunishmentIndex()
+        self.warps = WarpIndex()
+        self._homes: dict[tuple, PlayerHomes] = {}
+        self._home_settings: Optional[dict] = None
         self.create_tables()
+        self.rebuild_punishment_index()
+        self.rebuild_warp_index()
+
+    def rebuild_punishment_index(self):
+        """Rebuilds the in-memory name ban index from name_bans."""
+        self.punishments.clear()
+        for name, banned_time, ban_reason in self.execute(
+            "SELECT name, banned_time, ban_reason FROM name_bans", readonly=True
+        ).fetchall():
+            self.punishments.add_name_ban(name, banned_time, ban_reason)
+
+    def rebuild_warp_index(self):
+        """Rebuilds the in-memory warp index from warps, in table order."""
+        self.warps.clear()
+        for row in self.execute(
+            "SELECT name, pos, displayname, category, description, cost, cooldown, delay, aliases "
+            "FROM warps ORDER BY rowid", readonly=True
+        ).fetchall():
+            self.warps.put(self._warp_entry(row))
+
+    def _warp_entry(self, row) -> WarpEntry:
+        name, pos_str, displayname, category, description, cost, cooldown, delay, alias_str = row
+        return WarpEntry(name, pos_str, displayname, category, description, cost, cooldown, delay,
+                         self.decode_aliases(alias_str))
+
+    def _refresh_warp(self, name: str):
+        """Re-reads one warp row into the index after it was written (or drops it if gone)."""
+        row = self.execute(
+            "SELECT name, pos, displayname, category, description, cost, cooldown, delay, aliases "
+            "FROM warps WHERE name = ? COLLATE NOCASE",
+            (name,), readonly=True
+        ).fetchone()
+        if row:
+            self.warps.put(self._warp_entry(row))
+        else:
+            self.warps.remove(name)
 
     def migrate_table(self, table_name: str, data_cls):
         """Add missing columns to a table according to the dataclass fields."""
@@ -539,6 +853,7 @@ class ServerDB(DatabaseManager):
                 (name, banned_until, ban_reason),
             )
             self.conn.commit()
+            self.punishments.add_name_ban(name, banned_until, ban_reason)
         except sqlite3.Error as e:
             print(f"Error adding name: {e}")
 
@@ -546,24 +861,21 @@ class ServerDB(DatabaseManager):
         """Remove a name from the bans list"""
         self.execute("DELETE FROM name_bans WHERE name = ?", (name,))
         self.conn.commit()
+        self.punishments.remove_name_ban(name)
 
     def check_nameban(self, name: str) -> bool:
         """
         Check if a name is currently banned
         Respects ban duration
         """
-        self.execute("SELECT banned_time FROM name_bans WHERE name = ? LIMIT 1", (name,))
-        row = self.cursor.fetchone()
-        if row is None:
-            return False
-
-        banned_time = row[0]
-        return time.time() < banned_time
+        name_ban = self.punishments.get_name_ban(name)
+        return name_ban is not None and time.time() < name_ban.expires
 
     def clear_names(self):
         """Clear all bans"""
         self.execute("DELETE FROM name_bans")
         self.conn.commit()
+        self.punishments.clear()
 
     def get_ban_info(self, name: str) -> Optional[NameBans]:
         result = self.execute("SELECT * FROM name_bans WHERE name = ? LIMIT 1", (name,)).fetchone()
@@ -675,6 +987,7 @@ class ServerDB(DatabaseManager):
             (json.dumps(aliases), warp_name)
         )
         self.conn.commit()
+        self._refresh_warp(warp_name)
         return True
 
     def remove_alias(self, warp_name: str, alias: str) -> bool:
@@ -700,6 +1013,7 @@ class ServerDB(DatabaseManager):
             (json.dumps(aliases), warp_name)
         )
         self.conn.commit()
+        self._refresh_warp(warp_name)
         return True
 
     def update_warp_property(self, name: str, field: str, value) -> bool:
@@ -708,7 +1022,7 @@ class ServerDB(DatabaseManager):
         if field not in allowed_fields:
             raise ValueError(f"Invalid warp field: {field}")
 
-        if not self.execute("SELECT 1 FROM warps WHERE name = ? COLLATE NOCASE", (name,)).fetchone():
+        if self.warps.get(name) is None:
             return False
 
         if field == "pos":
@@ -724,6 +1038,7 @@ class ServerDB(DatabaseManager):
 
         self.execute(f"UPDATE warps SET {field} = ? WHERE name = ? COLLATE NOCASE", (value, name))
         self.conn.commit()
+        self._refresh_warp(name)
         return True
 
     def create_warp(self, name: str, location: Location, displayname: str = None,
@@ -731,7 +1046,7 @@ class ServerDB(DatabaseManager):
                 cost: float = 0.0, cooldown: int = 0, delay: int = 0,
                 aliases: list[str] = None) -> bool:
 
-        if self.execute("SELECT 1 FROM warps WHERE name = ? COLLATE NOCASE", (name,)).fetchone():
+        if self.warps.get(name) is not None:
             return False
 
         pos_str = self.encode_location(location)
@@ -745,102 +1060,30 @@ class ServerDB(DatabaseManager):
             (name, pos_str, displayname, category, description, cost, cooldown, delay, aliases_json)
         )
         self.conn.commit()
+        self._refresh_warp(name)
         return True
 
     def get_warp(self, name: str, server) -> dict | None:
-        row = self.execute(
-            """
-            SELECT name, pos, displayname, category, description, cost, cooldown, delay, aliases
-            FROM warps
-            WHERE name = ? COLLATE NOCASE
-            """,
-            (name,)
-        ).fetchone()
-
-        if not row:
+        entry = self.warps.get(name)
+        if entry is None:
             return None
-
-        name, pos_str, displayname, category, description, cost, cooldown, delay, aliases = row
-        pos = self.decode_location(pos_str, server) if pos_str else None
-        aliases = self.decode_aliases(aliases)
-
-        return {
-            'name': name,
-            'pos': pos,
-            'displayname': displayname,
-            'category': category,
-            'description': description,
-            'cost': cost,
-            'cooldown': cooldown,
-            'delay': delay,
-            'aliases': aliases
-        }
+        return entry.to_dict(lambda pos_str: self.decode_location(pos_str, server))
     
     def get_warp_fuzzy(self, query: str, server) -> dict | None:
-        query = query.lower()
-        warps = self.get_all_warps(server)
-
-        best_match = None
-        best_score = 0
-
-        for warp_name, warp in warps.items():
-            name = warp["name"].lower()
-            display = (warp.get("displayname") or "").lower()
-            category = (warp.get("category") or "").lower()
-            aliases = [a.lower() for a in warp.get("aliases", [])]
-
-            # Exact match first
-            if query == name or query in aliases:
-                return warp
-
-            # Score-based matching
-            score = 0
-            if query in name:
-                score += 3
-            if query in display:
-                score += 2
-            if query in category:
-                score += 1
-            if any(query in a for a in aliases):
-                score += 4  # aliases get priority
-
-            # Pick highest score
-            if score > best_score:
-                best_score = score
-                best_match = warp
-
-        return best_match if best_score >= 1 else None
+        entry = self.warps.find(query)
+        if entry is None:
+            return None
+        return entry.to_dict(lambda pos_str: self.decode_location(pos_str, server))
 
     def get_all_warps(self, server):
-        rows = self.execute("""
-            SELECT name, pos, displayname, category, description, cost, cooldown, delay, aliases
-            FROM warps
-        """).fetchall()
-
-        warps = {}
-
-        for row in rows:
-            (name, pos, displayname, category, description,
-            cost, cooldown, delay, alias_str) = row
-
-            warps[name] = {
-                "name": name,
-                "pos": self.decode_location(pos, server) if pos else None,
-                "displayname": displayname,
-                "category": category,
-                "description": description,
-                "cost": cost,
-                "cooldown": cooldown,
-                "delay": delay,
-                "aliases": self.decode_aliases(alias_str)
-            }
-
-        return warps
+        decode = lambda pos_str: self.decode_location(pos_str, server)
+        return {entry.name: entry.to_dict(decode) for entry in self.warps.all()}
 
     def delete_warp(self, name: str) -> bool:
         """Delete a warp by name, ignoring capitalization."""
         cur = self.execute("DELETE FROM warps WHERE name = ? COLLATE NOCASE", (name,))
         self.conn.commit()
+        self.warps.remove(name)
         return cur.rowcount > 0
 
     def create_spawn(self, location: Location, cost: float = 0.0, cooldown: int = 0, delay: int = 0) -> bool:
@@ -895,12 +1138,32 @@ class ServerDB(DatabaseManager):
         self.conn.commit()
         return cur.rowcount > 0
 
+    def _player_homes(self, xuid: str = None, username: str = None) -> PlayerHomes:
+        """Returns the cached homes for a player, loading them on first access."""
+        where_clause, params = self.user_selector(xuid, username)
+        key = (where_clause, params[0])
+        homes = self._homes.get(key)
+        if homes is None:
+            rows = self.execute(
+                f"SELECT xuid, username, name, pos, cooldown, delay FROM homes WHERE {where_clause} ORDER BY rowid",
+                params, readonly=True
+            ).fetchall()
+            homes = self._homes[key] = PlayerHomes([HomeEntry(*row) for row in rows])
+        return homes
+
+    def forget_homes(self, xuid: str = None, username: str = None):
+        """Drops a player's cached homes, e.g. when they leave."""
+        if xuid:
+            self._homes.pop(("xuid = ?", xuid), None)
+        if username:
+            self._homes.pop(("username = ?", username), None)
+
     def create_home(self, xuid: str, username: str, name: str, location: Location) -> bool:
         if not xuid and not username:
             raise ValueError("Either xuid or username must be provided.")
         
-        where_clause, params = self.user_selector(xuid, username)
-        if self.execute(f"SELECT 1 FROM homes WHERE {where_clause} AND name = ?", (*params, name)).fetchone():
+        homes = self._player_homes(xuid, username)
+        if homes.has(name):
             return False
 
         pos_str = self.encode_location(location)
@@ -909,6 +1172,11 @@ class ServerDB(DatabaseManager):
             (xuid, username, name, pos_str)
         )
         self.conn.commit()
+
+        homes.add(HomeEntry(xuid, username, name, pos_str))
+        if xuid and username:
+            # The same row also belongs to the username-keyed cache, if one is loaded
+            self._homes.pop(("username = ?", username), None)
         return True
 
     def set_home_settings(self, delay: float = 0, cooldown: float = 0, cost: float = 0) -> bool:
@@ -927,18 +1195,22 @@ class ServerDB(DatabaseManager):
             )
 
         self.conn.commit()
+        self._home_settings = None
         return True
 
     def get_home_settings(self) -> dict:
         """Retrieve the global cooldown, delay, and cost for /home warps."""
-        row = self.execute(
-            "SELECT delay, cooldown, cost FROM homes WHERE xuid IS NULL AND username IS NULL AND name = 'home_settings'"
-        ).fetchone()
-
-        if row:
-            delay, cooldown, cost = row
-            return {"delay": delay, "cooldown": cooldown, "cost": cost}
-        return {"delay": 0, "cooldown": 0, "cost": 0}
+        if self._home_settings is None:
+            row = self.execute(
+                "SELECT delay, cooldown, cost FROM homes WHERE xuid IS NULL AND username IS NULL AND name = 'home_settings'"
+            ).fetchone()
+
+            if row:
+                delay, cooldown, cost = row
+                self._home_settings = {"delay": delay, "cooldown": cooldown, "cost": cost}
+            else:
+                self._home_settings = {"delay": 0, "cooldown": 0, "cost": 0}
+        return dict(self._home_settings)
     
     def delete_home(self, name: str, xuid: str = None, username: str = None) -> bool:
         """Delete a specific home by name for a player (identified by xuid or username)."""
@@ -948,64 +1220,38 @@ class ServerDB(DatabaseManager):
         where_clause, params = self.user_selector(xuid, username)
         cur = self.execute(f"DELETE FROM homes WHERE {where_clause} AND name = ?", (*params, name))
         self.conn.commit()
-        return cur.rowcount > 0
-
-    def get_home(self, name: str, server, xuid: str = None, username: str = None) -> dict | None:
-        COLOR_CODE_PATTERN = re.compile(r"(§[0-9A-FK-OR])|(&[0-9A-FK-OR])", re.IGNORECASE)
-
-        def normalize(s: str) -> list[str]:
-            """Strip color codes, trim, lowercase, split into words."""
-            if not s:
-                return []
-            s = COLOR_CODE_PATTERN.sub("", s)
-            s = s.strip().lower()
-            return s.split()
-
-        search_terms = normalize(name)
-        if not search_terms:
-            return None
+        deleted = cur.rowcount > 0
 
-        where_clause, params = self.user_selector(xuid, username)
-        rows = self.execute(
-            f"""
-            SELECT xuid, username, name, pos, cooldown, delay
-            FROM homes
-            WHERE {where_clause}
-            """,
-            (*params,)
-        ).fetchall()
+        if deleted:
+            self._player_homes(xuid, username).remove(name)
+            if xuid and username:
+                self._homes.pop(("username = ?", username), None)
+        return deleted
 
-        if not rows:
+    def get_home(self, name: str, server, xuid: str = None, username: str = None) -> dict | None:
+        entry = self._player_homes(xuid, username).find(name)
+        if entry is None:
             return None
 
-        for row in rows:
-            xuid, username, home_name, pos_str, cooldown, delay = row
-
-            home_terms = normalize(home_name)
-            if not home_terms:
-                continue
-
-            if any(st == ht for st in search_terms for ht in home_terms):
-                pos = self.decode_location(pos_str, server) if pos_str else None
-                return {
-                    'xuid': xuid,
-                    'username': username,
-                    'name': home_name,
-                    'pos': pos,
-                    'cooldown': cooldown,
-                    'delay': delay
-                }
+        return {
+            'xuid': entry.xuid,
+            'username': entry.username,
+            'name': entry.name,
+            'pos': entry.location(lambda pos_str: self.decode_location(pos_str, server)),
+            'cooldown': entry.cooldown,
+            'delay': entry.delay
+        }
 
-        return None
+    def get_home_names(self, xuid: str = None, username: str = None) -> list[str]:
+        """A player's home names in creation order, without decoding any locations."""
+        return self._player_homes(xuid, username).names()
 
     def get_all_homes(self, server, xuid: str = None, username: str = None) -> dict[str, dict]:
-        where_clause, params = self.user_selector(xuid, username)
-        homes = {}
-        rows = self.execute(f"SELECT name, pos, cooldown, delay FROM homes WHERE {where_clause}", params).fetchall()
-        for name, pos_str, cooldown, delay in rows:
-            pos = self.decode_location(pos_str, server) if pos_str else None
-            homes[name] = {'pos': pos, 'cooldown': cooldown, 'delay': delay}
-        return homes
+        decode = lambda pos_str: self.decode_location(pos_str, server)
+        return {
+            entry.name: {'pos': entry.location(decode), 'cooldown': entry.cooldown, 'delay': entry.delay}
+            for entry in self._player_homes(xuid, username).entries
+        }
     
     def set_last_warp(self, location: Location, xuid: str = None, username: str = None,
                     name: str = "lastwarp") -> bool:
@@ -1089,16 +1335,20 @@ class UserDB(DatabaseManager):
     def __init__(self, db_name: str):
         """Initialize the database connection and create tables."""
         super().__init__(db_name)
-        self.jailed_cache = {}
         self.db_name = db_name
         self._cache = {}
         self._name_to_xuid_cache = {}
         self._xuid_to_name_cache = {}
-        self._ip_ban_cache = {}
-        self._ip_ban_index = {}
-        self._ip_mute_cache = {}
         self._cache_ttl = 60
+        self.online_states: dict[str, OnlinePlayerState] = {}
+        self.punishments = PunishmentIndex()
+        self._container_lock = threading.Lock()
+        self._pending_containers: dict[tuple[str, str], tuple[str, tuple]] = {}
+        self._saved_containers: dict[tuple[str, str], tuple] = {}
         self.create_tables()
+        self.backfill_alt_index()
+        self.migrate_inventory_rows()
+        self.rebuild_punishment_index()
 
     def create_tables(self):
         """Create tables if they don't exist."""
@@ -1184,6 +1434,15 @@ class UserDB(DatabaseManager):
         }
         self.create_table('alt_logs', alt_log_columns, unique=['main_xuid', 'alt_xuid'])
 
+        alt_index_columns = {
+            'xuid': 'TEXT PRIMARY KEY',
+            'subnet': 'INTEGER',
+            'device_id': 'TEXT'
+        }
+        self.create_table('alt_index', alt_index_columns)
+        self.create_index('alt_index', ['subnet'])
+        self.create_index('alt_index', ['device_id'])
+
         warn_log_columns = {
             'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
             'xuid': 'TEXT',
@@ -1194,22 +1453,13 @@ class UserDB(DatabaseManager):
         }
         self.create_table('warn_logs', warn_log_columns)
 
-        inventory_columns = {
+        inventory_blob_columns = {
             'xuid': 'TEXT',
+            'container': 'TEXT',
             'name': 'TEXT',
-            'type': 'TEXT',
-            'amount': 'INTEGER',
-            'damage': 'INTEGER',
-            'display_name': 'TEXT',
-            'enchants': 'TEXT', 
-            'lore': 'TEXT', 
-            'unbreakable': 'INTEGER',
-            'slot_type': 'TEXT',
-            'slot': 'INTEGER',
-            'data': 'INTEGER'
+            'data': 'BLOB'
         }
-        self.create_table('inventories', inventory_columns)
-        self.create_table('ender_chests', inventory_columns)
+        self.create_table('inventory_blobs', inventory_blob_columns, ['xuid', 'container'])
 
     def save_user(self, player: Player):
         """Primary data saving for users."""
@@ -1263,6 +1513,15 @@ class UserDB(DatabaseManager):
             }
             self.update('users', user_updates, 'xuid = ?', (xuid,))
             self.update('mod_logs', mod_updates, 'xuid = ?', (xuid,))
+            self.punishments.rehost(xuid, ip)
+
+        self.queue_write(
+            """
+            INSERT INTO alt_index (xuid, subnet, device_id) VALUES (?, ?, ?)
+            ON CONFLICT(xuid) DO UPDATE SET subnet=excluded.subnet, device_id=excluded.device_id
+            """,
+            (xuid, subnet_key(ip), device_id or None)
+        )
 
     def migrate_table(self, table_name: str, data_cls):
         """Add missing columns to a table according to the dataclass fields."""
@@ -1348,7 +1607,7 @@ class UserDB(DatabaseManager):
         """
         if xuid:
             self._cache.pop(xuid, None)
-            self._cache.pop("modlog:{xuid}", None)
+            self._cache.pop(f"modlog:{xuid}", None)
             self._name_to_xuid_cache.clear()
             self._xuid_to_name_cache.clear()
         else:
@@ -1356,6 +1615,32 @@ class UserDB(DatabaseManager):
             self._name_to_xuid_cache.clear()
             self._xuid_to_name_cache.clear()
     
+    def load_online_state(self, xuid: str) -> Optional[OnlinePlayerState]:
+        """(Re)load the in-memory state of an online player from the database."""
+        user = self.get_online_user(xuid)
+        if not user:
+            return None
+
+        state = OnlinePlayerState(xuid, user, self.get_mod_log(xuid))
+        self.online_states[xuid] = state
+        return state
+
+    def get_online_state(self, xuid: str) -> Optional[OnlinePlayerState]:
+        """Returns the in-memory state of an online player, loading it if missing."""
+        state = self.online_states.get(xuid)
+        if state is None:
+            state = self.load_online_state(xuid)
+        return state
+
+    def drop_online_state(self, xuid: str):
+        self.online_states.pop(xuid, None)
+
+    def _sync_online_state(self, xuid: Optional[str], **values):
+        state = self.online_states.get(xuid) if xuid else None
+        if state is not None:
+            for column, value in values.items():
+                state.set(column, value)
+
     def get_online_user_by_unique_id(self, unique_id: str) -> Optional[User]:
         result = self.execute(
             "SELECT * FROM users WHERE unique_id = ?", 
@@ -1396,20 +1681,13 @@ class UserDB(DatabaseManager):
     
     def check_and_update_mute(self, xuid: str, name: str) -> int:
         """Checks if a player is muted and updates the database if the mute has expired."""
-        mute_row = self.execute(
-            "SELECT is_muted, mute_time FROM mod_logs WHERE xuid = ?", 
-            (xuid,), readonly=True
-        ).fetchone()
-
-        if mute_row:
-            is_muted, mute_time = mute_row
-            if is_muted:
-                if mute_time < datetime.now().timestamp():
-                    self.invalidate_user_cache(xuid)
-                    self.remove_mute(name)
-                    return 0 
-                return 1 
-            return 0 
+        mute = self.punishments.get_mute(xuid)
+        if mute:
+            if mute.expires < datetime.now().timestamp():
+                self.invalidate_user_cache(xuid)
+                self.remove_mute(name)
+                return 0
+            return 1
         return 0
 
     def get_mod_log(self, xuid: str) -> Optional[ModLog]:
@@ -1437,27 +1715,45 @@ class UserDB(DatabaseManager):
         columns = [col[1] for col in self.execute("PRAGMA table_info(users)").fetchall()]
         return [dict(zip(columns, row)) for row in rows]
     
+    def backfill_alt_index(self):
+        """Adds alt_index rows for users that predate it (or were saved without one)."""
+        rows = self.execute(
+            """
+            SELECT u.xuid, COALESCE(m.ip_address, ''), u.device_id
+            FROM users u
+            LEFT JOIN mod_logs m ON u.xuid = m.xuid
+            WHERE u.xuid NOT IN (SELECT xuid FROM alt_index)
+            """,
+            readonly=True
+        ).fetchall()
+        if not rows:
+            return
+
+        self.queue_writes([(
+            "INSERT OR IGNORE INTO alt_index (xuid, subnet, device_id) VALUES (?, ?, ?)",
+            [(xuid, subnet_key(ip_address), device_id or None) for xuid, ip_address, device_id in rows],
+            True
+        )])
+
     def get_alts(self, ip: str, device_id: str, exclude_xuid: str) -> list[dict]:
         now = int(time.time())
-        self.execute("DELETE FROM alt_logs WHERE expiry < ?", (now,))
+        self.queue_write("DELETE FROM alt_logs WHERE expiry < ?", (now,))
 
         query = """
             SELECT u.name, u.xuid, COALESCE(m.ip_address, '') AS ip_address, u.device_id
             FROM users u
             LEFT JOIN mod_logs m ON u.xuid = m.xuid
-            WHERE u.xuid != ?
+            WHERE u.xuid IN (
+                SELECT xuid FROM alt_index WHERE subnet = ?
+                UNION
+                SELECT xuid FROM alt_index WHERE device_id = ?
+            ) AND u.xuid != ?
         """
-        rows = self.execute(query, (exclude_xuid,), readonly=True).fetchall()
+        params = (subnet_key(ip) if ip else None, device_id or None, exclude_xuid)
+        rows = self.execute(query, params, readonly=True).fetchall()
         columns = ["name", "xuid", "ip_address", "device_id"]
 
-        results = []
-        for row in rows:
-            alt = dict(zip(columns, row))
-            if (
-                (alt["ip_address"] and ip and same_subnet(ip, alt["ip_address"])) or
-                (device_id and alt["device_id"] and alt["device_id"] == device_id)
-            ):
-                results.append(alt)
+        results = [dict(zip(columns, row)) for row in rows]
 
         extra_rows = self.execute(
             """
@@ -1481,30 +1777,60 @@ class UserDB(DatabaseManager):
         expiry_time = now + 90 * 24 * 60 * 60  # 90 days in seconds
 
         alts = self.get_alts(ip, device_id, exclude_xuid=main_xuid)
+        if not alts:
+            return
 
-        for alt in alts:
-            self.execute(
-                """
-                INSERT INTO alt_logs (main_name, main_xuid, alt_name, alt_xuid, expiry)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(main_xuid, alt_xuid) DO UPDATE SET expiry=excluded.expiry
-                """,
-                (main_name, main_xuid, alt["name"], alt["xuid"], expiry_time),
-            )
+        self.queue_writes([(
+            """
+            INSERT INTO alt_logs (main_name, main_xuid, alt_name, alt_xuid, expiry)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(main_xuid, alt_xuid) DO UPDATE SET expiry=excluded.expiry
+            """,
+            [(main_name, main_xuid, alt["name"], alt["xuid"], expiry_time) for alt in alts],
+            True
+        )])
+
+    def rebuild_punishment_index(self):
+        """Rebuilds the in-memory ban/mute/jail index from mod_logs."""
+        self.punishments.clear()
+        rows = self.execute(
+            "SELECT xuid, name, is_muted, mute_time, mute_reason, is_banned, banned_time, ban_reason, "
+            "ip_address, is_ip_banned, is_ip_muted, is_jailed, jail_time, jail_reason FROM mod_logs "
+            "WHERE is_banned = 1 OR is_ip_banned = 1 OR is_muted = 1 OR is_ip_muted = 1 OR is_jailed = 1",
+            readonly=True
+        ).fetchall()
+
+        for (xuid, name, is_muted, mute_time, mute_reason, is_banned, banned_time, ban_reason,
+             ip_address, is_ip_banned, is_ip_muted, is_jailed, jail_time, jail_reason) in rows:
+            row_key = xuid or ip_address
+            if is_banned and xuid:
+                self.punishments.add_ban(xuid, name, banned_time, ban_reason)
+            if is_ip_banned and ip_address:
+                self.punishments.add_ip_ban(ip_address, row_key, xuid, name, banned_time, ban_reason)
+            if is_muted and xuid:
+                self.punishments.add_mute(xuid, name, mute_time, mute_reason)
+            if is_ip_muted and ip_address:
+                self.punishments.add_ip_mute(ip_address, row_key, xuid, name, mute_time, mute_reason)
+            if is_jailed and xuid:
+                self.punishments.add_jail(xuid, name, jail_time, jail_reason)
 
     def add_ban(self, xuid, expiration: int, reason: str, ip_ban: bool = False):
+        name = self.get_name_by_xuid(xuid)
         self.update('mod_logs', {'is_banned': 1, 'banned_time': expiration, 'ban_reason': reason, 'is_ip_banned': ip_ban}, 'xuid = ?', (xuid,))
         self.insert('punishment_logs', {
-            'xuid': xuid, 'name': self.get_name_by_xuid(xuid), 'action_type': 'Ban',
+            'xuid': xuid, 'name': name, 'action_type': 'Ban',
             'reason': reason, 'timestamp': int(time.time()), 'duration': expiration
         })
         self.invalidate_user_cache(xuid)
-        self.invalidate_ip_ban_by_xuid(xuid)
 
-    def add_ip_ban(self, ip: str, expiration: int, reason: str):
-        def get_host(ip_address: str) -> str:
-            return ip_address.split(':')[0].strip()
+        self.punishments.add_ban(xuid, name, expiration, reason)
+        mod_log = self.get_mod_log(xuid) if ip_ban else None
+        if mod_log and mod_log.ip_address:
+            self.punishments.add_ip_ban(mod_log.ip_address, xuid, xuid, name, expiration, reason)
+        else:
+            self.punishments.remove_ip_ban_row(xuid)
 
+    def add_ip_ban(self, ip: str, expiration: int, reason: str):
         ip_host = get_host(ip)
         now = int(time.time())
 
@@ -1543,6 +1869,11 @@ class UserDB(DatabaseManager):
                         expiration
                     )
                 )
+
+                row_key = entry["xuid"] or entry["ip_address"]
+                if entry["xuid"]:
+                    self.punishments.add_ban(entry["xuid"], entry["name"], expiration, reason)
+                self.punishments.add_ip_ban(entry["ip_address"], row_key, entry["xuid"], entry["name"], expiration, reason)
         else:
             self.execute(
                 """
@@ -1569,16 +1900,25 @@ class UserDB(DatabaseManager):
                 (None, ip_host, "IP Ban", reason, now, expiration)
             )
 
-        self.invalidate_ip_ban(ip_host)
+            self.punishments.add_ip_ban(ip, ip, None, None, expiration, reason)
 
     def add_mute(self, xuid: str, expiration: int, reason: str, ip_mute: bool = False):
+        name = self.get_name_by_xuid(xuid)
         self.update('mod_logs', {'is_muted': 1, 'mute_time': expiration, 'mute_reason': reason, 'is_ip_muted': ip_mute }, 'xuid = ?', (xuid,))
+        self._sync_online_state(xuid, is_muted=1, mute_time=expiration)
         self.insert('punishment_logs', {
-            'xuid': xuid, 'name': self.get_name_by_xuid(xuid), 'action_type': 'Mute',
+            'xuid': xuid, 'name': name, 'action_type': 'Mute',
             'reason': reason, 'timestamp': int(time.time()), 'duration': expiration
         })
         self.invalidate_user_cache(xuid)
 
+        self.punishments.add_mute(xuid, name, expiration, reason)
+        mod_log = self.get_mod_log(xuid) if ip_mute else None
+        if mod_log and mod_log.ip_address:
+            self.punishments.add_ip_mute(mod_log.ip_address, xuid, xuid, name, expiration, reason)
+        else:
+            self.punishments.remove_ip_mute_row(xuid)
+
     def remove_ban(self, name: str):
         xuid = self.get_xuid_by_name(name)
         self.update('mod_logs', {'is_banned': 0, 'banned_time': 0, 'ban_reason': "None", 'is_ip_banned': 0}, 'name = ?', (name,))
@@ -1587,12 +1927,10 @@ class UserDB(DatabaseManager):
             'reason': 'Ban Removed', 'timestamp': int(time.time()), 'duration': 0
         })
         self.invalidate_user_cache(xuid)
-        self.invalidate_ip_ban_by_xuid(xuid)
+        self.punishments.remove_ban(xuid)
+        self.punishments.remove_ip_ban_row(xuid)
 
     def remove_ip_ban(self, ip: str):
-        def get_host(ip_address: str) -> str:
-            return ip_address.split(':')[0].strip()
-
         ip_host = get_host(ip)
         now = int(time.time())
 
@@ -1636,138 +1974,38 @@ class UserDB(DatabaseManager):
                 )
             )
 
-        # Invalidate cache by host
-        self.invalidate_ip_ban(ip_host)
-
-    def check_ip_ban(self, ip: str) -> bool:
-        def get_host(ip_address: str) -> str:
-            return ip_address.split(':')[0].strip()
-
-        ip_host = get_host(ip)
-
-        if not hasattr(self, "_ip_ban_cache"):
-            self._ip_ban_cache = {}
-        if not hasattr(self, "_ip_ban_index"):
-            self._ip_ban_index = {}
-
-        # Check cache first
-        cached = self._ip_ban_cache.get(ip_host)
-        if cached is not None:
-            return cached
-
-        # Fetch all rows and filter by host
-        query = "SELECT xuid, ip_address FROM mod_logs WHERE is_ip_banned = 1"
-        rows = self.execute(query, (), readonly=True).fetchall()
-        columns = ["xuid", "ip_address"]
-        matching_entries = [dict(zip(columns, row)) for row in rows if get_host(row[1]) == ip_host]
-
-        if matching_entries:
-            xuid = matching_entries[0]["xuid"]
-            result = True
-        else:
-            xuid = None
-            result = False
-
-        # Update cache
-        self._ip_ban_cache[ip_host] = result
-
-        # Update IP->XUID index
-        if xuid:
-            if xuid not in self._ip_ban_index:
-                self._ip_ban_index[xuid] = set()
-            self._ip_ban_index[xuid].add(ip_host)
-
-        return result
-        
-    def invalidate_ip_ban(self, ip: str):
-        if hasattr(self, "_ip_ban_cache"):
-            self._ip_ban_cache.pop(ip, None)
+            if entry["xuid"]:
+                self.punishments.remove_ban(entry["xuid"])
 
-    def invalidate_ip_ban_by_xuid(self, xuid: str):
-        ip_bases = self._ip_ban_index.pop(xuid, None)
-        if not ip_bases:
-            return
+        self.punishments.remove_ip_bans(ip_host)
 
-        for ip_base in ip_bases:
-            self._ip_ban_cache.pop(ip_base, None)
+    def check_ip_ban(self, ip: str) -> bool:
+        return self.punishments.get_ip_ban(ip) is not None
 
     def check_ip_mute(self, ip: str) -> tuple[bool, Optional[int], Optional[str]]:
-        ip_base = ip.split(':')[0]
-        now = time.time()
-
-        cached = self._ip_mute_cache.get(ip_base)
-        if cached:
-            (is_muted, mute_time, mute_reason), expiry = cached
+        mute = self.punishments.get_ip_mute(ip)
+        if mute is None:
+            return False, None, None
 
-            if now < expiry:
-                if is_muted and mute_time is not None and mute_time < now:
-                    del self._ip_mute_cache[ip_base]
-                else:
-                    return is_muted, mute_time, mute_reason
+        if mute.expires < time.time():
+            if mute.name:
+                self.remove_mute(mute.name)
             else:
-                del self._ip_mute_cache[ip_base]
+                self.punishments.remove_mute(mute.xuid)
+            return False, None, None
 
-        row = self.execute(
-            "SELECT name, mute_time, mute_reason FROM mod_logs "
-            "WHERE ip_address LIKE ? AND is_ip_muted = 1 "
-            "ORDER BY mute_time DESC LIMIT 1",
-            (f"{ip_base}%",), readonly=True
-        ).fetchone()
-
-        if row:
-            name, mute_time, mute_reason = row
-
-            if mute_time < now:
-                self._ip_mute_cache.pop(ip_base, None)
-
-                self.update(
-                    'mod_logs',
-                    {'is_muted': 0, 'mute_time': 0, 'mute_reason': "None", "is_ip_muted": 0},
-                    'name = ?',
-                    (name,)
-                )
-                self.insert(
-                    'punishment_logs',
-                    {
-                        'xuid': self.get_xuid_by_name(name),
-                        'name': name,
-                        'action_type': 'Unmute',
-                        'reason': 'Mute Expired',
-                        'timestamp': int(now),
-                        'duration': 0
-                    }
-                )
-                return False, None, None
-
-            result = (True, mute_time, mute_reason)
-
-            self._ip_mute_cache[ip_base] = (result, now + self._cache_ttl)
-
-            return result
-
-        result = (False, None, None)
-        self._ip_mute_cache[ip_base] = (result, now + self._cache_ttl)
-
-        return result
+        return True, mute.expires, mute.reason
 
     def remove_mute(self, name: str):
         xuid = self.get_xuid_by_name(name)
         self.update('mod_logs', {'is_muted': 0, 'mute_time': 0, 'mute_reason': "None", "is_ip_muted": 0}, 'name = ?', (name,))
+        self._sync_online_state(xuid, is_muted=0, mute_time=0)
         self.insert('punishment_logs', {
             'xuid': xuid, 'name': name, 'action_type': 'Unmute',
             'reason': 'Mute Expired', 'timestamp': int(time.time()), 'duration': 0
         })
         self.invalidate_user_cache(xuid)
-
-    def refresh_jail_cache(self):
-        """Load all currently jailed players into the cache."""
-        current_time = int(time.time())
-        rows = self.db.execute(
-            "SELECT xuid, jail_time FROM mod_logs WHERE is_jailed = 1 AND jail_time > ?",
-            (current_time,), readonly=True
-        ).fetchall()
-
-        self.jailed_cache = {xuid: jail_time for xuid, jail_time in rows}
+        self.punishments.remove_mute(xuid)
 
     def add_jail(self, xuid: str, expiration: int, reason: str, jail: str = None, jail_gamemode: str = None, jail_pos: Vector = None, jail_dim: str = None):
         """Jail a player, optionally storing the return position and dimension."""
@@ -1793,12 +2031,14 @@ class UserDB(DatabaseManager):
         if jail_dim:
             update_data['return_jail_dim'] = jail_dim
 
+        name = self.get_name_by_xuid(xuid)
         self.update('mod_logs', update_data, 'xuid = ?', (xuid,))
+        self._sync_online_state(xuid, is_jailed=1, jail_time=expiration)
         self.insert(
             'punishment_logs',
             {
                 'xuid': xuid,
-                'name': self.get_name_by_xuid(xuid),
+                'name': name,
                 'action_type': 'Jail',
                 'reason': reason,
                 'timestamp': int(time.time()),
@@ -1806,6 +2046,7 @@ class UserDB(DatabaseManager):
             }
         )
         self.invalidate_user_cache(xuid)
+        self.punishments.add_jail(xuid, name, expiration, reason)
 
     def remove_jail(self, name: str):
         """Unjail a player and log the action."""
@@ -1823,6 +2064,7 @@ class UserDB(DatabaseManager):
             'name = ?',
             (name,)
         )
+        self._sync_online_state(xuid, is_jailed=0, jail_time=0)
         self.insert(
             'punishment_logs',
             {
@@ -1836,50 +2078,35 @@ class UserDB(DatabaseManager):
         )
 
         self.invalidate_user_cache(xuid)
+        self.punishments.remove_jail(xuid)
 
     def force_unjail(self, xuid: str):
+        """Expires a jail immediately; the expiry job releases the player (or their next join does)."""
+        expiration = int(time.time()) - 1
         self.execute(
             "UPDATE mod_logs SET jail_time = ?, is_jailed = 1 WHERE xuid = ?",
-            (int(time.time()) - 1, xuid)
+            (expiration, xuid)
         )
+        self._sync_online_state(xuid, is_jailed=1, jail_time=expiration)
+        self.invalidate_user_cache(xuid)
 
-        # Also invalidate the cache for immediate effect
-        if xuid in self.jailed_cache:
-            self.jailed_cache[xuid] = int(time.time()) - 1
-            self.invalidate_user_cache(xuid)
+        jail = self.punishments.get_jail(xuid)
+        self.punishments.add_jail(
+            xuid, jail.name if jail else self.get_name_by_xuid(xuid), expiration, jail.reason if jail else "None"
+        )
 
     def check_jailed(self, xuid: str) -> tuple[bool, bool]:
         """
         Check if a player is jailed.
         Returns:
             (is_jailed, is_expired)
-            - is_jailed: True if the DB or cache indicates the player was jailed.
+            - is_jailed: True if the punishment index holds a jail for the player.
             - is_expired: True if the jail_time has passed.
         """
-        current_time = int(time.time())
-
-        # Clean up expired cache entries
-        expired = [k for k, t in self.jailed_cache.items() if t <= current_time]
-        for k in expired:
-            self.jailed_cache.pop(k, None)
-
-        # Check cached jail time
-        if xuid in self.jailed_cache:
-            jail_time = self.jailed_cache[xuid]
-            return True, jail_time <= current_time
-
-        # Query DB for jail info
-        row = self.execute(
-            "SELECT jail_time FROM mod_logs WHERE xuid = ? AND is_jailed = 1 LIMIT 1",
-            (xuid,), readonly=True
-        ).fetchone()
-
-        if row:
-            jail_time = row[0]
-            self.jailed_cache[xuid] = jail_time
-            return True, jail_time <= current_time
-
-        return False, False
+        jail = self.punishments.get_jail(xuid)
+        if jail is None:
+            return False, False
+        return True, bool(jail.expires) and jail.expires <= time.time()
     
     def print_punishment_history(self, name: str, page: int = 1):
         """Prints punishment history for a named player"""
@@ -2184,204 +2411,194 @@ class UserDB(DatabaseManager):
             del perms[permission]
             self.set_permissions(xuid, perms)
 
-    def save_inventory(self, player: Player) -> None:
-        try:
-            player_data = {
-                "xuid": player.xuid,
-                "name": player.name,
-                "inventory": [player.inventory.get_item(i) for i in range(player.inventory.size)],
-                "armor": {
-                    "helmet": getattr(player.inventory, "helmet", None),
-                    "chestplate": getattr(player.inventory, "chestplate", None),
-                    "leggings": getattr(player.inventory, "leggings", None),
-                    "boots": getattr(player.inventory, "boots", None),
-                    "offhand": getattr(player.inventory, "item_in_off_hand", None)
-                }
-            }
-        except Exception as e:
-            print(f"[Inventory Save] {player.name} inventory could not be saved: {e}")
+    def migrate_inventory_rows(self):
+        """Packs inventories/ender_chests rows from older versions into inventory_blobs, then drops those tables."""
+        for table, container in (("inventories", "inventory"), ("ender_chests", "ender_chest")):
+            exists = self.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,), readonly=True
+            ).fetchone()
+            if not exists:
+                continue
 
-        values = []
+            rows = self.execute(
+                f"""
+                SELECT xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data
+                FROM {table}
+                """,
+                readonly=True
+            ).fetchall()
+
+            players: dict[str, tuple[str, list[dict]]] = {}
+            for xuid, name, slot_type, slot, item_type, amount, damage, display_name, enchants, lore, unbreakable, data in rows:
+                if not xuid:
+                    continue
+                entries = players.setdefault(xuid, (name, []))[1]
+                entries.append({
+                    "slot_type": slot_type or "slot",
+                    "slot": slot or 0,
+                    "type": item_type or "minecraft:air",
+                    "amount": amount if amount not in (None, "null") else 1,
+                    "damage": damage if damage not in (None, "null") else 0,
+                    "display_name": display_name or None,
+                    "enchants": parse_legacy_field(enchants, {}),
+                    "lore": parse_legacy_field(lore, []),
+                    "unbreakable": unbreakable not in (None, "null", 0, "0"),
+                    "data": data if data not in (None, "null") else 0
+                })
 
-        for i, item in enumerate(player_data["inventory"]):
-            if not item:
+            values = []
+            for xuid, (name, entries) in players.items():
+                try:
+                    values.append((xuid, container, name, encode_inventory(entries)))
+                except Exception as e:
+                    print(f"[PrimeBDS] Failed to migrate {table} rows for {xuid}, keeping {table}: {e}")
+                    values = None
+                    break
+            if values is None:
                 continue
-            try:
-                meta = getattr(item, "item_meta", None) or {}
-                values.append((
-                    player_data["xuid"],
-                    player_data["name"],
-                    "slot",
-                    i,
-                    str(getattr(item, "type", "minecraft:air")),
-                    getattr(item, "amount", 1),
-                    getattr(meta, "damage", 0),
-                    getattr(meta, "display_name", ""),
-                    json.dumps(getattr(meta, "enchants", {})),
-                    json.dumps(getattr(meta, "lore", [])),
-                    getattr(meta, "is_unbreakable", False),
-                    getattr(item, "data", None)
+
+            statements = [(f"DROP TABLE {table}", (), False)]
+            if values:
+                # Blobs saved by this version win over leftover legacy rows
+                statements.insert(0, (
+                    "INSERT OR IGNORE INTO inventory_blobs (xuid, container, name, data) VALUES (?, ?, ?, ?)",
+                    values,
+                    True
                 ))
-            except Exception as e:
-                print(f"[Inventory Save] Failed to save slot {i} for {player.name}: {e}")
-                continue
+            self.queue_writes(statements)
+            self.flush_writes()
 
-        for slot_type, item in player_data["armor"].items():
-            if not item:
-                continue
+    def save_container(self, xuid: str, name: str, container: str, entries: list[dict],
+                       only_if_changed: bool = False) -> bool:
+        """
+        Queues a container save. Only the item snapshot is taken on the calling thread,
+        encoding and the UPSERT run on the writer thread. Until then get_container serves
+        the snapshot, so a quick rejoin never reads an older blob. Returns False if
+        only_if_changed is set and nothing changed since the last save.
+        A snapshot only counts as saved once it encoded, and stops counting if its write
+        is dropped, so a failed save is retried by the next autosave pass.
+        """
+        key = (xuid, container)
+        entries = tuple(entries)
+        with self._container_lock:
+            if only_if_changed:
+                pending = self._pending_containers.get(key)
+                if (pending and pending[1] == entries) or self._saved_containers.get(key) == entries:
+                    return False
+            self._pending_containers[key] = (name, entries)
+
+        def encode():
             try:
-                meta = getattr(item, "item_meta", None) or {}
-                values.append((
-                    player_data["xuid"],
-                    player_data["name"],
-                    slot_type,
-                    0,
-                    str(getattr(item, "type", "minecraft:air")),
-                    getattr(item, "amount", 1),
-                    getattr(meta, "damage", 0),
-                    getattr(meta, "display_name", ""),
-                    json.dumps(getattr(meta, "enchants", {})),
-                    json.dumps(getattr(meta, "lore", [])),
-                    getattr(meta, "is_unbreakable", False),
-                    getattr(item, "data", None)
-                ))
-            except Exception as e:
-                print(f"[Inventory Save] Failed to save {slot_type} for {player.name}: {e}")
-                continue
+                data = encode_inventory(entries)
+            except (ValueError, OverflowError, struct.error) as e:
+                print(f"[Inventory Save] Failed to encode {container} for {name} ({xuid}): {e}")
+                data = None
+            with self._container_lock:
+                if data is not None:
+                    self._saved_containers[key] = entries
+                pending = self._pending_containers.get(key)
+                if pending and pending[1] is entries:
+                    del self._pending_containers[key]
+            return None if data is None else (xuid, container, name, data)
+
+        def dropped():
+            with self._container_lock:
+                if self._saved_containers.get(key) is entries:
+                    del self._saved_containers[key]
+
+        self.queue_write(
+            """
+            INSERT INTO inventory_blobs (xuid, container, name, data) VALUES (?, ?, ?, ?)
+            ON CONFLICT(xuid, container) DO UPDATE SET name = excluded.name, data = excluded.data
+            """,
+            encode,
+            dropped
+        )
+        self.invalidate_user_cache(xuid)
+        return True
 
-        with self._lock:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM inventories WHERE xuid = ?", (player_data["xuid"],))
-            if values:
-                cursor.executemany("""
-                    INSERT INTO inventories
-                    (xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, values)
-                self.conn.commit()
+    def forget_containers(self, xuid: str):
+        """Drops the last-saved snapshots kept for change detection once a player leaves."""
+        with self._container_lock:
+            for container in ("inventory", "ender_chest"):
+                self._saved_containers.pop((xuid, container), None)
 
-        self.invalidate_user_cache(player.xuid)
+    def get_container(self, xuid: str, container: str) -> list[dict]:
+        """Decodes a stored container into flat dicts ready for load_inventory/load_enderchest."""
+        with self._container_lock:
+            pending = self._pending_containers.get((xuid, container))
+        if pending:
+            name, entries = pending
+            return [dict(entry, xuid=xuid, name=name) for entry in entries]
 
-    def get_inventory(self, xuid: str) -> list[dict]:
-        """Fetch inventory rows as flat dicts ready for load_inventory."""
-        self.cursor.execute("SELECT * FROM inventories WHERE xuid = ?", (xuid,))
-        rows = self.cursor.fetchall()
-        items = []
+        row = self.execute(
+            "SELECT name, data FROM inventory_blobs WHERE xuid = ? AND container = ?", (xuid, container), readonly=True
+        ).fetchone()
+        if not row or not row[1]:
+            return []
 
-        for row in rows:
-            try:
+        try:
+            entries = decode_inventory(row[1])
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            print(f"[WARN] Failed to decode {container} for {xuid}: {e}")
+            return []
 
-                try:
-                    enchants = {} if not row[6] or row[6] in ("null", "0") else eval(row[6])
-                except Exception:
-                    enchants = {}
+        for entry in entries:
+            entry["xuid"] = xuid
+            entry["name"] = row[0]
+        return entries
 
-                try:
-                    lore = [] if not row[7] or row[7] in ("null", "0") else eval(row[7])
-                except Exception:
-                    lore = []
-
-                items.append({
-                    "xuid": row[0] or None,
-                    "name": row[1] or None,
-                    "slot_type": row[9] or "slot",
-                    "slot": int(row[10]) or 0,
-                    "type": row[2] or "minecraft:air",
-                    "amount": int(row[3]) if row[3] not in (None, 'null') else 1,
-                    "damage": int(row[4]) if row[4] not in (None, 'null') else 0,
-                    "display_name": row[5] or None,
-                    "enchants": enchants,
-                    "lore": lore,
-                    "unbreakable": bool(row[8]) if row[8] not in (None, 'null') else False,
-                    "data": int(row[11])
-                })
+    def save_inventory(self, player: Player, only_if_changed: bool = False) -> bool:
+        try:
+            inventory = [player.inventory.get_item(i) for i in range(player.inventory.size)]
+            armor = {
+                "helmet": getattr(player.inventory, "helmet", None),
+                "chestplate": getattr(player.inventory, "chestplate", None),
+                "leggings": getattr(player.inventory, "leggings", None),
+                "boots": getattr(player.inventory, "boots", None),
+                "offhand": getattr(player.inventory, "item_in_off_hand", None)
+            }
+        except Exception as e:
+            print(f"[Inventory Save] {player.name} inventory could not be saved: {e}")
+            return False
 
+        entries = []
+        for i, item in enumerate(inventory):
+            try:
+                entry = item_to_entry(item, "slot", i)
             except Exception as e:
-                print(f"[WARN] Failed to load inventory row for {xuid}: {e}, row={row}")
+                print(f"[Inventory Save] Failed to save slot {i} for {player.name}: {e}")
                 continue
+            if entry:
+                entries.append(entry)
 
-        return items
-
-    def save_enderchest(self, player: Player) -> None:
-        player_data = {
-            "xuid": player.xuid,
-            "name": player.name,
-            "inventory": [player.ender_chest.get_item(i) for i in range(player.ender_chest.size)],
-        }
+        for slot_type, item in armor.items():
+            try:
+                entry = item_to_entry(item, slot_type, 0)
+            except Exception as e:
+                print(f"[Inventory Save] Failed to save {slot_type} for {player.name}: {e}")
+                continue
+            if entry:
+                entries.append(entry)
 
-        with self._lock:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM ender_chests WHERE xuid = ?", (player_data["xuid"],))
-            values = []
+        return self.save_container(player.xuid, player.name, "inventory", entries, only_if_changed)
 
-            for i, item in enumerate(player_data["inventory"]):
-                if not item:
-                    continue
-                meta = item.item_meta
-                values.append((
-                    player_data["xuid"],
-                    player_data["name"],
-                    "slot",
-                    i,
-                    str(item.type) or "minecraft:air",
-                    item.amount or 1,
-                    meta.damage,
-                    meta.display_name,
-                    json.dumps(meta.enchants),
-                    json.dumps(meta.lore),
-                    meta.is_unbreakable,
-                    item.data
-                ))
+    def get_inventory(self, xuid: str) -> list[dict]:
+        """Fetch inventory items as flat dicts ready for load_inventory."""
+        return self.get_container(xuid, "inventory")
 
-            # Insert all at once
-            cursor.executemany("""
-                INSERT INTO ender_chests
-                (xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, values)
-            self.conn.commit()
+    def save_enderchest(self, player: Player, only_if_changed: bool = False) -> bool:
+        entries = []
+        for i in range(player.ender_chest.size):
+            entry = item_to_entry(player.ender_chest.get_item(i), "slot", i)
+            if entry:
+                entries.append(entry)
 
-        self.invalidate_user_cache(player.xuid)
+        return self.save_container(player.xuid, player.name, "ender_chest", entries, only_if_changed)
 
     def get_enderchest(self, xuid: str) -> list[dict]:
-        self.cursor.execute("SELECT * FROM ender_chests WHERE xuid = ?", (xuid,))
-        rows = self.cursor.fetchall()
-        items = []
+        return self.get_container(xuid, "ender_chest")
 
-        for row in rows:
-            try:
-
-                try:
-                    enchants = {} if not row[6] or row[6] in ("null", "0") else eval(row[6])
-                except Exception:
-                    enchants = {}
-
-                try:
-                    lore = [] if not row[7] or row[7] in ("null", "0") else eval(row[7])
-                except Exception:
-                    lore = []
-
-                items.append({
-                    "xuid": row[0] or None,
-                    "name": row[1] or None,
-                    "slot_type": row[9] or "slot",
-                    "slot": int(row[10]) or 0,
-                    "type": row[2] or "minecraft:air",
-                    "amount": int(row[3]) if row[3] not in (None, 'null') else 1,
-                    "damage": int(row[4]) if row[4] not in (None, 'null') else 0,
-                    "display_name": row[5] or None,
-                    "enchants": enchants,
-                    "lore": lore,
-                    "unbreakable": bool(row[8]) if row[8] not in (None, 'null') else False,
-                    "data": int(row[11])
-                })
-
-            except Exception as e:
-                print(f"[WARN] Failed to load ender chestrow for {xuid}: {e}, row={row}")
-                continue
-
-        return items
-    
     def load_inventory(self, player: Player) -> None:
         """Apply DB inventory to player object"""
         items = self.get_inventory(player.xuid)
@@ -2454,17 +2671,21 @@ class UserDB(DatabaseManager):
                 continue
 
     def update_user_data(self, name: str, column: str, value):
-        self.invalidate_user_cache(self.get_xuid_by_name(name))
+        xuid = self.get_xuid_by_name(name)
+        self.invalidate_user_cache(xuid)
         if isinstance(value, Vector):
             x, y, z = value.x, value.y, value.z
             value = f"{x},{y},{z}"
+        self._sync_online_state(xuid, **{column: value})
         self.update('users', {column: value}, 'name = ?', (name,))
 
     def update_mod_data(self, name: str, column: str, value):
-        self.invalidate_user_cache(self.get_xuid_by_name(name))
+        xuid = self.get_xuid_by_name(name)
+        self.invalidate_user_cache(xuid)
         if isinstance(value, Vector):
             x, y, z = value.x, value.y, value.z
             value = f"{x},{y},{z}"
+        self._sync_online_state(xuid, **{column: value})
         self.update('mod_logs', {column: value}, 'name = ?', (name,))
 
 class sessionDB(DatabaseManager):
@@ -2474,6 +2695,7 @@ class sessionDB(DatabaseManager):
         """Initialize the database connection and create tables."""
         super().__init__(db_name)
         self.create_tables()
+        self.backfill_playtime_totals()
 
     def create_tables(self):
         """Create tables if they don't exist."""
@@ -2489,8 +2711,43 @@ class sessionDB(DatabaseManager):
             'xuid': 'TEXT',
             'name': 'TEXT'
         }
+        playtime_total_columns = {
+            'xuid': 'TEXT PRIMARY KEY',
+            'name': 'TEXT',
+            'total_playtime': 'INTEGER DEFAULT 0',
+            'last_session_start': 'INTEGER',
+            'open_session_start': 'INTEGER'
+        }
         self.create_table('sessions_log', session_log_columns)
         self.create_table('user_toggles', user_toggle_columns)
+        self.create_table('playtime_totals', playtime_total_columns)
+        self.create_index('sessions_log', ['xuid', 'end_time'])
+        self.create_index('playtime_totals', ['total_playtime'])
+        self.create_index('playtime_totals', ['last_session_start'])
+
+    def backfill_playtime_totals(self):
+        """Builds playtime_totals from sessions_log the first time it is empty."""
+        if self.execute("SELECT 1 FROM playtime_totals LIMIT 1", readonly=True).fetchone():
+            return
+
+        now = int(time.time())
+        self.execute(
+            """
+            INSERT OR IGNORE INTO playtime_totals (xuid, name, total_playtime, last_session_start, open_session_start)
+            SELECT s.xuid,
+                   (SELECT name FROM sessions_log n WHERE n.xuid = s.xuid ORDER BY n.start_time DESC LIMIT 1),
+                   SUM(CASE WHEN s.end_time > 0 AND s.start_time > 0 AND s.start_time <= :now
+                            AND s.end_time >= s.start_time THEN s.end_time - s.start_time ELSE 0 END),
+                   MAX(s.start_time),
+                   MAX(CASE WHEN s.end_time IS NULL AND s.start_time > 0 AND s.start_time <= :now
+                            THEN s.start_time END)
+            FROM sessions_log s
+            WHERE s.xuid IS NOT NULL
+            GROUP BY s.xuid
+            """,
+            {"now": now}
+        )
+        self.conn.commit()
 
     def fetch_all_as_dicts(self, query: str, params: tuple = ()) -> list[dict]:
         """Helper to run a query and return list of dicts keyed by column name."""
@@ -2522,14 +2779,38 @@ class sessionDB(DatabaseManager):
             'end_time': None
         }
         self.insert('sessions_log', data)
+        self.queue_write(
+            """
+            INSERT INTO playtime_totals (xuid, name, total_playtime, last_session_start, open_session_start)
+            VALUES (?, ?, 0, ?, ?)
+            ON CONFLICT(xuid) DO UPDATE SET
+                name = excluded.name,
+                last_session_start = excluded.last_session_start,
+                open_session_start = excluded.open_session_start
+            """,
+            (xuid, name, start_time, start_time)
+        )
 
     def end_session(self, xuid: str, end_time: int):
+        # Fold the closing sessions into the running total before they are closed
+        totals_query = """
+            UPDATE playtime_totals
+            SET total_playtime = total_playtime + (
+                    SELECT COALESCE(SUM(? - start_time), 0) FROM sessions_log
+                    WHERE xuid = ? AND end_time IS NULL AND start_time > 0 AND start_time <= ?
+                ),
+                open_session_start = NULL
+            WHERE xuid = ?
+        """
         query = """
             UPDATE sessions_log
             SET end_time = ?
             WHERE xuid = ? AND end_time IS NULL
         """
-        self.execute(query, (end_time, xuid))
+        self.queue_writes([
+            (totals_query, (end_time, xuid, end_time, xuid), False),
+            (query, (end_time, xuid), False)
+        ])
 
     def get_current_session(self, xuid: str):
         query = "SELECT * FROM sessions_log WHERE xuid = ? AND end_time IS NULL ORDER BY start_time DESC LIMIT 1"
@@ -2558,38 +2839,63 @@ class sessionDB(DatabaseManager):
             })
         return result
 
+    @staticmethod
+    def _live_playtime(total_playtime: int, open_session_start: Optional[int], now: int) -> int:
+        total_playtime = total_playtime or 0
+        if open_session_start and open_session_start <= now:
+            total_playtime += now - open_session_start
+        return total_playtime
+
     def get_total_playtime(self, xuid: str) -> int:
-        query = "SELECT start_time, end_time FROM sessions_log WHERE xuid = ?"
-        cursor = self.execute(query, (xuid,), readonly=True)
-        sessions = cursor.fetchall()
+        row = self.execute(
+            "SELECT total_playtime, open_session_start FROM playtime_totals WHERE xuid = ?",
+            (xuid,), readonly=True
+        ).fetchone()
+        if not row:
+            return 0
+        return self._live_playtime(row[0], row[1], int(time.time()))
 
-        total_time = 0
-        now = int(time.time())
+    def count_playtimes(self) -> int:
+        return self.execute("SELECT COUNT(*) FROM playtime_totals", readonly=True).fetchone()[0]
 
-        for start_time, end_time in sessions:
-            if not isinstance(start_time, (int, float)) or start_time <= 0 or start_time > now:
-                continue 
+    def get_playtime_page(self, order: str = "highest", limit: int = 10, offset: int = 0) -> list[dict]:
+        """
+        Returns one page of playtime_totals ordered by "highest", "lowest" or "recent".
+        Ordering uses the stored totals (closed sessions), the returned totals include
+        any session still in progress.
+        """
+        order_by = {
+            "highest": "total_playtime DESC",
+            "lowest": "total_playtime ASC",
+            "recent": "last_session_start DESC",
+        }.get(order, "total_playtime DESC")
 
-            if end_time:
-                if not isinstance(end_time, (int, float)) or end_time <= 0 or end_time < start_time:
-                    continue
-                total_time += int(end_time - start_time)
-            else:
-                total_time += int(now - start_time)
+        rows = self.execute(
+            f"""
+            SELECT xuid, name, total_playtime, last_session_start, open_session_start
+            FROM playtime_totals ORDER BY {order_by} LIMIT ? OFFSET ?
+            """,
+            (limit, offset), readonly=True
+        ).fetchall()
 
-        return total_time
+        now = int(time.time())
+        return [{
+            'xuid': xuid,
+            'name': name,
+            'total_playtime': self._live_playtime(total, open_start, now),
+            'recent_session_start': last_start
+        } for xuid, name, total, last_start, open_start in rows]
 
-    def get_all_playtimes(self) -> list[dict]:
-        query = "SELECT DISTINCT xuid, name FROM sessions_log"
-        cursor = self.execute(query, readonly=True)  # readonly for faster non-blocking SELECT
-        users = cursor.fetchall()
+    def get_playtime_rank(self, xuid: str) -> Optional[int]:
+        """1-based position of a player in the highest-playtime ordering."""
+        row = self.execute(
+            "SELECT total_playtime FROM playtime_totals WHERE xuid = ?", (xuid,), readonly=True
+        ).fetchone()
+        if not row:
+            return None
+        return self.execute(
+            "SELECT COUNT(*) FROM playtime_totals WHERE total_playtime > ?", (row[0],), readonly=True
+        ).fetchone()[0] + 1
 
-        result = []
-        for xuid, name in users:
-            total_playtime = self.get_total_playtime(xuid)
-            result.append({
-                'xuid': xuid,
-                'name': name,
-                'total_playtime': total_playtime
-            })
-        return result
\ No newline at end of file
+    def get_all_playtimes(self) -> list[dict]:
+        return self.get_playtime_page("highest", -1, 0)
@@ -0,0 +1,128 @@
+import functools
+import inspect
+import json
+import math
+import os
+from array import array
+from datetime import datetime
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
+
+from endstone_primebds.utils.packet_utils.profiler import PROFILES_FOLDER
+
+if TYPE_CHECKING:
+    from endstone_primebds.primebds import PrimeBDS
+
+# Log-bucketed latency histogram: 4 buckets per power of two from 1µs up to ~16s,
+# so every percentile is accurate to within ~19%.
+BUCKETS_PER_OCTAVE = 4
+BUCKET_COUNT = 24 * BUCKETS_PER_OCTAVE + 2
+
+def bucket_index(elapsed_ns: int) -> int:
+    micros = elapsed_ns / 1000
+    if micros < 1:
+        return 0
+    return min(BUCKET_COUNT - 1, int(math.log2(micros) * BUCKETS_PER_OCTAVE) + 1)
+
+def bucket_upper_us(index: int) -> float:
+    if index == 0:
+        return 1.0
+    return 2 ** (index / BUCKETS_PER_OCTAVE)
+
+class HandlerStats:
+    __slots__ = ("count", "errors", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = array("Q", [0]) * BUCKET_COUNT
+
+    def percentile_us(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        target = self.count * pct
+        seen = 0
+        for index, amount in enumerate(self.histogram):
+            seen += amount
+            if seen >= target:
+                return min(bucket_upper_us(index), self.max_ns / 1000)
+        return self.max_ns / 1000
+
+    def to_dict(self, name: str) -> dict:
+        return {
+            "event": name,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total_ns / 1_000_000,
+            "avg_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile_us(0.50),
+            "p95_us": self.percentile_us(0.95),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": self.max_ns / 1000,
+        }
+
+class HandlerProfiler:
+    """Per-event call counts, latency histograms and exception counts for PrimeBDS listeners."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stats: dict[str, HandlerStats] = {}
+
+    def reset(self):
+        self.stats.clear()
+
+    def record(self, name: str, elapsed_ns: int, failed: bool = False):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = HandlerStats()
+        stats.count += 1
+        stats.total_ns += elapsed_ns
+        if elapsed_ns > stats.max_ns:
+            stats.max_ns = elapsed_ns
+        stats.histogram[bucket_index(elapsed_ns)] += 1
+        if failed:
+            stats.errors += 1
+
+    def rows(self) -> list[dict]:
+        """Per-event summaries, most total time first."""
+        rows = [stats.to_dict(name) for name, stats in self.stats.items()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def dump(self) -> str:
+        """Writes the current summaries to primebds_data/profiles, returns the file path."""
+        os.makedirs(PROFILES_FOLDER, exist_ok=True)
+        path = os.path.join(PROFILES_FOLDER, f"handlers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"handlers": self.rows()}, f, indent=4)
+        return path
+
+def profiled(func):
+    """
+    Wraps a PrimeBDS event listener so its calls are timed under the event type name
+    when handler profiling is enabled. Apply it below @event_handler; the wrapped
+    signature is preserved so event registration still sees the event annotation.
+    """
+    params = list(inspect.signature(func).parameters.values())
+    annotation = params[1].annotation if len(params) > 1 else None
+    name = getattr(annotation, "__name__", func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(self: "PrimeBDS", ev):
+        profiler = self.handler_profiler
+        if not profiler.enabled:
+            return func(self, ev)
+
+        failed = False
+        start = perf_counter_ns()
+        try:
+            return func(self, ev)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            profiler.record(name, perf_counter_ns() - start, failed)
+
+    return wrapper
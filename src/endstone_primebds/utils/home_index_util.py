@@ -0,0 +1,72 @@
+import re
+from typing import Callable, Optional
+
+COLOR_CODE_PATTERN = re.compile(r"(§[0-9A-FK-OR])|(&[0-9A-FK-OR])", re.IGNORECASE)
+
+def normalize_home_name(name: str) -> list[str]:
+    """Strip color codes, trim, lowercase, split into words."""
+    if not name:
+        return []
+    return COLOR_CODE_PATTERN.sub("", name).strip().lower().split()
+
+class HomeEntry:
+    """A cached homes row. The location is decoded on first use, not when the row is loaded."""
+    __slots__ = ("xuid", "username", "name", "pos_str", "cooldown", "delay", "tokens", "_pos")
+
+    def __init__(self, xuid: Optional[str], username: Optional[str], name: str, pos_str: Optional[str],
+                 cooldown=0, delay=0):
+        self.xuid = xuid
+        self.username = username
+        self.name = name
+        self.pos_str = pos_str
+        self.cooldown = cooldown
+        self.delay = delay
+        self.tokens = normalize_home_name(name)
+        self._pos = None
+
+    def location(self, decode: Callable[[str], object]):
+        if self._pos is None and self.pos_str:
+            self._pos = decode(self.pos_str)
+        return self._pos
+
+class PlayerHomes:
+    """
+    One player's homes in table order, with a token -> first home lookup so /home <name>
+    is a dict probe per search word instead of a regex and word-list scan per home.
+    """
+
+    def __init__(self, entries: list[HomeEntry] = None):
+        self.entries: list[HomeEntry] = []
+        self.by_token: dict[str, HomeEntry] = {}
+        for entry in entries or ():
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def names(self) -> list[str]:
+        return [entry.name for entry in self.entries]
+
+    def has(self, name: str) -> bool:
+        return any(entry.name == name for entry in self.entries)
+
+    def add(self, entry: HomeEntry):
+        self.entries.append(entry)
+        for token in entry.tokens:
+            self.by_token.setdefault(token, entry)
+
+    def remove(self, name: str) -> bool:
+        remaining = [entry for entry in self.entries if entry.name != name]
+        if len(remaining) == len(self.entries):
+            return False
+        self.__init__(remaining)
+        return True
+
+    def find(self, name: str) -> Optional[HomeEntry]:
+        """The first home sharing any word with name, matching the old per-row scan."""
+        best = None
+        for token in normalize_home_name(name):
+            entry = self.by_token.get(token)
+            if entry is not None and (best is None or self.entries.index(entry) < self.entries.index(best)):
+                best = entry
+        return best
@@ -1,7 +1,9 @@
 import time
+from types import MappingProxyType
+from typing import Mapping
 
 from endstone import Player
-from endstone_primebds.utils.config_util import load_permissions, load_config
+from endstone_primebds.utils.config_util import load_permissions, load_config, get_permissions_generation
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -117,6 +119,35 @@ EXTRA_PERMS = [
     "primebds.command.hat.other"
 ]
 
+# Root permissions never pushed through the override attachment
+INTERNAL_PERMISSIONS = {"minecraft", "minecraft.command", "endstone", "endstone.command"}
+
+# Permissions that always share one value: granting any of them grants all of them
+LINKED_PERMISSION_GROUPS = (
+    ("primebds.command.permban", "endstone.command.ban"),
+    ("primebds.command.ipban", "endstone.command.banip"),
+    ("primebds.command.removeban", "endstone.command.unban", "endstone.command.unbanip"),
+    ("primebds.command.filterlist", "endstone.command.banlist"),
+)
+
+# Permission -> plugin prefix for "<prefix>" / "<prefix>.command" style star permissions
+_plugin_star_prefixes: dict[str, str | None] = {}
+
+def get_plugin_star_prefix(perm: str) -> str | None:
+    """Returns the plugin prefix if perm is a plugin-wide star permission, otherwise None."""
+    try:
+        return _plugin_star_prefixes[perm]
+    except KeyError:
+        pass
+
+    prefix = None
+    if perm not in INTERNAL_PERMISSIONS:
+        head = perm.split(".")[0]
+        if perm == head or perm == f"{head}.command":
+            prefix = head
+    _plugin_star_prefixes[perm] = prefix
+    return prefix
+
 def reload_rank_list():
     global RANKS
     RANKS = list(load_permissions().keys())
@@ -210,6 +241,11 @@ def load_perms(self: "PrimeBDS"):
     for perm in EXTRA_PERMS:
         if perm not in MANAGED_PERMISSIONS_LIST and primebds_enabled:
             MANAGED_PERMISSIONS_LIST.append(perm)
+    invalidate_rank_tables()
+
+    _plugin_star_prefixes.clear()
+    for perm in MANAGED_PERMISSIONS_LIST:
+        get_plugin_star_prefix(perm.lower())
 
     endstone_filtered = [perm for perm in plugin_perms if "endstone" in perm]
     if endstone_filtered:
@@ -282,36 +318,37 @@ def get_permission_header(plugin) -> str | None:
 
     return perm_lower.split(".")[0]
 
-def get_rank_permissions(rank: str) -> dict[str, bool]:
-    """Return a dict of permissions (lowercased) -> bool for the given rank, including inheritance."""
-    global PERMISSIONS
-    PERMISSIONS = load_permissions(None, True)
-
-    base_rank = normalize_rank_name(rank)
-    seen_ranks = set()
-
-    result: dict[str, bool] = {p.lower(): False for p in MANAGED_PERMISSIONS_LIST}
-
-    def gather_permissions(r):
-        r_norm = normalize_rank_name(r)
-        if r_norm in seen_ranks:
-            return
-        seen_ranks.add(r_norm)
-
-        group = None
-        for key, val in PERMISSIONS.items():
-            if key.lower() == r_norm.lower():
-                group = val
-                break
-        if not group or not isinstance(group, dict):
-            return
-
-        inherits = group.get("inherits", [])
-        if isinstance(inherits, list):
-            for parent in inherits:
-                if isinstance(parent, str):
-                    gather_permissions(parent)
-
+# Compiled rank tables, rebuilt once per permissions.json revision / managed list change
+_rank_tables: dict[str, Mapping[str, bool]] = {}
+_rank_attachments: dict[str, tuple[Mapping[str, bool], dict[str, bool], dict[str, list[str]]]] = {}
+_rank_groups: dict[str, tuple[str, bool | None, dict]] = {}
+_rank_tables_generation = -1
+
+def invalidate_rank_tables():
+    """Drops compiled rank tables and every cached offline permission lookup derived from them."""
+    global _rank_tables_generation
+    _rank_tables.clear()
+    _rank_attachments.clear()
+    _rank_groups.clear()
+    _rank_tables_generation = -1
+    perm_cache.clear()
+
+def _sync_rank_tables():
+    global PERMISSIONS, _rank_tables_generation
+    generation = get_permissions_generation()
+    if generation == _rank_tables_generation:
+        return
+
+    _rank_tables.clear()
+    _rank_attachments.clear()
+    perm_cache.clear()
+    PERMISSIONS = load_permissions()
+    generation = get_permissions_generation()
+
+    _rank_groups.clear()
+    for key, group in PERMISSIONS.items():
+        if not isinstance(group, dict):
+            continue
         perms = group.get("permissions", {})
         if isinstance(perms, dict):
             fixed_perms = {k.lower(): bool(v) for k, v in perms.items()}
@@ -319,21 +356,125 @@ def get_rank_permissions(rank: str) -> dict[str, bool]:
             fixed_perms = {p.lower(): True for p in perms if isinstance(p, str)}
         else:
             fixed_perms = {}
+        wildcard_value = fixed_perms.pop("*", None)
+        _rank_groups.setdefault(key.lower(), (key, wildcard_value, fixed_perms))
+    _rank_tables_generation = generation
+
+def _rank_chain(rank: str) -> list[tuple[str, bool | None, dict]]:
+    """Own permissions of a rank and its ancestors, parents first, each rank visited once."""
+    chain = []
+    seen = set()
+
+    def visit(r):
+        r_norm = normalize_rank_name(r).lower()
+        if r_norm in seen:
+            return
+        seen.add(r_norm)
 
-        if "*" in fixed_perms:
-            wildcard_value = fixed_perms["*"]
-            for p in list(result.keys()):
-                if p not in fixed_perms:
-                    result[p] = wildcard_value
+        entry = _rank_groups.get(r_norm)
+        if entry is None:
+            return
+        inherits = PERMISSIONS[entry[0]].get("inherits", [])
+        if isinstance(inherits, list):
+            for parent in inherits:
+                if isinstance(parent, str):
+                    visit(parent)
+        chain.append(entry)
 
-        for perm_name, allowed in fixed_perms.items():
-            if perm_name == "*":
-                continue
-            result[perm_name] = allowed
+    visit(rank)
+    return chain
+
+def _compile_rank(rank: str) -> Mapping[str, bool]:
+    result: dict[str, bool] = dict.fromkeys((p.lower() for p in MANAGED_PERMISSIONS_LIST), False)
+    for _, wildcard_value, fixed_perms in _rank_chain(rank):
+        if wildcard_value is not None:
+            result = dict.fromkeys(result, wildcard_value)
+        result.update(fixed_perms)
+    return MappingProxyType(result)
 
-    gather_permissions(base_rank)
+def get_rank_permissions(rank: str) -> Mapping[str, bool]:
+    """
+    Return the permissions (lowercased) -> bool for the given rank, including inheritance.
+    Tables are compiled once per permissions.json revision and shared read-only; copy before editing.
+    """
+    _sync_rank_tables()
+    base_rank = normalize_rank_name(rank)
+    table = _rank_tables.get(base_rank)
+    if table is None:
+        table = _rank_tables[base_rank] = _compile_rank(base_rank)
+    return table
+
+def _attachment_values(table: Mapping[str, bool], overrides: Mapping[str, bool],
+                       stars: Mapping[str, bool], perms) -> dict[str, bool]:
+    """Resolves linked groups and plugin stars for the given permissions, skipping internal roots."""
+    def lookup(perm):
+        return overrides[perm] if perm in overrides else table.get(perm)
+
+    linked = {}
+    for group in LINKED_PERMISSION_GROUPS:
+        values = [value for value in map(lookup, group) if value is not None]
+        if values:
+            linked.update(dict.fromkeys(group, any(values)))
+
+    result = {}
+    for perm in perms:
+        if perm in INTERNAL_PERMISSIONS:
+            continue
+        value = linked[perm] if perm in linked else lookup(perm)
+        if value is not None:
+            result[perm] = bool(stars.get(perm.split(".")[0], value))
     return result
 
+def _compile_attachment(table: Mapping[str, bool]):
+    # Star permissions per plugin prefix in table order; the last one decides the plugin's value
+    star_perms: dict[str, list[str]] = {}
+    for perm in table:
+        prefix = get_plugin_star_prefix(perm)
+        if prefix is not None:
+            star_perms.setdefault(prefix, []).append(perm)
+    stars = {prefix: table[perms[-1]] for prefix, perms in star_perms.items()}
+
+    perms = list(table)
+    perms.extend(perm for group in LINKED_PERMISSION_GROUPS for perm in group if perm not in table)
+    return MappingProxyType(_attachment_values(table, {}, stars, perms)), stars, star_perms
+
+def get_permission_attachment(rank: str, user_permissions: dict) -> tuple[Mapping[str, bool], dict[str, bool]]:
+    """
+    Return the override attachment vector for a player as (rank vector, user overrides).
+    The rank vector is compiled once per revision and shared read-only like get_rank_permissions();
+    the overrides only hold the entries the user's own permissions change, and win over the rank vector.
+    """
+    table = get_rank_permissions(rank)
+    base_rank = normalize_rank_name(rank)
+    compiled = _rank_attachments.get(base_rank)
+    if compiled is None:
+        compiled = _rank_attachments[base_rank] = _compile_attachment(table)
+    base, rank_stars, star_perms = compiled
+
+    if not user_permissions:
+        return base, {}
+
+    overrides = {perm.lower(): bool(allowed) for perm, allowed in user_permissions.items()}
+    stars = rank_stars
+    touched = {get_plugin_star_prefix(perm) for perm in overrides} - {None}
+    if touched:
+        stars = dict(rank_stars)
+        for prefix in touched:
+            # User-only star permissions come after the rank's, as they would in a merged table
+            perms = star_perms.get(prefix, []) + [
+                perm for perm in overrides if perm not in table and get_plugin_star_prefix(perm) == prefix
+            ]
+            last = perms[-1]
+            stars[prefix] = overrides[last] if last in overrides else table[last]
+
+    # Only the user's own entries, linked groups and perms under a star the user changed can differ
+    perms = set(overrides)
+    perms.update(perm for group in LINKED_PERMISSION_GROUPS for perm in group)
+    changed_stars = {prefix for prefix, value in stars.items() if rank_stars.get(prefix) != value}
+    if changed_stars:
+        perms.update(perm for perm in table if perm.split(".")[0] in changed_stars)
+    return base, _attachment_values(table, overrides, stars, perms)
+
 perm_cache = {}
 def check_perms(self: "PrimeBDS", player_or_user, perm: str, check_rank=False) -> bool:
     now = time.time()
@@ -346,11 +487,12 @@ def check_perms(self: "PrimeBDS", player_or_user, perm: str, check_rank=False) -
     if xuid is None:
         return False
 
+    _sync_rank_tables()
+    perm = perm.lower()
     cached = perm_cache.get(xuid)
     if cached:
-        perms, ts = cached
-        result = perms.get(perm, False)
-        return result
+        table, overrides, ts = cached
+        return overrides.get(perm, table.get(perm, False))
 
     user_name = self.db.get_name_by_xuid(xuid)
     user = self.db.get_offline_user(user_name)
@@ -358,15 +500,14 @@ def check_perms(self: "PrimeBDS", player_or_user, perm: str, check_rank=False) -
         return False
 
     rank = getattr(user, "internal_rank", "") if hasattr(user, "internal_rank") else ""
-    final_perms = get_rank_permissions(rank)
+    table = get_rank_permissions(rank)
 
+    # The rank table is shared; only the user's own overrides are cached per player
     user_permissions = self.db.get_permissions(xuid)
-    for perm_name, allowed in user_permissions.items():
-        final_perms[perm_name.lower()] = bool(allowed)
+    overrides = {perm_name.lower(): bool(allowed) for perm_name, allowed in user_permissions.items()}
 
-    perm_cache[xuid] = (final_perms, now)
-    result = final_perms.get(perm.lower(), False)
-    return result
+    perm_cache[xuid] = (table, overrides, now)
+    return overrides.get(perm, table.get(perm, False))
 
 def invalidate_perm_cache(xuid: str):
     perm_cache.pop(xuid, None)
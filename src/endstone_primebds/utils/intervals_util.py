@@ -1,18 +1,208 @@
+from collections import deque
+from time import perf_counter_ns
 from typing import TYPE_CHECKING, Callable, Optional
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
     from endstone import Player
 
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SIZE - 1
+WHEEL_LEVELS = 3
+WHEEL_SPAN = WHEEL_SIZE ** WHEEL_LEVELS
+
+class ScheduledJob:
+    """Handle returned by TickScheduler.schedule, cancel() stops any further runs."""
+    __slots__ = ("callback", "name", "period", "due", "cancelled")
+
+    def __init__(self, callback: Callable[[], Optional[bool]], name: str, period: int, due: int):
+        self.callback = callback
+        self.name = name
+        self.period = period
+        self.due = due
+        self.cancelled = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled
+
+    def cancel(self):
+        self.cancelled = True
+
+class JobStats:
+    __slots__ = ("runs", "errors", "deferred", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.deferred = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def to_dict(self, name: str) -> dict:
+        return {
+            "job": name,
+            "runs": self.runs,
+            "errors": self.errors,
+            "deferred": self.deferred,
+            "total_ms": self.total_ns / 1_000_000,
+            "avg_us": self.total_ns / self.runs / 1000 if self.runs else 0.0,
+            "max_us": self.max_ns / 1000,
+        }
+
+class TickScheduler:
+    """
+    Runs every periodic PrimeBDS job from a single server task using a hierarchical
+    timing wheel (3 levels of 64 slots, so scheduling and expiry are O(1) for delays
+    up to ~3.6 hours; longer delays are re-cascaded).
+
+    - Jobs scheduled with stagger=True get a round-robin start offset within their
+      period, so 100 per-player jobs with period 20 run 5 per tick instead of 100 in one.
+    - At most max_jobs_per_tick jobs run per tick, and a tick stops early once
+      budget_ms is spent; the remainder runs first on the next tick.
+    - A callback returning True cancels its own job.
+    """
+
+    def __init__(self, plugin: "PrimeBDS", max_jobs_per_tick: int = 64, budget_ms: float = 5.0):
+        self.plugin = plugin
+        self.max_jobs_per_tick = max(1, int(max_jobs_per_tick))
+        self.budget_ns = int(max(0.1, float(budget_ms)) * 1_000_000)
+        self.tick = 0
+        self.stats: dict[str, JobStats] = {}
+        self._wheels = [[[] for _ in range(WHEEL_SIZE)] for _ in range(WHEEL_LEVELS)]
+        self._ready: deque[ScheduledJob] = deque()
+        self._stagger: dict[int, int] = {}
+        self._task_id: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task_id is not None
+
+    def start(self):
+        if self._task_id is not None:
+            return
+        task = self.plugin.server.scheduler.run_task(self.plugin, self.run_tick, delay=1, period=1)
+        self._task_id = task.task_id if task else None
+
+    def stop(self):
+        if self._task_id is not None:
+            self.plugin.server.scheduler.cancel_task(self._task_id)
+            self._task_id = None
+
+    def schedule(self, callback: Callable[[], Optional[bool]], delay: int = 0, period: int = 0,
+                 name: str = None, stagger: bool = False) -> ScheduledJob:
+        """Runs callback after delay ticks, then every period ticks if period > 0."""
+        period = max(0, int(period))
+        delay = max(0, int(delay))
+        if stagger and period > 1:
+            offset = self._stagger.get(period, 0)
+            self._stagger[period] = (offset + 1) % period
+            delay += offset + 1
+
+        job = ScheduledJob(callback, name or getattr(callback, "__qualname__", "job"), period, self.tick + max(1, delay))
+        self._insert(job)
+        return job
+
+    def rows(self) -> list[dict]:
+        """Per-job cost summaries, most total time first."""
+        rows = [stats.to_dict(name) for name, stats in self.stats.items()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def pending_count(self) -> int:
+        return len(self._ready) + sum(len(slot) for wheel in self._wheels for slot in wheel)
+
+    def _insert(self, job: ScheduledJob):
+        delta = job.due - self.tick
+        if delta < WHEEL_SIZE:
+            # Due now (cascaded into the current tick) or within the next 64 ticks
+            self._wheels[0][max(job.due, self.tick) & WHEEL_MASK].append(job)
+            return
+
+        due = min(job.due, self.tick + WHEEL_SPAN - 1)
+        for level in range(1, WHEEL_LEVELS):
+            if delta < WHEEL_SIZE ** (level + 1) or level == WHEEL_LEVELS - 1:
+                self._wheels[level][(due >> (WHEEL_BITS * level)) & WHEEL_MASK].append(job)
+                return
+
+    def _cascade(self):
+        for level in range(WHEEL_LEVELS - 1, 0, -1):
+            if self.tick & ((1 << (WHEEL_BITS * level)) - 1):
+                continue
+            index = (self.tick >> (WHEEL_BITS * level)) & WHEEL_MASK
+            jobs = self._wheels[level][index]
+            if jobs:
+                self._wheels[level][index] = []
+                for job in jobs:
+                    if not job.cancelled:
+                        self._insert(job)
+
+    def run_tick(self):
+        self.tick += 1
+        self._cascade()
+
+        index = self.tick & WHEEL_MASK
+        due = self._wheels[0][index]
+        if due:
+            self._wheels[0][index] = []
+            self._ready.extend(job for job in due if not job.cancelled)
+
+        start = perf_counter_ns()
+        ran = 0
+        while self._ready:
+            if ran >= self.max_jobs_per_tick or (ran and perf_counter_ns() - start >= self.budget_ns):
+                for job in self._ready:
+                    self._job_stats(job.name).deferred += 1
+                return
+            job = self._ready.popleft()
+            if job.cancelled:
+                continue
+            self._run_job(job)
+            ran += 1
+
+    def _job_stats(self, name: str) -> JobStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = JobStats()
+        return stats
+
+    def _run_job(self, job: ScheduledJob):
+        stats = self._job_stats(job.name)
+        began = perf_counter_ns()
+        try:
+            done = job.callback()
+        except Exception as e:
+            stats.errors += 1
+            print(f"[PrimeBDS] Error in scheduled job {job.name}: {e}")
+            done = False
+        elapsed = perf_counter_ns() - began
+
+        stats.runs += 1
+        stats.total_ns += elapsed
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+
+        if done is True or not job.period:
+            job.cancelled = True
+        elif not job.cancelled:
+            job.due = max(job.due + job.period, self.tick + 1)
+            self._insert(job)
+
 class IntervalManager:
     """Manages scheduled periodic checks for the plugin."""
 
-    def __init__(self, plugin: "PrimeBDS", tick_interval: int = 20):
+    def __init__(self, plugin: "PrimeBDS", tick_interval: int = 20, name: str = "interval"):
         self.plugin = plugin
         self.tick_interval = tick_interval
-        self._task_id: Optional[int] = None
+        self.name = name
+        self._job: Optional[ScheduledJob] = None
         self._check_functions: list[Callable[["PrimeBDS"], None]] = []
-        self._player_checks: dict[str, Callable[["PrimeBDS", "Player"], None]] = {}
+        self._player_checks: dict[str, ScheduledJob] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._job is not None and self._job.active
 
     def add_check(self, func: Callable[["PrimeBDS"], None]):
         """Add a function to be called every interval."""
@@ -25,51 +215,55 @@ class IntervalManager:
             self._check_functions.remove(func)
 
     def add_player_check(self, player_name: str, func: Callable[["PrimeBDS", "Player"], None]):
-        """Register a repeating function for a specific player."""
-        self._player_checks[player_name] = func
+        """Register a repeating function for a specific player, staggered against other players."""
+        self.remove_player_check(player_name)
+
+        def run_player_check():
+            player = self.plugin.server.get_player(player_name)
+            if not player:
+                # Remove disconnected players
+                self._player_checks.pop(player_name, None)
+                return True
+            try:
+                func(self.plugin, player)
+            except Exception as e:
+                # Remove if error occurs
+                self._player_checks.pop(player_name, None)
+                print(f"Error in player interval {player_name}: {e}")
+                return True
+
+        self._player_checks[player_name] = self.plugin.tick_scheduler.schedule(
+            run_player_check, period=self.tick_interval, name=f"{self.name}_player", stagger=True
+        )
 
     def remove_player_check(self, player_name: str):
         """Remove a player-specific check."""
-        self._player_checks.pop(player_name, None)
+        job = self._player_checks.pop(player_name, None)
+        if job:
+            job.cancel()
 
     def clear_all_player_checks(self):
         """Remove all player-specific checks."""
+        for job in self._player_checks.values():
+            job.cancel()
         self._player_checks.clear()
 
     def start(self):
-        """Start the repeating task."""
-        if self._task_id is not None:
+        """Start the repeating job."""
+        if self.running:
             return  # Already running
-        task = self.plugin.server.scheduler.run_task(
-            self.plugin, lambda: self._run_checks(), 0, self.tick_interval
-        )
-        self._task_id = task.task_id
+        self._job = self.plugin.tick_scheduler.schedule(self._run_checks, period=self.tick_interval, name=self.name)
 
     def stop(self):
-        """Stop the repeating task."""
-        if self._task_id is not None:
-            self.plugin.server.scheduler.cancel_task(self._task_id)
-            self._task_id = None
+        """Stop the repeating job."""
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
 
     def _run_checks(self):
-        """Run all global and player-specific checks."""
-        # Run global checks
+        """Run all global checks."""
         for func in self._check_functions:
             try:
                 func(self.plugin)
             except Exception as e:
                 print(f"Error in interval check {func.__name__}: {e}")
-
-        # Run player-specific checks
-        for player_name, func in list(self._player_checks.items()):
-            player = self.plugin.server.get_player(player_name)
-            if not player:
-                # Remove disconnected players
-                self.remove_player_check(player_name)
-                continue
-            try:
-                func(self.plugin, player)
-            except Exception as e:
-                # Remove if error occurs
-                self.remove_player_check(player_name)
-                print(f"Error in player interval {player_name}: {e}")
\ No newline at end of file
@@ -0,0 +1,176 @@
+import ast
+import json
+import struct
+from typing import Optional
+
+"""
+Compact binary container format (version 1), little endian:
+
+    magic "PBI" | version u8
+    string table: count u16, then per string: length u32 + utf-8 bytes
+    item count u16, then per item:
+        slot_type u8 | slot u16 | type u16 (string index) | amount u16 | damage i32 | data i32 | flags u8
+        [display_name u16]                     if flags & HAS_NAME
+        [count u16, (id u16, level i16) * n]   if flags & HAS_ENCHANTS
+        [count u16, line u16 * n]              if flags & HAS_LORE
+
+Item types, names, enchant ids and lore lines are interned in the string table.
+"""
+
+MAGIC = b"PBI"
+INVENTORY_FORMAT_VERSION = 1
+
+SLOT_TYPES = ("slot", "helmet", "chestplate", "leggings", "boots", "offhand")
+SLOT_TYPE_IDS = {name: i for i, name in enumerate(SLOT_TYPES)}
+
+UNBREAKABLE = 0x01
+HAS_NAME = 0x02
+HAS_ENCHANTS = 0x04
+HAS_LORE = 0x08
+
+HEADER = struct.Struct("<3sB")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+ITEM = struct.Struct("<BHHHiiB")
+ENCHANT = struct.Struct("<Hh")
+
+def item_to_entry(item, slot_type: str = "slot", slot: int = 0) -> Optional[dict]:
+    """Flattens an ItemStack into the dict shape used by get_inventory/load_inventory."""
+    if not item:
+        return None
+    meta = getattr(item, "item_meta", None)
+    return {
+        "slot_type": slot_type,
+        "slot": slot,
+        "type": str(getattr(item, "type", "minecraft:air")),
+        "amount": getattr(item, "amount", 1) or 1,
+        "damage": getattr(meta, "damage", 0) or 0,
+        "display_name": getattr(meta, "display_name", None) or None,
+        "enchants": dict(getattr(meta, "enchants", None) or {}),
+        "lore": list(getattr(meta, "lore", None) or []),
+        "unbreakable": bool(getattr(meta, "is_unbreakable", False)),
+        "data": getattr(item, "data", 0) or 0,
+    }
+
+def parse_legacy_field(value, default):
+    """Parses a JSON (or Python literal) enchant/lore column from the old per-slot tables."""
+    if not value or value in ("null", "0"):
+        return default
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return default
+    return parsed if isinstance(parsed, type(default)) else default
+
+def encode_inventory(entries: list[dict]) -> bytes:
+    strings: dict[str, int] = {}
+
+    def intern(value) -> int:
+        value = str(value)
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    body = bytearray(U16.pack(len(entries)))
+    for entry in entries:
+        display_name = entry.get("display_name")
+        enchants = entry.get("enchants") or {}
+        lore = entry.get("lore") or []
+
+        flags = UNBREAKABLE if entry.get("unbreakable") else 0
+        if display_name:
+            flags |= HAS_NAME
+        if enchants:
+            flags |= HAS_ENCHANTS
+        if lore:
+            flags |= HAS_LORE
+
+        body += ITEM.pack(
+            SLOT_TYPE_IDS.get(entry.get("slot_type", "slot"), 0),
+            int(entry.get("slot") or 0),
+            intern(entry.get("type") or "minecraft:air"),
+            int(entry.get("amount") or 1),
+            int(entry.get("damage") or 0),
+            int(entry.get("data") or 0),
+            flags
+        )
+        if display_name:
+            body += U16.pack(intern(display_name))
+        if enchants:
+            body += U16.pack(len(enchants))
+            for ench_id, level in enchants.items():
+                body += ENCHANT.pack(intern(ench_id), int(level))
+        if lore:
+            body += U16.pack(len(lore))
+            for line in lore:
+                body += U16.pack(intern(line))
+
+    table = bytearray(U16.pack(len(strings)))
+    for value in strings:
+        encoded = value.encode("utf-8")
+        table += U32.pack(len(encoded))
+        table += encoded
+
+    return HEADER.pack(MAGIC, INVENTORY_FORMAT_VERSION) + bytes(table) + bytes(body)
+
+def decode_inventory(blob: bytes) -> list[dict]:
+    magic, version = HEADER.unpack_from(blob, 0)
+    if magic != MAGIC or version != INVENTORY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported inventory format {magic!r} v{version}")
+    offset = HEADER.size
+
+    (count,) = U16.unpack_from(blob, offset)
+    offset += U16.size
+    strings = []
+    for _ in range(count):
+        (length,) = U32.unpack_from(blob, offset)
+        offset += U32.size
+        strings.append(bytes(blob[offset:offset + length]).decode("utf-8"))
+        offset += length
+
+    (count,) = U16.unpack_from(blob, offset)
+    offset += U16.size
+    entries = []
+    for _ in range(count):
+        slot_type, slot, type_index, amount, damage, data, flags = ITEM.unpack_from(blob, offset)
+        offset += ITEM.size
+
+        display_name = None
+        if flags & HAS_NAME:
+            display_name = strings[U16.unpack_from(blob, offset)[0]]
+            offset += U16.size
+
+        enchants = {}
+        if flags & HAS_ENCHANTS:
+            (n,) = U16.unpack_from(blob, offset)
+            offset += U16.size
+            for _ in range(n):
+                ench_index, level = ENCHANT.unpack_from(blob, offset)
+                offset += ENCHANT.size
+                enchants[strings[ench_index]] = level
+
+        lore = []
+        if flags & HAS_LORE:
+            (n,) = U16.unpack_from(blob, offset)
+            offset += U16.size
+            for _ in range(n):
+                lore.append(strings[U16.unpack_from(blob, offset)[0]])
+                offset += U16.size
+
+        entries.append({
+            "slot_type": SLOT_TYPES[slot_type] if slot_type < len(SLOT_TYPES) else "slot",
+            "slot": slot,
+            "type": strings[type_index],
+            "amount": amount,
+            "damage": damage,
+            "display_name": display_name,
+            "enchants": enchants,
+            "lore": lore,
+            "unbreakable": bool(flags & UNBREAKABLE),
+            "data": data,
+        })
+    return entries
@@ -1,113 +1,99 @@
-import time
 from datetime import datetime
 from typing import TYPE_CHECKING
-import requests
 import re
 
-from endstone_primebds.utils.config_util import load_config
+from endstone import Player
+
+from endstone_primebds.utils.config_util import get_config_snapshot
+from endstone_primebds.utils.webhook_util import dispatcher
 
 if TYPE_CHECKING:
     from endstone_primebds.primebds import PrimeBDS
 
-import threading
-
 TOGGLE_PERMISSIONS = {
     "enabled_ms": "primebds.command.modspy",
     "enabled_as": "primebds.command.altspy",
 }
 
+class SpySubscribers:
+    """
+    Online players subscribed to each spy toggle (modspy, altspy), keyed by xuid.
+    Kept current on join/quit, toggle commands and permission reloads so log()
+    only visits subscribed staff.
+    """
+
+    def __init__(self):
+        self.toggles: dict[str, dict[str, Player]] = {toggle: {} for toggle in TOGGLE_PERMISSIONS}
+
+    def refresh(self, player: Player, state):
+        """Re-evaluates every toggle for a player from their online state and permissions."""
+        for toggle, perm in TOGGLE_PERMISSIONS.items():
+            if getattr(state, toggle, 0) and player.has_permission(perm):
+                self.toggles[toggle][player.xuid] = player
+            else:
+                self.toggles[toggle].pop(player.xuid, None)
+
+    def remove(self, player: Player):
+        for subscribers in self.toggles.values():
+            subscribers.pop(player.xuid, None)
+
+    def get(self, toggles) -> list[Player]:
+        players = {}
+        for toggle in toggles:
+            players.update(self.toggles.get(toggle, {}))
+        return list(players.values())
+
+def refresh_spy_subscriptions(self: "PrimeBDS", player: Player):
+    self.spy_subscribers.refresh(player, self.db.get_online_state(player.xuid))
+
 def log(self: "PrimeBDS", message, type, toggles=None):
     if toggles is None:
         toggles = ["enabled_ms"]
 
     # Discord relay
-    threading.Thread(target=discordRelay, args=(message, type)).start()
-
-    players_to_notify = []
-    
-    for player in self.server.online_players:
-        user = self.db.get_online_user(player.xuid)
+    discordRelay(message, type)
 
-        for toggle in toggles:
-            perm = TOGGLE_PERMISSIONS.get(toggle)
-            if perm and player.has_permission(perm):
-                if getattr(user, toggle, 0): 
-                    players_to_notify.append(player)
-                    break 
-
-    for player in players_to_notify:
-        player.send_message(message)
+    for player in self.spy_subscribers.get(toggles):
+        if player.is_valid:
+            player.send_message(message)
 
     return False
 
 def discordRelay(message, type):
-    """Send message to Discord asynchronously without blocking."""
-    message = re.sub(r'§.', '', message)  # Clean up formatting
-
-    config = load_config()
-    discord_logging = config["modules"]["discord_webhook"]
+    """Queue a message for the Discord webhook of its log type without blocking."""
+    discord_logging = get_config_snapshot().modules.discord_webhook
 
     webhook_url = get_webhook_url(type, discord_logging)
     if not webhook_url:
         return False  # No valid webhook found or enabled
 
-    # Prepare the payload for Discord
-    if discord_logging["embed_for_log"]["enabled"]:
-        payload = {
-            "embeds": [
-                {
-                    "title": discord_logging["embed_for_log"]["title"],
-                    "description": message,
-                    "color": discord_logging["embed_for_log"]["color"],
-                    "footer": {
-                        "text": f"Logged at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}"
-                    }
-                }
-            ]
-        }
-    else:
-        payload = {
-            "content": f"{message}"
-        }
-
-    # Send Discord message asynchronously
-    threading.Thread(target=send_discord_message, args=(webhook_url, payload)).start()
-    return True
+    message = re.sub(r'§.', '', message)  # Clean up formatting
+    worker = dispatcher.get_worker(
+        webhook_url,
+        getattr(discord_logging, "queue_size", 500),
+        getattr(discord_logging, "overflow_policy", "summarize")
+    )
+
+    embed_for_log = discord_logging.embed_for_log
+    if embed_for_log.enabled:
+        return worker.submit(embed={
+            "title": embed_for_log.title,
+            "description": message,
+            "color": embed_for_log.color,
+            "footer": {
+                "text": f"Logged at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}"
+            }
+        })
+    return worker.submit(message)
 
 def get_webhook_url(type, discord_logging):
     """Helper function to get the appropriate webhook URL based on the message type."""
-    if type == "cmd" and discord_logging["command_logs"]["enabled"]:
-        return discord_logging["command_logs"]["webhook"]
-    elif type == "mod" and discord_logging["moderation_logs"]["enabled"]:
-        return discord_logging["moderation_logs"]["webhook"]
-    elif type == "chat" and discord_logging["chat_logs"]["enabled"]:
-        return discord_logging["chat_logs"]["webhook"]
-    elif type == "connections" and discord_logging["connection_logs"]["enabled"]:
-        return discord_logging["connection_logs"]["webhook"]
+    if type == "cmd" and discord_logging.command_logs.enabled:
+        return discord_logging.command_logs.webhook
+    elif type == "mod" and discord_logging.moderation_logs.enabled:
+        return discord_logging.moderation_logs.webhook
+    elif type == "chat" and discord_logging.chat_logs.enabled:
+        return discord_logging.chat_logs.webhook
+    elif type == "connections" and discord_logging.connection_logs.enabled:
+        return discord_logging.connection_logs.webhook
     return None
-
-MAX_RETRIES = 15  # Max retries in case of rate limits
-INITIAL_BACKOFF = 1  # Start with 1 second
-def send_discord_message(webhook_url, payload):
-    """Send HTTP request to Discord webhook with exponential backoff."""
-    retries = 0
-    backoff = INITIAL_BACKOFF 
-
-    while retries < MAX_RETRIES:
-        try:
-            response = requests.post(webhook_url, json=payload)
-            response.raise_for_status()
-            return True
-        except requests.exceptions.RequestException as e:
-            # Check if rate limit (HTTP 429) occurred
-            if response.status_code == 429:
-                retries += 1
-                wait_time = backoff * (2 ** retries)  # Exponential backoff
-                print(f"[primebds - Discord Log] Rate limit exceeded. Retrying in {wait_time}s...")
-                time.sleep(wait_time)  # Wait before retrying
-            else:
-                print(f"Failed to send Discord message: {e}")
-                return False
-
-    print("Max retries reached. Failed to send message.")
-    return False
@@ -0,0 +1,54 @@
+import struct
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from endstone_primebds.primebds import PrimeBDS
+
+PacketFilter = Callable[["PrimeBDS", object, bytes], None]
+
+class PacketFilterPipeline:
+    """
+    Dispatches packet events to filters registered per packet id.
+    Filters receive (plugin, event, payload) and cancel the event to drop the packet;
+    the payload is read once per event and only for ids that have filters.
+    """
+
+    def __init__(self):
+        self._filters: dict[int, tuple[PacketFilter, ...]] = {}
+
+    def register(self, packet_id: int, func: PacketFilter):
+        packet_id = int(packet_id)
+        filters = self._filters.get(packet_id, ())
+        if func not in filters:
+            self._filters[packet_id] = filters + (func,)
+
+    def unregister(self, packet_id: int, func: PacketFilter):
+        packet_id = int(packet_id)
+        filters = tuple(f for f in self._filters.get(packet_id, ()) if f is not func)
+        if filters:
+            self._filters[packet_id] = filters
+        else:
+            self._filters.pop(packet_id, None)
+
+    def clear(self):
+        self._filters.clear()
+
+    def __contains__(self, packet_id: int) -> bool:
+        return packet_id in self._filters
+
+    def dispatch(self, plugin: "PrimeBDS", ev) -> bytes | None:
+        """Runs the filters for the event's packet id, returns the payload if it was read."""
+        filters = self._filters.get(ev.packet_id)
+        if not filters:
+            return None
+
+        payload = ev.payload
+        for func in filters:
+            try:
+                func(plugin, ev, payload)
+            except (IndexError, struct.error):
+                # Truncated or unexpected layout, let the packet through untouched
+                continue
+            if ev.is_cancelled:
+                break
+        return payload
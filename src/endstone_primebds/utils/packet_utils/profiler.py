@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+
+from endstone_primebds.utils.config_util import CONFIG_FOLDER
+
+try:
+    from bedrock_protocol.packets import MinecraftPacketIds
+    PACKET_NAMES = {
+        int(v): k
+        for k, v in MinecraftPacketIds.__dict__.items()
+        if not k.startswith("_") and isinstance(v, int)
+    }
+except Exception:
+    PACKET_NAMES = {}
+
+PROFILES_FOLDER = os.path.join(CONFIG_FOLDER, "profiles")
+MAX_PACKET_ID = 512
+BYTE_SAMPLE_RATE = 16
+
+def packet_name(pid: int) -> str:
+    return PACKET_NAMES.get(pid, "Unknown")
+
+class PacketCounters:
+    """Cumulative per-packet-id counters for one direction, in fixed arrays indexed by id."""
+    __slots__ = ("count", "bytes", "cancelled", "cancelled_bytes", "handler_ns")
+
+    def __init__(self, size: int = MAX_PACKET_ID):
+        for field in self.__slots__:
+            setattr(self, field, array("Q", [0]) * size)
+
+    def copy(self) -> "PacketCounters":
+        counters = PacketCounters.__new__(PacketCounters)
+        for field in self.__slots__:
+            setattr(counters, field, array("Q", getattr(self, field)))
+        return counters
+
+class PacketProfiler:
+    """
+    Low-overhead packet profiler. Handlers call record() once per packet with the
+    payload size, whether it was cancelled and the time spent in the filters.
+    Packet counts are exact. Reading ev.payload copies the whole packet, so sizes are
+    exact only where a filter already read the payload; other packets are sized one in
+    byte_sample_rate per packet id and scaled up.
+    Once a second a snapshot is pushed into a ring buffer so rates can be read over
+    a sliding window without resetting the cumulative counters.
+    """
+
+    def __init__(self, enabled: bool = True, window_seconds: int = 10, max_packet_id: int = MAX_PACKET_ID,
+                 byte_sample_rate: int = BYTE_SAMPLE_RATE):
+        self.enabled = enabled
+        self.window_seconds = max(1, int(window_seconds))
+        self.byte_sample_rate = max(1, int(byte_sample_rate))
+        self.max_packet_id = max_packet_id
+        self.directions = {
+            "send": PacketCounters(max_packet_id),
+            "receive": PacketCounters(max_packet_id),
+        }
+        self.sent = self.directions["send"]
+        self.received = self.directions["receive"]
+        self.started_ns = time.perf_counter_ns()
+        self._ring: deque = deque(maxlen=self.window_seconds + 1)
+        self._next_sample_ns = 0
+
+    def reset(self):
+        self.__init__(self.enabled, self.window_seconds, self.max_packet_id, self.byte_sample_rate)
+
+    def sampled_size(self, counters: PacketCounters, pid: int, ev) -> int:
+        """Estimated size of a packet the filters did not read: every Nth packet per id is read and weighted by N."""
+        if pid >= self.max_packet_id or counters.count[pid] % self.byte_sample_rate:
+            return 0
+        return len(ev.payload) * self.byte_sample_rate
+
+    def record(self, counters: PacketCounters, pid: int, size: int, cancelled: bool, elapsed_ns: int, now_ns: int):
+        if pid >= self.max_packet_id:
+            return
+        counters.count[pid] += 1
+        counters.bytes[pid] += size
+        counters.handler_ns[pid] += elapsed_ns
+        if cancelled:
+            counters.cancelled[pid] += 1
+            counters.cancelled_bytes[pid] += size
+
+        if now_ns >= self._next_sample_ns:
+            self._sample(now_ns)
+
+    def _sample(self, now_ns: int):
+        self._ring.append((now_ns, {name: counters.copy() for name, counters in self.directions.items()}))
+        self._next_sample_ns = now_ns + 1_000_000_000
+
+    def _rows(self, direction: str, base: PacketCounters = None, seconds: float = 0.0) -> list[dict]:
+        counters = self.directions[direction]
+        seconds = seconds or 1.0
+        rows = []
+        for pid in range(self.max_packet_id):
+            count = counters.count[pid] - (base.count[pid] if base else 0)
+            if count <= 0:
+                continue
+            size = counters.bytes[pid] - (base.bytes[pid] if base else 0)
+            cancelled = counters.cancelled[pid] - (base.cancelled[pid] if base else 0)
+            cancelled_bytes = counters.cancelled_bytes[pid] - (base.cancelled_bytes[pid] if base else 0)
+            handler_ns = counters.handler_ns[pid] - (base.handler_ns[pid] if base else 0)
+            rows.append({
+                "direction": direction,
+                "id": pid,
+                "name": packet_name(pid),
+                "count": count,
+                "bytes": size,
+                "cancelled": cancelled,
+                "cancelled_bytes": cancelled_bytes,
+                "handler_ms": handler_ns / 1_000_000,
+                "packets_per_second": count / seconds,
+                "bytes_per_second": size / seconds,
+                "saved_bytes_per_second": cancelled_bytes / seconds,
+                "cancel_rate": cancelled / count,
+                "avg_handler_us": handler_ns / count / 1000,
+                "handler_ms_per_second": handler_ns / 1_000_000 / seconds,
+            })
+        return rows
+
+    def window_rows(self, direction: str) -> list[dict]:
+        """Rates over the ring buffer window (or since start if it has no samples yet)."""
+        now_ns = time.perf_counter_ns()
+        if self._ring:
+            base_ns, snapshot = self._ring[0]
+            base = snapshot[direction]
+        else:
+            base_ns, base = self.started_ns, None
+        return self._rows(direction, base, (now_ns - base_ns) / 1_000_000_000)
+
+    def total_rows(self, direction: str) -> list[dict]:
+        """Cumulative counters since the profiler started."""
+        return self._rows(direction, None, (time.perf_counter_ns() - self.started_ns) / 1_000_000_000)
+
+    def dump(self, fmt: str = "json") -> str:
+        """Writes cumulative and windowed stats to primebds_data/profiles, returns the file path."""
+        os.makedirs(PROFILES_FOLDER, exist_ok=True)
+        fmt = "csv" if fmt == "csv" else "json"
+        path = os.path.join(PROFILES_FOLDER, f"packets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}")
+
+        sections = {
+            "total": [row for d in self.directions for row in self.total_rows(d)],
+            "window": [row for d in self.directions for row in self.window_rows(d)],
+        }
+
+        if fmt == "json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"window_seconds": self.window_seconds, **sections}, f, indent=4)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = None
+                for scope, rows in sections.items():
+                    for row in rows:
+                        row = {"scope": scope, **row}
+                        if writer is None:
+                            writer = csv.DictWriter(f, fieldnames=list(row))
+                            writer.writeheader()
+                        writer.writerow(row)
+
+        return path
@@ -0,0 +1,43 @@
+import struct
+
+# Minimal readers over raw packet payloads. They take the buffer and an offset and
+# return plain ints, so packet filters can peek at a field without building a stream
+# or deserializing the packet.
+
+INT64 = struct.Struct("<q")
+VEC3 = struct.Struct("<3f")
+
+def read_varuint(buf, offset: int) -> tuple[int, int]:
+    """Reads an unsigned LEB128 varint, returns (value, next_offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = buf[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+def read_varint(buf, offset: int) -> tuple[int, int]:
+    """Reads a zigzag-encoded signed varint, returns (value, next_offset)."""
+    value, offset = read_varuint(buf, offset)
+    return (value >> 1) ^ -(value & 1), offset
+
+def skip_varint(buf, offset: int) -> int:
+    while buf[offset] & 0x80:
+        offset += 1
+    return offset + 1
+
+def skip_string(buf, offset: int) -> int:
+    length, offset = read_varuint(buf, offset)
+    return offset + length
+
+def string_equals(buf, offset: int, expected: bytes) -> bool:
+    """Compares a varuint-prefixed string in place against `expected`."""
+    length, offset = read_varuint(buf, offset)
+    return length == len(expected) and buf.startswith(expected, offset)
+
+def to_int32(value: int) -> int:
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
@@ -0,0 +1,47 @@
+USER_STATE_FIELDS = (
+    "name",
+    "internal_rank",
+    "is_afk",
+    "is_vanish",
+    "is_silent_muted",
+    "enabled_mt",
+    "enabled_ss",
+    "enabled_ms",
+    "enabled_as",
+    "enabled_sc",
+)
+
+MOD_STATE_FIELDS = (
+    "is_muted",
+    "mute_time",
+    "is_jailed",
+    "jail_time",
+)
+
+STATE_FIELDS = frozenset(USER_STATE_FIELDS + MOD_STATE_FIELDS)
+
+class OnlinePlayerState:
+    """
+    Authoritative in-memory state for an online player.
+    Loaded once on join, kept current by UserDB writes and dropped on leave,
+    so hot event handlers never have to read SQLite.
+    """
+    __slots__ = ("xuid",) + USER_STATE_FIELDS + MOD_STATE_FIELDS
+
+    def __init__(self, xuid: str, user=None, mod_log=None):
+        self.xuid = xuid
+        for field in USER_STATE_FIELDS:
+            setattr(self, field, getattr(user, field, None) or 0)
+        for field in MOD_STATE_FIELDS:
+            setattr(self, field, getattr(mod_log, field, None) or 0)
+
+        self.name = getattr(user, "name", "") or ""
+        self.internal_rank = getattr(user, "internal_rank", "") or "Default"
+
+    def set(self, column: str, value) -> bool:
+        """Apply a column update, ignoring columns that aren't tracked."""
+        if column not in STATE_FIELDS:
+            return False
+        setattr(self, column, value)
+        return True
+
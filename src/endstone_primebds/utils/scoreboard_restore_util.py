@@ -0,0 +1,164 @@
+import json
+import os
+from typing import TYPE_CHECKING, Optional
+
+from endstone.scoreboard import Criteria
+
+if TYPE_CHECKING:
+    from endstone_primebds.primebds import PrimeBDS
+
+JOURNAL_NAME = "loaded.journal"
+
+_scoreboard_directory = None
+
+def get_scoreboard_directory() -> str:
+    """Returns plugins/primebds_data/scoreboard_data, creating it if needed. The server root is searched once."""
+    global _scoreboard_directory
+    if _scoreboard_directory is None:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        while not (
+            os.path.exists(os.path.join(current_dir, 'plugins')) and
+            os.path.exists(os.path.join(current_dir, 'worlds'))
+        ):
+            current_dir = os.path.dirname(current_dir)
+        _scoreboard_directory = os.path.join(current_dir, 'plugins', 'primebds_data', 'scoreboard_data')
+
+    os.makedirs(_scoreboard_directory, exist_ok=True)
+    return _scoreboard_directory
+
+def is_xuid_entry(entry_key: str) -> bool:
+    return entry_key.isdigit() and len(entry_key) >= 12
+
+class ScoreboardRestoreIndex:
+    """
+    Pending scoreboard profile restores keyed by xuid, built once from the profile files.
+
+    A restore appends one line to a journal instead of rewriting the profile file;
+    journal lines are folded back into the files (loaded / is_fully_loaded flags)
+    when the index is rebuilt, e.g. on startup or before /levelscores touches a profile.
+    """
+
+    def __init__(self, folder: Optional[str] = None):
+        self.folder = folder
+        self.loaded = False
+        self.pending: dict[str, list[tuple[str, str, str, int]]] = {}
+        self.display_names: dict[str, str] = {}
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.folder, JOURNAL_NAME)
+
+    def load(self):
+        """Folds the journal into the profile files and rebuilds the pending index from them."""
+        if self.folder is None:
+            self.folder = get_scoreboard_directory()
+        self.compact()
+        self.pending.clear()
+        self.display_names.clear()
+
+        for filename in os.listdir(self.folder):
+            if not filename.endswith(".json"):
+                continue
+            profile = filename[:-5]
+            data = self._read_profile(profile)
+            if data is None:
+                continue
+
+            for obj_name, obj_data in data.items():
+                if not isinstance(obj_data, dict) or obj_data.get("is_fully_loaded", False):
+                    continue
+                entries = obj_data.get("entries", {})
+                if not isinstance(entries, dict):
+                    continue
+
+                for entry_key, entry_data in entries.items():
+                    if entry_data.get("loaded", False):
+                        continue
+                    if is_xuid_entry(entry_key):
+                        self.pending.setdefault(entry_key, []).append(
+                            (profile, obj_name, entry_key, entry_data.get("value", 0))
+                        )
+                        self.display_names.setdefault(obj_name, obj_data.get("display_name", obj_name))
+                    else:
+                        # Non XUID entries are set when the profile is loaded, only the flag is stale
+                        self._journal([(profile, obj_name, entry_key)])
+
+        self.loaded = True
+
+    def restore(self, plugin: "PrimeBDS", player) -> int:
+        """Applies every pending score for this player, returns how many were set."""
+        if not self.loaded:
+            self.load()
+
+        restores = self.pending.pop(player.xuid, None)
+        if not restores:
+            return 0
+
+        scoreboard = plugin.server.scoreboard
+        applied = []
+        for profile, obj_name, entry_key, value in restores:
+            objective = scoreboard.get_objective(obj_name)
+            if not objective:
+                objective = scoreboard.add_objective(obj_name, Criteria.DUMMY, self.display_names.get(obj_name, obj_name))
+            objective.get_score(player).value = value
+            applied.append((profile, obj_name, entry_key))
+
+        self._journal(applied)
+        return len(applied)
+
+    def compact(self):
+        """Marks journaled entries as loaded in their profile files, then clears the journal."""
+        if self.folder is None:
+            self.folder = get_scoreboard_directory()
+        if not os.path.exists(self.journal_path):
+            return
+
+        loaded: dict[str, set[tuple[str, str]]] = {}
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    profile, obj_name, entry_key = json.loads(line)
+                except (ValueError, TypeError):
+                    continue
+                loaded.setdefault(profile, set()).add((obj_name, entry_key))
+
+        for profile, keys in loaded.items():
+            data = self._read_profile(profile)
+            if data is None:
+                continue
+            for obj_name, obj_data in data.items():
+                if not isinstance(obj_data, dict) or not isinstance(obj_data.get("entries"), dict):
+                    continue
+                for entry_key, entry_data in obj_data["entries"].items():
+                    if (obj_name, entry_key) in keys:
+                        entry_data["loaded"] = True
+                obj_data["is_fully_loaded"] = all(entry.get("loaded", False) for entry in obj_data["entries"].values())
+            try:
+                with open(os.path.join(self.folder, f"{profile}.json"), "w") as f:
+                    json.dump(data, f, indent=4)
+            except OSError as e:
+                print(f"[PrimeBDS] Could not save updated scoreboard file {profile}.json: {e}")
+                return
+
+        os.remove(self.journal_path)
+
+    def _read_profile(self, profile: str) -> Optional[dict]:
+        path = os.path.join(self.folder, f"{profile}.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read scoreboard file {profile}.json: {e}")
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _journal(self, keys: list[tuple[str, str, str]]):
+        if not keys:
+            return
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(key) + "\n" for key in keys)
+        except OSError as e:
+            print(f"[PrimeBDS] Could not write scoreboard journal: {e}")
@@ -1,5 +1,4 @@
 import re
-import random
 import sys
 import numpy as np
 from collections import OrderedDict
@@ -117,184 +116,380 @@ def get_arg_value(args, key, default):
         return val
     return default
 
-def passes_filters(players: List[object], args: dict, origin: Optional[object] = None) -> np.ndarray:
+# Per-tick player snapshot
+GRID_CELL_SIZE = 16.0
+
+def _location_of(p):
+    loc = getattr(p, "location", None)
+    if loc is None:
+        return (0.0, 0.0, 0.0)
+    return (getattr(loc, "x", 0.0), getattr(loc, "y", 0.0), getattr(loc, "z", 0.0))
+
+class SpatialGrid:
+    """Uniform spatial hash over snapshot positions for radius and box queries."""
+
+    def __init__(self, positions: np.ndarray, cell_size: float = GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int, int], list[int]] = {}
+        keys = np.floor(positions / cell_size).astype(np.int64)
+        for i, key in enumerate(map(tuple, keys.tolist())):
+            self.cells.setdefault(key, []).append(i)
+
+    def query_box(self, lo, hi) -> list[int]:
+        """Indices in cells overlapping the axis-aligned box lo..hi (candidates, not exact)."""
+        cs = self.cell_size
+        lo_cell = [int(np.floor(v / cs)) for v in lo]
+        hi_cell = [int(np.floor(v / cs)) for v in hi]
+        span = 1
+        for a, b in zip(lo_cell, hi_cell):
+            span *= (b - a + 1)
+
+        result = []
+        if span > len(self.cells):
+            for key, indices in self.cells.items():
+                if all(lo_cell[k] <= key[k] <= hi_cell[k] for k in range(3)):
+                    result.extend(indices)
+            return result
+
+        for cx in range(lo_cell[0], hi_cell[0] + 1):
+            for cy in range(lo_cell[1], hi_cell[1] + 1):
+                for cz in range(lo_cell[2], hi_cell[2] + 1):
+                    indices = self.cells.get((cx, cy, cz))
+                    if indices:
+                        result.extend(indices)
+        return result
+
+    def query_radius(self, origin, radius: float) -> list[int]:
+        return self.query_box(
+            [v - radius for v in origin],
+            [v + radius for v in origin]
+        )
+
+class PlayerSnapshot:
     """
-    Returns a boolean mask of players/command-senders passing the filters.
-    Safely handles missing origin or missing player.location by using (0,0,0).
+    Contiguous view of a set of players for selector evaluation: float32 positions,
+    interned lowercase names, per-tag membership columns and per-objective score columns.
+    Tag/score columns and the spatial grid are built on first use and reused for the
+    rest of the snapshot's lifetime (one server tick for the shared snapshot).
     """
-    n = len(players)
-    if n == 0:
-        return np.array([], dtype=bool)
 
-    # origin fallback to (0,0,0)
-    origin_arr = np.array([
-        getattr(origin, "x", 0.0) if origin is not None else 0.0,
-        getattr(origin, "y", 0.0) if origin is not None else 0.0,
-        getattr(origin, "z", 0.0) if origin is not None else 0.0,
-    ], dtype=np.float32)
+    def __init__(self, players: list):
+        self.players = players
+        self.size = len(players)
+        self.positions = np.array([_location_of(p) for p in players], dtype=np.float32).reshape(-1, 3)
+        self.names = [sys.intern(str(getattr(p, "name", "")).lower()) for p in players]
+        self.name_index: dict[str, list[int]] = {}
+        for i, name in enumerate(self.names):
+            self.name_index.setdefault(name, []).append(i)
+        self._types = None
+        self._tags = None
+        self._scores: dict[str, np.ndarray] = {}
+        self._grid = None
+
+    @property
+    def grid(self) -> SpatialGrid:
+        if self._grid is None:
+            self._grid = SpatialGrid(self.positions)
+        return self._grid
+
+    def name_mask(self, name: str) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.name_index.get(name, [])] = True
+        return mask
+
+    def type_column(self) -> np.ndarray:
+        if self._types is None:
+            self._types = np.array(
+                [str(getattr(p, "type", "")).lower().removeprefix("minecraft:") for p in self.players]
+            )
+        return self._types
+
+    def tag_mask(self, tag: str) -> np.ndarray:
+        if self._tags is None:
+            self._tags = {}
+            for i, p in enumerate(self.players):
+                for t in getattr(p, "scoreboard_tags", []) or []:
+                    column = self._tags.get(t)
+                    if column is None:
+                        column = self._tags[t] = np.zeros(self.size, dtype=bool)
+                    column[i] = True
+        column = self._tags.get(tag)
+        return column if column is not None else np.zeros(self.size, dtype=bool)
+
+    def score_column(self, objective_name: str) -> np.ndarray:
+        """Scores for an objective as float64, NaN where the objective or score is missing."""
+        column = self._scores.get(objective_name)
+        if column is not None:
+            return column
+
+        objectives = {}
+        column = np.full(self.size, np.nan, dtype=float)
+        for i, p in enumerate(self.players):
+            board = getattr(p, "scoreboard", None)
+            if board is None:
+                continue
+            board_id = id(board)
+            if board_id not in objectives:
+                getter = getattr(board, "get_objective", None)
+                objectives[board_id] = getter(objective_name) if callable(getter) else None
+            obj = objectives[board_id]
+            if obj is None:
+                continue
+            try:
+                value = getattr(obj.get_score(p), "value", None)
+            except Exception:
+                value = None
+            if value is not None:
+                column[i] = float(value)
+
+        self._scores[objective_name] = column
+        return column
+
+_tick_snapshot: Optional[PlayerSnapshot] = None
+_tick_snapshot_tick = -1
+
+def get_player_snapshot(self: "PrimeBDS") -> PlayerSnapshot:
+    """Returns the shared snapshot of online players, rebuilt at most once per server tick."""
+    global _tick_snapshot, _tick_snapshot_tick
+    tick = self.tick_scheduler.tick
+    if _tick_snapshot is None or tick != _tick_snapshot_tick:
+        _tick_snapshot = PlayerSnapshot([a for a in self.server.online_players if isinstance(a, Player)])
+        _tick_snapshot_tick = tick
+    return _tick_snapshot
+
+def invalidate_player_snapshot():
+    """Drops the current snapshot; called when players join or leave mid-tick."""
+    global _tick_snapshot
+    _tick_snapshot = None
+
+def _coord_spec(value) -> tuple[bool, float]:
+    """(relative, value) for a selector coordinate such as 5, 2.5 or ~-3."""
+    if isinstance(value, str) and value.startswith("~"):
+        return True, float(value[1:] or 0.0)
+    return False, float(value)
+
+def _resolve_coord(spec: tuple[bool, float], origin_coord: float) -> float:
+    relative, value = spec
+    return origin_coord + value if relative else value
 
-    # Build arrays of positions (safe: default to 0,0,0 if missing)
-    positions = np.array([
-        (
-            getattr(getattr(p, "location", None), "x", 0.0),
-            getattr(getattr(p, "location", None), "y", 0.0),
-            getattr(getattr(p, "location", None), "z", 0.0),
+class SelectorPlan:
+    """
+    A selector compiled once into everything evaluation needs: origin overrides,
+    squared radii, lowercased name/type values, coordinate specs, pre-converted
+    score ranges and the sort/limit plan. Plans are cached by raw selector string.
+    """
+    __slots__ = ("type", "args", "origin", "r_min_sq", "r_max", "r_max_sq", "name", "entity_type",
+                 "tag", "bounds", "scores", "sort", "limit")
+
+    def __init__(self, selector_type: str, args: dict):
+        self.type = selector_type
+        self.args = args
+
+        self.origin = tuple(
+            _coord_spec(args[axis][0]) if axis in args else None for axis in ("x", "y", "z")
         )
-        for p in players
-    ], dtype=np.float32)
 
+        r_min = args.get("rm", (None, False))[0]
+        r_max = args.get("r", (None, False))[0]
+        self.r_min_sq = float(r_min) ** 2 if r_min is not None else None
+        self.r_max = float(r_max) if r_max is not None else None
+        self.r_max_sq = self.r_max ** 2 if r_max is not None else None
 
-    # Distance squared
-    deltas = positions - origin_arr
-    dist_sq = np.sum(deltas**2, axis=1)
+        self.name = None
+        if "name" in args:
+            val, negate = args["name"]
+            self.name = (str(val).lower(), negate)
 
-    # Mask start
-    mask = np.ones(n, dtype=bool)
-    r_min = args.get("rm", (None, False))[0]
-    r_max = args.get("r", (None, False))[0]
+        self.entity_type = None
+        if "type" in args:
+            val, negate = args["type"]
+            self.entity_type = (str(val).lower().removeprefix("minecraft:"), negate)
 
-    if r_min is not None:
-        mask &= dist_sq >= float(r_min)**2
-    if r_max is not None:
-        mask &= dist_sq <= float(r_max)**2
+        self.tag = args["tag"] if "tag" in args else None
 
-    # Name filter (safe fallback to empty string)
-    if "name" in args:
-        val, negate = args["name"]
-        val = str(val).lower()
-        player_names = np.array([str(getattr(p, "name", "")).lower() for p in players])
-        if negate:
-            mask &= player_names != val
-        else:
-            mask &= player_names == val
-
-    # Type filter (safe fallback to empty string)
-    if "type" in args:
-        val, negate = args["type"]
-        val = str(val).lower().removeprefix("minecraft:")
-        player_types = np.array([str(getattr(p, "type", "")).lower().removeprefix("minecraft:") for p in players])
-        if negate:
-            mask &= player_types != val
-        else:
-            mask &= player_types == val
-
-    # Tag filter (safe fallback to empty iterable)
-    if "tag" in args:
-        val, negate = args["tag"]
-        tag_check = np.array([val in getattr(p, "scoreboard_tags", []) for p in players], dtype=bool)
-        mask &= tag_check != negate  # if negate True -> invert
-
-    # dX/dY/dZ axis filters (safe origin & player location handling)
-    for axis in ("x", "y", "z"):
-        d_key = "d" + axis
-        if d_key in args and axis in args:
-            origin_val = getattr(origin, axis, 0.0) if origin is not None else 0.0
-            min_val = parse_coord(args[axis][0], origin_val)
-            delta_val = parse_coord(args[d_key][0], origin_val)
-            max_val = min_val + delta_val
-            if min_val > max_val:
-                min_val, max_val = max_val, min_val
-            axis_vals = np.array([
-                getattr(getattr(p, "location", None), axis, 0.0) if getattr(p, "location", None) is not None else 0.0
-                for p in players
-            ], dtype=np.float32)
-            mask &= (axis_vals >= min_val) & (axis_vals <= max_val)
-
-    # Scores filter (robustly handle missing scoreboard/objective/score -> treat as no match)
-    if "scores" in args:
-        for scoreboard_name, (value_data, negate) in args["scores"].items():
-            # collect scores (None if missing)
-            raw_scores = []
-            for p in players:
-                board = getattr(p, "scoreboard", None)
-                if board is None:
-                    raw_scores.append(None)
-                    continue
-                obj = board.get_objective(scoreboard_name) if callable(getattr(board, "get_objective", None)) else None
-                if obj is None:
-                    raw_scores.append(None)
-                    continue
-                try:
-                    score_obj = obj.get_score(p)
-                    s = getattr(score_obj, "value", None)
-                except Exception:
-                    s = None
-                raw_scores.append(s)
-
-            # convert to float array with NaN for missing values
-            scores_arr = np.array([float(s) if s is not None else np.nan for s in raw_scores], dtype=float)
-
-            valid = np.ones(n, dtype=bool)
-            exact_type = value_data[0] == "exact"
-            if exact_type:
+        self.bounds = tuple(
+            (column, _coord_spec(args[axis][0]), _coord_spec(args["d" + axis][0]))
+            for column, axis in enumerate(("x", "y", "z"))
+            if "d" + axis in args and axis in args
+        )
+
+        scores = []
+        for scoreboard_name, (value_data, negate) in args.get("scores", {}).items():
+            if value_data[0] == "exact":
                 target = float(value_data[1])
-                valid &= (~np.isnan(scores_arr)) & (scores_arr == target)
+                scores.append((scoreboard_name, target, target, negate))
             else:
                 start, end = value_data[1], value_data[2]
-                if start is not None:
-                    valid &= (~np.isnan(scores_arr)) & (scores_arr >= float(start))
-                if end is not None:
-                    valid &= (~np.isnan(scores_arr)) & (scores_arr <= float(end))
+                scores.append((
+                    scoreboard_name,
+                    float(start) if start is not None else None,
+                    float(end) if end is not None else None,
+                    negate
+                ))
+        self.scores = tuple(scores)
+
+        default_sort, default_limit = {
+            "p": ("nearest", 1),
+            "r": ("random", 1),
+        }.get(selector_type, ("nearest" if "c" in args else "arbitrary", None))
+        sort = str(args["sort"][0]).lower() if "sort" in args else default_sort
+        limit = int(args["c"][0]) if "c" in args else default_limit
+        if limit is not None and limit < 0:
+            sort = {"nearest": "furthest", "furthest": "nearest"}.get(sort, sort)
+            limit = -limit
+        self.sort = sort if sort in ("nearest", "furthest", "random", "arbitrary") else default_sort
+        self.limit = limit
+
+    def resolve_origin(self, base_loc) -> Vector:
+        return Vector(*(
+            _resolve_coord(spec, getattr(base_loc, axis)) if spec is not None else getattr(base_loc, axis)
+            for spec, axis in zip(self.origin, ("x", "y", "z"))
+        ))
+
+    def evaluate(self, snapshot: PlayerSnapshot, origin: Optional[object] = None) -> np.ndarray:
+        """Returns the boolean mask of snapshot players passing this plan's filters."""
+        n = snapshot.size
+        if n == 0:
+            return np.array([], dtype=bool)
+
+        origin_xyz = (
+            getattr(origin, "x", 0.0) if origin is not None else 0.0,
+            getattr(origin, "y", 0.0) if origin is not None else 0.0,
+            getattr(origin, "z", 0.0) if origin is not None else 0.0,
+        )
+        positions = snapshot.positions
+        mask = np.ones(n, dtype=bool)
+
+        if self.r_min_sq is not None or self.r_max_sq is not None:
+            if self.r_max is not None:
+                # Only players in grid cells overlapping the sphere can match
+                in_cells = np.zeros(n, dtype=bool)
+                in_cells[snapshot.grid.query_radius(origin_xyz, self.r_max)] = True
+                mask &= in_cells
+
+            deltas = positions - np.array(origin_xyz, dtype=np.float32)
+            dist_sq = np.sum(deltas**2, axis=1)
+            if self.r_min_sq is not None:
+                mask &= dist_sq >= self.r_min_sq
+            if self.r_max_sq is not None:
+                mask &= dist_sq <= self.r_max_sq
+
+        if self.name is not None:
+            val, negate = self.name
+            name_mask = snapshot.name_mask(val)
+            mask &= ~name_mask if negate else name_mask
+
+        if self.entity_type is not None:
+            val, negate = self.entity_type
+            player_types = snapshot.type_column()
+            mask &= (player_types != val) if negate else (player_types == val)
+
+        if self.tag is not None:
+            val, negate = self.tag
+            mask &= snapshot.tag_mask(val) != negate  # if negate True -> invert
+
+        if self.bounds:
+            ranges = []
+            for column, min_spec, delta_spec in self.bounds:
+                min_val = _resolve_coord(min_spec, origin_xyz[column])
+                max_val = min_val + _resolve_coord(delta_spec, origin_xyz[column])
+                if min_val > max_val:
+                    min_val, max_val = max_val, min_val
+                ranges.append((column, min_val, max_val))
+
+            if len(ranges) == 3:
+                in_cells = np.zeros(n, dtype=bool)
+                in_cells[snapshot.grid.query_box([r[1] for r in ranges], [r[2] for r in ranges])] = True
+                mask &= in_cells
+
+            for column, min_val, max_val in ranges:
+                axis_vals = positions[:, column]
+                mask &= (axis_vals >= min_val) & (axis_vals <= max_val)
+
+        # Missing scoreboard/objective/score -> treated as no match
+        for scoreboard_name, low, high, negate in self.scores:
+            scores_arr = snapshot.score_column(scoreboard_name)
+            valid = ~np.isnan(scores_arr)
+            if low is not None:
+                valid &= scores_arr >= low
+            if high is not None:
+                valid &= scores_arr <= high
+            mask &= ~valid if negate else valid
+
+        return mask
+
+    def select(self, snapshot: PlayerSnapshot, mask: np.ndarray, origin) -> list:
+        """Applies the sort/limit plan to the matching players."""
+        indices = np.flatnonzero(mask)
+        if not len(indices):
+            return []
+
+        if self.sort in ("nearest", "furthest"):
+            o = np.array([origin.x, origin.y, origin.z], dtype=np.float32)
+            dist_sq = np.sum((snapshot.positions[indices] - o)**2, axis=1)
+            order = np.argsort(dist_sq, kind="stable")
+            if self.sort == "furthest":
+                order = order[::-1]
+            indices = indices[order]
+        elif self.sort == "random":
+            indices = np.random.permutation(indices)
+
+        if self.limit is not None:
+            indices = indices[:self.limit]
+        return [snapshot.players[i] for i in indices]
+
+_INVALID_SELECTOR = object()
+
+def compile_selector(selector: str) -> Optional[SelectorPlan]:
+    """Returns the cached plan for a raw selector string, compiling it on first use."""
+    plan = selector_cache.get(selector)
+    if plan is not None:
+        selector_cache.move_to_end(selector)
+        return None if plan is _INVALID_SELECTOR else plan
 
-            if negate:
-                valid = ~valid
-            mask &= valid
+    parsed = parse_selector(selector)
+    try:
+        plan = SelectorPlan(parsed["type"], parsed["args"]) if parsed else None
+    except (ValueError, TypeError):
+        plan = None
+
+    cache_set(selector, plan if plan is not None else _INVALID_SELECTOR)
+    return plan
 
-    return mask
+def passes_filters(players: List[object], args: dict, origin: Optional[object] = None,
+                   snapshot: Optional[PlayerSnapshot] = None) -> np.ndarray:
+    """
+    Returns a boolean mask of players/command-senders passing the filters.
+    Safely handles missing origin or missing player.location by using (0,0,0).
+    Pass a PlayerSnapshot of the same players to reuse its columns and spatial grid.
+    """
+    if not players:
+        return np.array([], dtype=bool)
+    if snapshot is None:
+        snapshot = PlayerSnapshot(players)
+    return SelectorPlan("a", args).evaluate(snapshot, origin)
 
 def get_matching_actors(self: "PrimeBDS", selector: str, origin):
-    all_actors = [a for a in self.server.online_players if isinstance(a, Player)]
+    snapshot = get_player_snapshot(self)
+    all_actors = snapshot.players
 
     if not selector.startswith("@"):
-        lower = selector.lower()
-        for a in all_actors:
-            if a.name.lower() == lower:
-                return [a]
+        matches = snapshot.name_index.get(selector.lower())
+        return [all_actors[matches[0]]] if matches else []
+
+    plan = compile_selector(selector)
+    if plan is None:
         return []
 
     base_loc = getattr(origin, "location",
                 getattr(getattr(origin, "block", None), "location",
                         Vector(0, 0, 0)))
+    origin_loc = plan.resolve_origin(base_loc)
 
-    parsed = parse_selector(selector)
-
-    if not parsed:
-        return []
-
-    selector_type = parsed["type"]
-    args = parsed["args"]
-
-    ox_t = args.get("x")
-    oy_t = args.get("y")
-    oz_t = args.get("z")
-
-    ox = ox_t[0] if ox_t else None
-    oy = oy_t[0] if oy_t else None
-    oz = oz_t[0] if oz_t else None
-
-    origin_loc = Vector(
-        float(ox) if ox is not None else base_loc.x,
-        float(oy) if oy is not None else base_loc.y,
-        float(oz) if oz is not None else base_loc.z,
-    )
-
-    mask = passes_filters(all_actors, args, origin_loc)
-    result = list(np.array(all_actors)[mask])
-
-    if selector_type == "s":
-        result = [origin] if passes_filters([origin], args, origin_loc)[0] else []
-
-    elif selector_type == "p":
-        if result:
-            pos = np.array([[a.location.x, a.location.y, a.location.z] for a in result], dtype=np.float32)
-            o = np.array([origin_loc.x, origin_loc.y, origin_loc.z], dtype=np.float32)
-            closest = np.argmin(np.sum((pos - o)**2, axis=1))
-            result = [result[closest]]
-
-    elif selector_type == "r":
-        result = [random.choice(result)] if result else []
+    if plan.type == "s":
+        return [origin] if plan.evaluate(PlayerSnapshot([origin]), origin_loc)[0] else []
 
-    return result
+    return plan.select(snapshot, plan.evaluate(snapshot, origin_loc), origin_loc)
 
 def get_target_entity(player: Player, max_distance: float = 10) -> Optional[Actor]:
     if not player or not hasattr(player, "location"):
@@ -0,0 +1,177 @@
+from typing import Callable, Optional
+
+# Substrings up to this length are indexed directly; longer queries intersect their trigrams
+GRAM_SIZE = 3
+
+def iter_grams(text: str):
+    """Yields every distinct substring of text with length 1..GRAM_SIZE."""
+    seen = set()
+    for size in range(1, GRAM_SIZE + 1):
+        for i in range(len(text) - size + 1):
+            gram = text[i:i + size]
+            if gram not in seen:
+                seen.add(gram)
+                yield gram
+
+class WarpEntry:
+    """A cached warps row. The location is decoded on first use, not when the row is loaded."""
+    __slots__ = ("name", "pos_str", "displayname", "category", "description", "cost", "cooldown",
+                 "delay", "aliases", "order", "search", "_pos")
+
+    def __init__(self, name: str, pos_str: Optional[str], displayname: Optional[str], category: Optional[str],
+                 description: Optional[str], cost, cooldown, delay, aliases: list[str], order: int = 0):
+        self.name = name
+        self.pos_str = pos_str
+        self.displayname = displayname
+        self.category = category
+        self.description = description
+        self.cost = cost
+        self.cooldown = cooldown
+        self.delay = delay
+        self.aliases = aliases
+        self.order = order
+        # Lowercased name, display name, category and aliases, as matched by WarpIndex.find()
+        self.search = (
+            name.lower(),
+            (displayname or "").lower(),
+            (category or "").lower(),
+            [str(alias).lower() for alias in aliases],
+        )
+        self._pos = None
+
+    def to_dict(self, decode: Callable[[str], object]) -> dict:
+        if self._pos is None and self.pos_str:
+            self._pos = decode(self.pos_str)
+        return {
+            "name": self.name,
+            "pos": self._pos,
+            "displayname": self.displayname,
+            "category": self.category,
+            "description": self.description,
+            "cost": self.cost,
+            "cooldown": self.cooldown,
+            "delay": self.delay,
+            "aliases": list(self.aliases),
+        }
+
+class WarpIndex:
+    """
+    In-memory copy of the warps table for /warp lookups.
+
+    - warps are keyed by lowercased name, in table order
+    - names and aliases map straight to their warp for exact matches
+    - every 1..3 character substring of a warp's name, display name, category and
+      aliases has a posting set, so a fuzzy lookup only scores warps that can contain
+      the query: short queries are a single probe, longer ones intersect their trigrams
+
+    Rows are replaced one at a time by ServerDB whenever a warp is written.
+    """
+
+    def __init__(self):
+        self.warps: dict[str, WarpEntry] = {}
+        self._exact: dict[str, set[str]] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._order = 0
+
+    def clear(self):
+        self.__init__()
+
+    def __len__(self) -> int:
+        return len(self.warps)
+
+    def put(self, entry: WarpEntry):
+        """Adds or replaces a warp, keeping its position if it was already indexed."""
+        key = entry.name.lower()
+        previous = self.warps.get(key)
+        if previous is not None:
+            entry.order = previous.order
+            self._unindex(key, previous)
+        else:
+            entry.order = self._order
+            self._order += 1
+        self.warps[key] = entry
+
+        name, display, category, aliases = entry.search
+        for exact in (name, *aliases):
+            self._exact.setdefault(exact, set()).add(key)
+        for text in (name, display, category, *aliases):
+            for gram in iter_grams(text):
+                self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, name: str) -> Optional[WarpEntry]:
+        key = name.lower()
+        entry = self.warps.pop(key, None)
+        if entry is not None:
+            self._unindex(key, entry)
+        return entry
+
+    def get(self, name: str) -> Optional[WarpEntry]:
+        return self.warps.get(name.lower())
+
+    def all(self) -> list[WarpEntry]:
+        return sorted(self.warps.values(), key=lambda entry: entry.order)
+
+    def find(self, query: str) -> Optional[WarpEntry]:
+        """
+        Same ranking as a full scan: an exact name/alias match wins, otherwise the
+        highest of name +3, display name +2, category +1 and alias +4 substring hits,
+        ties going to the warp that comes first in the table.
+        """
+        query = query.lower()
+
+        exact = self._exact.get(query)
+        if exact:
+            return min((self.warps[key] for key in exact), key=lambda entry: entry.order)
+
+        best_match = None
+        best_score = 0
+        for key in self._candidates(query):
+            entry = self.warps[key]
+            name, display, category, aliases = entry.search
+
+            score = 0
+            if query in name:
+                score += 3
+            if query in display:
+                score += 2
+            if query in category:
+                score += 1
+            if any(query in alias for alias in aliases):
+                score += 4
+
+            if score > best_score or (score == best_score and best_match and entry.order < best_match.order):
+                best_score = score
+                best_match = entry
+
+        return best_match if best_score >= 1 else None
+
+    def _candidates(self, query: str) -> set[str]:
+        if not query:
+            return set(self.warps)
+        if len(query) <= GRAM_SIZE:
+            return self._grams.get(query, set())
+
+        postings = []
+        for i in range(len(query) - GRAM_SIZE + 1):
+            posting = self._grams.get(query[i:i + GRAM_SIZE])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def _unindex(self, key: str, entry: WarpEntry):
+        name, display, category, aliases = entry.search
+        for exact in (name, *aliases):
+            keys = self._exact.get(exact)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._exact[exact]
+        for text in (name, display, category, *aliases):
+            for gram in iter_grams(text):
+                keys = self._grams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._grams[gram]
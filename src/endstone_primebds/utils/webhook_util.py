@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+MAX_RETRIES = 5
+MAX_BACKOFF = 30.0
+REQUEST_TIMEOUT = 10.0
+
+OVERFLOW_POLICIES = ("summarize", "drop_oldest", "drop_newest")
+
+def parse_retry_after(response) -> float:
+    """Seconds to wait after a 429, from Retry-After / X-RateLimit-Reset-After or the JSON body."""
+    for header in ("Retry-After", "X-RateLimit-Reset-After"):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+    try:
+        return max(0.0, float(response.json().get("retry_after", 1.0)))
+    except (ValueError, AttributeError):
+        return 1.0
+
+def bucket_wait(response) -> float:
+    """Seconds until the rate limit bucket resets if this response exhausted it, otherwise 0."""
+    if response.headers.get("X-RateLimit-Remaining") != "0":
+        return 0.0
+    try:
+        return max(0.0, float(response.headers.get("X-RateLimit-Reset-After", 0)))
+    except ValueError:
+        return 0.0
+
+class WebhookWorker:
+    """
+    Delivers queued log lines to one webhook URL from a single daemon thread.
+
+    Lines are coalesced into as few requests as possible: plain lines are joined up
+    to 2,000 characters, embeds are grouped up to 10 per message. When the queue is
+    full the overflow policy applies:
+
+    - summarize: drop the oldest line and post a "N messages dropped" note later
+    - drop_oldest: drop the oldest line silently
+    - drop_newest: reject the incoming line
+    """
+
+    def __init__(self, url: str, max_queue: int = 500, overflow_policy: str = "summarize",
+                 session: Optional[requests.Session] = None):
+        self.url = url
+        self.max_queue = max(1, int(max_queue))
+        self.overflow_policy = overflow_policy if overflow_policy in OVERFLOW_POLICIES else "summarize"
+        self.dropped = 0
+        self.sent_requests = 0
+        self._pending_summary = 0
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._blocked_until = 0.0
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        self._thread = threading.Thread(target=self._run, name="PrimeBDSWebhook", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def submit(self, line: str = None, embed: dict = None) -> bool:
+        """Queues a plain line or an embed, returns False if it was dropped."""
+        item = ("embed", embed) if embed is not None else ("content", line or "")
+        with self._cond:
+            if self._closing:
+                return False
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.overflow_policy == "drop_newest":
+                    return False
+                self._queue.popleft()
+                if self.overflow_policy == "summarize":
+                    self._pending_summary += 1
+            self._queue.append(item)
+            self._cond.notify()
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Stops accepting lines and waits up to timeout seconds for the queue to drain."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.session.close()
+
+    def _next_payload(self) -> Optional[dict]:
+        """Pops as many queued lines of the same kind as fit into one message."""
+        with self._cond:
+            while not self._queue and not self._pending_summary and not self._closing:
+                self._cond.wait()
+            if not self._queue and not self._pending_summary:
+                return None
+
+            if self._pending_summary and (not self._queue or self._queue[0][0] == "content"):
+                summary = f"... {self._pending_summary} log messages dropped (queue full)"
+                self._pending_summary = 0
+                lines, length = [summary], len(summary)
+            else:
+                lines, length = [], 0
+
+            if self._queue and self._queue[0][0] == "embed" and not lines:
+                embeds, chars = [], 0
+                while self._queue and self._queue[0][0] == "embed" and len(embeds) < MAX_EMBEDS:
+                    embed = self._queue[0][1]
+                    size = len(embed.get("description", "")) + len(embed.get("title", ""))
+                    if embeds and chars + size > MAX_EMBED_CHARS:
+                        break
+                    embeds.append(self._queue.popleft()[1])
+                    chars += size
+                return {"embeds": embeds}
+
+            while self._queue and self._queue[0][0] == "content":
+                line = self._queue[0][1][:MAX_CONTENT_LENGTH]
+                extra = len(line) + (1 if lines else 0)
+                if lines and length + extra > MAX_CONTENT_LENGTH:
+                    break
+                self._queue.popleft()
+                lines.append(line)
+                length += extra
+            return {"content": "\n".join(lines)}
+
+    def _run(self):
+        while True:
+            payload = self._next_payload()
+            if payload is None:
+                return
+            self._deliver(payload)
+
+    def _sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _deliver(self, payload: dict) -> bool:
+        backoff = 1.0
+        for _ in range(MAX_RETRIES):
+            self._sleep(self._blocked_until - time.monotonic())
+            try:
+                response = self.session.post(self.url, json=payload, timeout=REQUEST_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                print(f"[PrimeBDS - Discord Log] Webhook request failed: {e}. Retrying in {backoff:.0f}s...")
+                self._sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            self.sent_requests += 1
+            if response.status_code == 429:
+                wait_time = parse_retry_after(response)
+                print(f"[PrimeBDS - Discord Log] Rate limit exceeded. Retrying in {wait_time:.2f}s...")
+                self._blocked_until = time.monotonic() + wait_time
+                continue
+
+            if response.status_code >= 500:
+                self._sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            self._blocked_until = time.monotonic() + bucket_wait(response)
+            if response.status_code >= 400:
+                print(f"[PrimeBDS - Discord Log] Failed to send Discord message: HTTP {response.status_code}")
+                return False
+            return True
+
+        print("[PrimeBDS - Discord Log] Max retries reached. Failed to send message.")
+        return False
+
+class WebhookDispatcher:
+    """One WebhookWorker per webhook URL, created on first use."""
+
+    def __init__(self):
+        self.workers: dict[str, WebhookWorker] = {}
+        self._lock = threading.Lock()
+
+    def get_worker(self, url: str, max_queue: int = 500, overflow_policy: str = "summarize") -> WebhookWorker:
+        worker = self.workers.get(url)
+        if worker is None:
+            with self._lock:
+                worker = self.workers.get(url)
+                if worker is None:
+                    worker = self.workers[url] = WebhookWorker(url, max_queue, overflow_policy)
+        worker.max_queue = max(1, int(max_queue))
+        if overflow_policy in OVERFLOW_POLICIES:
+            worker.overflow_policy = overflow_policy
+        return worker
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            workers = list(self.workers.values())
+            self.workers.clear()
+        for worker in workers:
+            worker.close(timeout)
+
+dispatcher = WebhookDispatcher()